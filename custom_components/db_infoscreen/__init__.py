@@ -7,9 +7,9 @@ information from the Deutsche Bahn (DBF) API and regional providers.
 
 import asyncio
 import copy
-import json
 import logging
 import re
+from collections import Counter
 from datetime import datetime, timedelta, timezone
 from typing import Any
 from urllib.parse import quote, urlencode, urlparse
@@ -18,16 +18,25 @@ import async_timeout
 import homeassistant.helpers.config_validation as cv
 import voluptuous as vol
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.network import get_url
+from homeassistant.helpers.service import async_extract_referenced_entity_ids
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     UpdateFailed,
 )
 from homeassistant.util import dt as dt_util
+from homeassistant.util.json import json_loads
 
 from . import repairs
 from .const import (
@@ -36,12 +45,16 @@ from .const import (
     CONF_CALENDAR_EVENT_DURATION,
     CONF_CALENDAR_ONLY_DELAYED,
     CONF_CALENDAR_ONLY_FAVORITES,
+    CONF_CHANGE_EVENTS,
     CONF_DATA_SOURCE,
+    CONF_DECODE_HORIZON,
     CONF_DEDUPLICATE_DEPARTURES,
     CONF_DEDUPLICATE_KEY,
+    CONF_DEPARTURE_PAGES,
     CONF_DETAILED,
     CONF_DIRECTION,
     CONF_DROP_LATE_TRAINS,
+    CONF_ENABLE_TEXT_VIEW,
     CONF_EXCLUDE_CANCELLED,
     CONF_EXCLUDED_DIRECTIONS,
     CONF_FAVORITE_TRAINS,
@@ -54,43 +67,90 @@ from .const import (
     CONF_PAST_60_MINUTES,
     CONF_PAUSED,
     CONF_PLATFORMS,
+    CONF_PUNCTUALITY_THRESHOLD,
+    CONF_RECORDING_PROFILE,
     CONF_SERVER_TYPE,
     CONF_SERVER_URL,
     CONF_SHOW_OCCUPANCY,
     CONF_STATION,
+    CONF_TEXT_VIEW_TEMPLATE,
     CONF_UPDATE_INTERVAL,
+    CONF_VIA_MATCH_BY_ID,
     CONF_VIA_STATIONS,
     CONF_VIA_STATIONS_LOGIC,
     CONF_WALK_TIME,
     DATA_SOURCE_MAP,
     DEFAULT_CACHE_TTL,
     DEFAULT_CALENDAR_EVENT_DURATION,
+    DEFAULT_DECODE_HORIZON,
     DEFAULT_DEDUPLICATE_KEY,
+    DEFAULT_DEPARTURE_PAGES,
     DEFAULT_NEXT_DEPARTURES,
     DEFAULT_OFFSET,
+    DEFAULT_PUNCTUALITY_THRESHOLD,
+    DEFAULT_TEXT_VIEW_TEMPLATE,
     DEFAULT_UPDATE_INTERVAL,
     DOMAIN,
+    MAX_DEPARTURE_PAGES,
     MIN_UPDATE_INTERVAL,
+    RECORDING_PROFILE_FULL,
     SERVER_TYPE_CUSTOM,
     SERVER_TYPE_FASERF,
     SERVER_TYPE_OFFICIAL,
     SERVER_URL_FASERF,
     SERVER_URL_OFFICIAL,
-    TRAIN_TYPE_MAPPING,
     normalize_data_source,
 )
+from .history import (
+    DelayQuantiles,
+    DepartureHistory,
+    PunctualityRollups,
+    async_remove_rollups,
+)
+from .long_term_statistics import async_import_hourly_statistics
+from .notifications import async_get_notification_dispatcher
 from .utils import (
+    STRING_TABLE,
+    DepartureChange,
+    DepartureDeduplicator,
+    DepartureDiff,
+    DepartureRender,
+    DepartureSizeEstimator,
+    WagonOrderCache,
+    add_alternative_connections,
+    async_get_station_index,
+    build_departure_render,
+    build_facility_issues,
+    build_ignored_train_classes,
+    classify_message,
+    classify_train,
+    compile_text_template,
+    decode_departures_window,
+    detect_datetime_format,
+    index_facility_issues,
+    intern_board_strings,
+    json_dumps_bytes,
     normalize_whitespace,
     parse_datetime_flexible,
     prune_response_cache,
-    simple_serializer,
+    route_station_names,
+    scheduled_time_value,
+    station_key,
+    trip_key,
 )
+from .watch import async_get_watch_registry, build_watch
+from .websocket import SIGNAL_ENTRY_UNLOADED, async_register_websocket_commands
 
 _LOGGER = logging.getLogger(__name__)
 
 # Key: URL, Value: (Timestamp, Data)
 RESPONSE_CACHE: dict[str, Any] = {}
 CACHE_TTL = timedelta(seconds=55)
+# Budget for the serialized next_departures attribute (recorder limit is 16 KiB)
+MAX_ATTRIBUTES_SIZE = 16000
+# First and longest wait before fetching the station list for via IDs again
+VIA_RESOLVE_RETRY = timedelta(minutes=5)
+VIA_RESOLVE_MAX_RETRY = timedelta(hours=1)
 
 
 async def async_setup_entry(
@@ -103,9 +163,12 @@ async def async_setup_entry(
     and sets up the platforms (sensor, calendar, binary_sensor).
     """
     hass.data.setdefault(DOMAIN, {})
+    await async_get_watch_registry(hass).async_load()
+    async_register_websocket_commands(hass)
 
     # Set up the coordinator
     coordinator = DBInfoScreenCoordinator(hass, config_entry)
+    await coordinator.punctuality_rollups.async_load()
     await coordinator.async_config_entry_first_refresh()
 
     hass.data[DOMAIN][config_entry.entry_id] = coordinator
@@ -123,25 +186,16 @@ async def async_setup_entry(
         async def async_watch_train(service_call):
             """Handle the watch_train service call."""
             train_id = service_call.data["train_id"]
-            notify_service = service_call.data["notify_service"]
-
-            # Broadcast to all coordinators
-            for coord in hass.data[DOMAIN].values():
-                if isinstance(coord, DBInfoScreenCoordinator):
-                    coord.watched_trips[train_id] = {
-                        "notify_service": notify_service,
-                        "delay_threshold": service_call.data.get("delay_threshold", 5),
-                        "notify_on_platform_change": service_call.data.get(
-                            "notify_on_platform_change", True
-                        ),
-                        "notify_on_cancellation": service_call.data.get(
-                            "notify_on_cancellation", True
-                        ),
-                        "last_notified_delay": -1,
-                        "last_notified_platform": None,
-                        "last_notified_cancellation": False,
-                    }
-            _LOGGER.debug("Trip %s added to all Watchlists", train_id)
+            async_get_watch_registry(hass).async_add(
+                train_id,
+                build_watch(
+                    service_call.data["notify_service"],
+                    service_call.data.get("delay_threshold", 5),
+                    service_call.data.get("notify_on_platform_change", True),
+                    service_call.data.get("notify_on_cancellation", True),
+                ),
+            )
+            _LOGGER.debug("Trip %s added to the watchlist", train_id)
 
         hass.services.async_register(
             DOMAIN,
@@ -171,6 +225,7 @@ async def async_setup_entry(
                     coord.tracked_connections[my_train_id] = {
                         "change_station": change_station,
                         "next_train_id": next_train_id,
+                        "notify_service": service_call.data.get("notify_service"),
                     }
             _LOGGER.debug(
                 "Connection %s -> %s tracked in all coordinators",
@@ -187,6 +242,7 @@ async def async_setup_entry(
                     vol.Required("my_train_id"): cv.string,
                     vol.Required("change_station"): cv.string,
                     vol.Required("next_train_id"): cv.string,
+                    vol.Optional("notify_service"): cv.string,
                 }
             ),
         )
@@ -206,6 +262,50 @@ async def async_setup_entry(
             async_refresh_departures,
         )
 
+    if not hass.services.has_service(DOMAIN, "get_departures"):
+
+        async def async_get_departures(service_call: ServiceCall) -> ServiceResponse:
+            """
+            Return the departures of the stations behind the targeted sensors.
+
+            Devices and areas resolve to the main departure sensor of each
+            station, not to every entity of it.
+            """
+            selected = async_extract_referenced_entity_ids(hass, service_call)
+            ent_reg = er.async_get(hass)
+            response: dict[str, Any] = {}
+            for entity_id in sorted(
+                selected.referenced | selected.indirectly_referenced
+            ):
+                ent_entry = ent_reg.async_get(entity_id)
+                if ent_entry is None or ent_entry.platform != DOMAIN:
+                    continue
+                if (
+                    entity_id not in selected.referenced
+                    and ent_entry.unique_id
+                    != f"db_infoscreen_{ent_entry.config_entry_id}"
+                ):
+                    continue
+                coordinator = hass.data[DOMAIN].get(ent_entry.config_entry_id)
+                if not isinstance(coordinator, DBInfoScreenCoordinator):
+                    continue
+                last_update = getattr(coordinator, "last_update", None)
+                response[entity_id] = {
+                    "station": coordinator.station,
+                    "last_updated": last_update.isoformat() if last_update else None,
+                    "departures": coordinator.data or [],
+                    "station_messages": coordinator.station_messages,
+                }
+            return response
+
+        hass.services.async_register(
+            DOMAIN,
+            "get_departures",
+            async_get_departures,
+            schema=cv.make_entity_service_schema({}),
+            supports_response=SupportsResponse.ONLY,
+        )
+
     if not hass.services.has_service(DOMAIN, "set_offset"):
 
         async def async_set_offset(service_call):
@@ -384,9 +484,17 @@ async def async_unload_entry(
     )
     if unload_ok:
         hass.data[DOMAIN].pop(config_entry.entry_id)
+        async_dispatcher_send(hass, SIGNAL_ENTRY_UNLOADED.format(config_entry.entry_id))
     return unload_ok
 
 
+async def async_remove_entry(
+    hass: HomeAssistant, config_entry: config_entries.ConfigEntry
+) -> None:
+    """Remove the persisted punctuality rollups of a deleted config entry."""
+    await async_remove_rollups(hass, config_entry.entry_id)
+
+
 async def update_listener(
     hass: HomeAssistant, config_entry: config_entries.ConfigEntry
 ):
@@ -421,11 +529,23 @@ class DBInfoScreenCoordinator(DataUpdateCoordinator[list[dict[str, Any]]]):
                 s.strip() for s in re.split(r",|\|", fav_raw) if s.strip()
             ]
 
-        self.watched_trips: dict[str, dict[str, Any]] = {}
+        self._watch_registry = async_get_watch_registry(hass)
+        self._notifications = async_get_notification_dispatcher(hass)
         self.tracked_connections: dict[str, dict[str, Any]] = {}
-        self.departure_history: dict[str, Any] = {}
+        self.punctuality_threshold = int(
+            config.get(CONF_PUNCTUALITY_THRESHOLD, DEFAULT_PUNCTUALITY_THRESHOLD)
+        )
+        self.departure_history = DepartureHistory(
+            delay_threshold=self.punctuality_threshold
+        )
+        self.punctuality_rollups = PunctualityRollups(
+            hass, config_entry.entry_id, self.punctuality_threshold
+        )
+        self.delay_quantiles = DelayQuantiles()
         self.station_messages: list[dict[str, Any]] = []
         self.raw_elevator_issues: list[str] = []
+        self.elevator_issues: list[dict[str, Any]] = []
+        self.elevator_issues_by_platform: dict[str, list[dict[str, Any]]] = {}
         self.hide_low_delay: bool = bool(config.get(CONF_HIDE_LOW_DELAY, False))
         self.detailed: bool = bool(config.get(CONF_DETAILED, False))
         self.past_60_minutes: bool = bool(config.get(CONF_PAST_60_MINUTES, False))
@@ -456,18 +576,37 @@ class DBInfoScreenCoordinator(DataUpdateCoordinator[list[dict[str, Any]]]):
             self.ignored_train_types = [
                 t.strip() for t in str(ignored_raw).split(",") if t.strip()
             ]
+        # Normalized classes to ignore, e.g. ['S'] becomes {'s_bahn', 'S-Bahn'}
+        self.ignored_train_classes = build_ignored_train_classes(
+            self.ignored_train_types
+        )
 
         self.drop_late_trains = config.get(CONF_DROP_LATE_TRAINS, False)
         self.keep_route = config.get(CONF_KEEP_ROUTE, False)
         self.keep_endstation = config.get(CONF_KEEP_ENDSTATION, False)
         self.deduplicate_departures = config.get(CONF_DEDUPLICATE_DEPARTURES, False)
         self.deduplicate_key = config.get(CONF_DEDUPLICATE_KEY, DEFAULT_DEDUPLICATE_KEY)
+        self._deduplicator = DepartureDeduplicator(self.deduplicate_key)
         self.exclude_cancelled = config.get(CONF_EXCLUDE_CANCELLED, False)
         self.show_occupancy = config.get(CONF_SHOW_OCCUPANCY, False)
         self.platforms = config.get(CONF_PLATFORMS, "")
         self.paused = bool(config.get(CONF_PAUSED, False))
         self.via_stations_logic = config.get(CONF_VIA_STATIONS_LOGIC, "OR")
+        self.via_match_by_id = config.get(CONF_VIA_MATCH_BY_ID, False)
+        self._station_index = None
+        # Station IDs of the via stations, None for names that did not resolve
+        self._via_station_ids: list[int | None] | None = None
+        # Without a station list, resolving is retried with a growing backoff
+        self._via_resolve_failures = 0
+        self._via_resolve_retry_at = 0.0
         self.admode = config.get(CONF_ADMODE, "preferred departure")
+        self.enable_text_view = config.get(CONF_ENABLE_TEXT_VIEW, False)
+        self.text_view_template = config.get(
+            CONF_TEXT_VIEW_TEMPLATE, DEFAULT_TEXT_VIEW_TEMPLATE
+        )
+        self._text_template = compile_text_template(self.text_view_template)
+        # Display values per trip_key() of the departures in self.data
+        self.render_models: dict[str, DepartureRender] = {}
         self.walk_time = int(config.get(CONF_WALK_TIME, 0))
         self.calendar_event_duration = int(
             config.get(CONF_CALENDAR_EVENT_DURATION, DEFAULT_CALENDAR_EVENT_DURATION)
@@ -484,6 +623,33 @@ class DBInfoScreenCoordinator(DataUpdateCoordinator[list[dict[str, Any]]]):
         self._api_update_interval = update_interval * 60
         self._last_api_fetch = 0.0
         self._raw_api_data = None
+        # Paging splits the visible list across companion sensors, each of
+        # which stays below the attribute size limit on its own.
+        self.departure_pages = min(
+            max(int(config.get(CONF_DEPARTURE_PAGES, DEFAULT_DEPARTURE_PAGES)), 1),
+            MAX_DEPARTURE_PAGES,
+        )
+        self.page_bounds: list[tuple[int, int]] = []
+        decode_horizon = int(config.get(CONF_DECODE_HORIZON, DEFAULT_DECODE_HORIZON))
+        self.decode_horizon = (
+            timedelta(minutes=decode_horizon) if decode_horizon > 0 else None
+        )
+        self._size_estimator = DepartureSizeEstimator(
+            MAX_ATTRIBUTES_SIZE * self.departure_pages
+        )
+        self._wagon_order_cache = WagonOrderCache()
+        self.attributes_size = 0
+        self.change_events = bool(config.get(CONF_CHANGE_EVENTS, False))
+        self.recording_profile = config.get(
+            CONF_RECORDING_PROFILE, RECORDING_PROFILE_FULL
+        )
+        self._departure_diff = DepartureDiff()
+        self.departure_changes: list[DepartureChange] = []
+        # Per entity (unique ID) count of state writes and skipped unchanged ones
+        self.state_write_counts: dict[str, dict[str, int]] = {}
+        # Bumped before the listeners of every update, including fallbacks
+        # that return the same cached list, so entities can cache per update
+        self.update_count = 0
 
         # Fixed local update interval for calculation/pruning (30 seconds)
         # If interval is 0, we disable automatic updates
@@ -602,7 +768,7 @@ class DBInfoScreenCoordinator(DataUpdateCoordinator[list[dict[str, Any]]]):
                 ) as response,
             ):
                 if response.status < 500:
-                    data = await response.json()
+                    data = await response.json(loads=json_loads)
                     if isinstance(data, dict):
                         # Search for version strings in the response
                         v = data.get("version")
@@ -616,6 +782,57 @@ class DBInfoScreenCoordinator(DataUpdateCoordinator[list[dict[str, Any]]]):
                 "Could not fetch server version from %s: %s", self._base_url, e
             )
 
+    async def async_resolve_via_stations(self) -> None:
+        """
+        Resolve the configured via stations to station IDs once.
+
+        If the station list cannot be fetched, via stations are matched by
+        name and resolving is retried on a later update.
+        """
+        station_index = await async_get_station_index(self.hass, self._base_url)
+        if station_index is None:
+            retry_in = min(
+                VIA_RESOLVE_RETRY * 2**self._via_resolve_failures,
+                VIA_RESOLVE_MAX_RETRY,
+            )
+            self._via_resolve_failures += 1
+            self._via_resolve_retry_at = (dt_util.now() + retry_in).timestamp()
+            _LOGGER.debug(
+                "No station list available for %s, matching via stations by "
+                "name and retrying in %s",
+                self._base_url,
+                retry_in,
+            )
+            return
+        # Misspelled names are matched against the whole list, off the loop
+        self._via_station_ids = await self.hass.async_add_executor_job(
+            station_index.resolve_all, self.via_stations
+        )
+        self._station_index = station_index
+        self._via_resolve_failures = 0
+        _LOGGER.debug(
+            "Resolved via stations %s to station IDs %s",
+            self.via_stations,
+            self._via_station_ids,
+        )
+
+    @property
+    def _cache_key(self) -> str:
+        """Return the key of this entry's responses in RESPONSE_CACHE."""
+        if not self.decode_horizon:
+            return self.fetch_url
+        # Windowed responses must not be shared with entries that need all of
+        # them, and the window moves with the offset (see set_offset)
+        return (
+            f"{self.fetch_url}#horizon={self.decode_horizon.total_seconds() // 60:.0f}"
+            f"&offset={self.offset}"
+        )
+
+    @property
+    def duplicate_counts(self) -> dict[str, int]:
+        """Return how many duplicates each key source removed in the last update."""
+        return self._deduplicator.duplicate_counts
+
     def convert_offset_to_seconds(self, offset: str) -> int:
         """
         Converts an offset string in HH:MM or HH:MM:SS format to seconds.
@@ -719,6 +936,15 @@ class DBInfoScreenCoordinator(DataUpdateCoordinator[list[dict[str, Any]]]):
         if self.server_version is None:
             await self.async_fetch_server_version()
 
+        if (
+            self.via_match_by_id
+            and self.via_stations
+            and not self._via_filtered_server_side
+            and self._via_station_ids is None
+            and now.timestamp() >= self._via_resolve_retry_at
+        ):
+            await self.async_resolve_via_stations()
+
         do_api_fetch = (
             now.timestamp() - self._last_api_fetch >= self._api_update_interval
         )
@@ -734,8 +960,8 @@ class DBInfoScreenCoordinator(DataUpdateCoordinator[list[dict[str, Any]]]):
             data = self._raw_api_data
             if data is None:
                 return self._last_valid_value or []
-        elif self.fetch_url in RESPONSE_CACHE:
-            timestamp, cached_data = RESPONSE_CACHE[self.fetch_url]
+        elif self._cache_key in RESPONSE_CACHE:
+            timestamp, cached_data = RESPONSE_CACHE[self._cache_key]
             if now - timestamp < self.cache_ttl:
                 _LOGGER.debug("Using globally cached response for %s", self.fetch_url)
                 data = copy.deepcopy(cached_data)
@@ -743,7 +969,7 @@ class DBInfoScreenCoordinator(DataUpdateCoordinator[list[dict[str, Any]]]):
                 self._last_api_fetch = now.timestamp()
             else:
                 _LOGGER.debug("Global cache expired for %s", self.fetch_url)
-                RESPONSE_CACHE.pop(self.fetch_url, None)
+                RESPONSE_CACHE.pop(self._cache_key, None)
                 data = None
         else:
             data = None
@@ -778,14 +1004,25 @@ class DBInfoScreenCoordinator(DataUpdateCoordinator[list[dict[str, Any]]]):
                             )
 
                         response.raise_for_status()
-                        data = await response.json()
+                        if self.decode_horizon:
+                            data = decode_departures_window(
+                                await response.read(),
+                                now,
+                                self.decode_horizon,
+                                timedelta(seconds=self.offset),
+                            )
+                        else:
+                            data = await response.json(loads=json_loads)
                         if asyncio.iscoroutine(data) or (
                             hasattr(data, "__await__")
                             and not isinstance(data, (dict, list))
                         ):
                             data = await data
 
-                        RESPONSE_CACHE[self.fetch_url] = (now, copy.deepcopy(data))
+                        # Intern before caching so the cached copy, the raw
+                        # data and every later deep copy share the strings
+                        intern_board_strings(data)
+                        RESPONSE_CACHE[self._cache_key] = (now, copy.deepcopy(data))
                         self._raw_api_data = data
                         self._last_api_fetch = now.timestamp()
                         break  # Success, exit retry loop
@@ -889,20 +1126,14 @@ class DBInfoScreenCoordinator(DataUpdateCoordinator[list[dict[str, Any]]]):
             repairs.clear_all_issues_for_entry(self.hass, self.config_entry.entry_id)
         # --- PRE-PROCESSING: Parse time for all departures ---
         departures_with_time = []
+        # All departures of a response share one time format, detect it once
+        time_format: str | None = None
         # Use a deep copy to avoid modifying the cached/mock objects in-place
         for departure in copy.deepcopy(raw_departures):
             if not departure:
                 continue
 
-            departure_time_str = (
-                departure.get("scheduledDeparture")
-                or departure.get("sched_dep")
-                or departure.get("scheduledArrival")
-                or departure.get("sched_arr")
-                or departure.get("scheduledTime")
-                or departure.get("dep")
-                or departure.get("datetime")
-            )
+            departure_time_str = scheduled_time_value(departure)
 
             if not departure_time_str:
                 _LOGGER.warning(
@@ -912,7 +1143,11 @@ class DBInfoScreenCoordinator(DataUpdateCoordinator[list[dict[str, Any]]]):
                 continue
 
             # Use centralized robust parsing
-            departure_time_obj = parse_datetime_flexible(departure_time_str, now)
+            if time_format is None:
+                time_format = detect_datetime_format(departure_time_str)
+            departure_time_obj = parse_datetime_flexible(
+                departure_time_str, now, time_format
+            )
 
             if not departure_time_obj:
                 _LOGGER.error(
@@ -946,75 +1181,12 @@ class DBInfoScreenCoordinator(DataUpdateCoordinator[list[dict[str, Any]]]):
                 "Deduplication is enabled. Processing %d departures.",
                 len(departures_with_time),
             )
-            # Sort by time to ensure we process trips in chronological order
-            departures_to_process.sort(key=lambda d: d["departure_datetime"])
-
-            final_departures = []
-            # Keep track of the last processed departure for each unique key to handle multiple trips per line
-            last_kept_for_key: dict[Any, dict[str, Any]] = {}
-
-            for departure in departures_to_process:
-                # Resolve the unique trip identifier using the configured key template
-                key_trip_id = ""
-                raw_key_parts = re.findall(r"\{([^}]+)\}", self.deduplicate_key)
-                if raw_key_parts:
-                    for part in raw_key_parts:
-                        val = departure.get(part)
-                        if val is not None:
-                            # Normalize string components (strip whitespace, lowercase) for robustness
-                            if isinstance(val, str):
-                                val = val.strip().lower()
-                            key_trip_id += str(val)
-                else:
-                    # Fallback if no placeholders found (legacy behavior or static string)
-                    key_trip_id = self.deduplicate_key.strip().lower()
-
-                key_line = (
-                    str(departure.get("line") or departure.get("train") or "")
-                    .strip()
-                    .lower()
+            final_departures = self._deduplicator.deduplicate(departures_to_process)
+            if self._deduplicator.duplicate_counts:
+                _LOGGER.debug(
+                    "Filtered out duplicate departures per key source: %s",
+                    self._deduplicator.duplicate_counts,
                 )
-                key_dest = str(departure.get("destination") or "").strip().lower()
-
-                # Build the unique key using trip_id if available, otherwise fallback to line+dest
-                if key_trip_id:
-                    unique_key: Any = key_trip_id
-                elif key_line or key_dest:
-                    unique_key = (key_line, key_dest)
-                else:
-                    # If we don't even have line/dest/trip_id, treat as unique to avoid over-deduplication
-                    final_departures.append(departure)
-                    continue
-
-                if unique_key not in last_kept_for_key:
-                    final_departures.append(departure)
-                    last_kept_for_key[unique_key] = departure
-                else:
-                    # We have seen this trip before. Check the time difference with the LAST kept one.
-                    existing_departure = last_kept_for_key[unique_key]
-                    time_diff = abs(
-                        (
-                            departure["departure_datetime"]
-                            - existing_departure["departure_datetime"]
-                        ).total_seconds()
-                    )
-
-                    # If the new one is within 2 minutes of the previous one, it's considered a duplicate.
-                    if time_diff <= 120:
-                        _LOGGER.debug(
-                            "Filtering out duplicate departure. Key: %s, Keeping (earlier): %s, Removing (later): %s",
-                            unique_key,
-                            existing_departure.get(
-                                "id", existing_departure.get("line")
-                            ),
-                            departure.get("id", departure.get("line")),
-                        )
-                        continue
-                    else:
-                        # Time difference is large enough (> 2 mins). This is a NEW trip for the same key.
-                        final_departures.append(departure)
-                        last_kept_for_key[unique_key] = departure
-
             departures_to_process = final_departures
             _LOGGER.debug(
                 "Deduplication complete. Remaining departures: %d",
@@ -1053,30 +1225,12 @@ class DBInfoScreenCoordinator(DataUpdateCoordinator[list[dict[str, Any]]]):
                                     )
 
                                 # Process for elevator/escalator issues
-                                lower_text = msg_text.lower()
-                                keywords = [
-                                    "aufzug",
-                                    "aufzüge",
-                                    "fahrstuhl",
-                                    "lift",
-                                    "rolltreppe",
-                                ]
-                                if any(k in lower_text for k in keywords):
-                                    working_keywords = [
-                                        "in betrieb",
-                                        "ok",
-                                        "behoben",
-                                        "funktioniert wieder",
-                                        "verfügbar",
-                                    ]
-                                    if (
-                                        not any(
-                                            wk in lower_text for wk in working_keywords
-                                        )
-                                        and msg_text not in seen_elevator_issues
-                                    ):
-                                        seen_elevator_issues.add(msg_text)
-                                        raw_elevator_issues_list.append(msg_text)
+                                if (
+                                    classify_message(msg_text).facility_issue
+                                    and msg_text not in seen_elevator_issues
+                                ):
+                                    seen_elevator_issues.add(msg_text)
+                                    raw_elevator_issues_list.append(msg_text)
             elif isinstance(messages, list):
                 for m in messages:
                     msg_text = ""
@@ -1100,64 +1254,31 @@ class DBInfoScreenCoordinator(DataUpdateCoordinator[list[dict[str, Any]]]):
                             )
 
                         # Process for elevator/escalator issues
-                        lower_text = msg_text.lower()
-                        keywords = [
-                            "aufzug",
-                            "aufzüge",
-                            "fahrstuhl",
-                            "lift",
-                            "rolltreppe",
-                        ]
-                        if any(k in lower_text for k in keywords):
-                            working_keywords = [
-                                "in betrieb",
-                                "ok",
-                                "behoben",
-                                "funktioniert wieder",
-                                "verfügbar",
-                            ]
-                            if (
-                                not any(wk in lower_text for wk in working_keywords)
-                                and msg_text not in seen_elevator_issues
-                            ):
-                                seen_elevator_issues.add(msg_text)
-                                raw_elevator_issues_list.append(msg_text)
+                        if (
+                            classify_message(msg_text).facility_issue
+                            and msg_text not in seen_elevator_issues
+                        ):
+                            seen_elevator_issues.add(msg_text)
+                            raw_elevator_issues_list.append(msg_text)
 
         self.station_messages = station_messages_list
         self.raw_elevator_issues = raw_elevator_issues_list
+        self.elevator_issues = build_facility_issues(raw_elevator_issues_list)
+        self.elevator_issues_by_platform = index_facility_issues(self.elevator_issues)
 
         # --- MAIN FILTERING AND PROCESSING ---
         filtered_departures: list[dict[str, Any]] = []
-        current_size = 2  # Estimate for empty list '[]'
+        # Estimate for empty list '[]' plus the extras of the first page
+        current_size = 2 + self._first_page_extras_size()
+        item_sizes: dict[int, int] = {}
 
-        # Map the configured ignored train types to the normalized values for correct comparison.
-        # e.g., if config is ['S'], this becomes {'S-Bahn'}.
-        ignored_train_types = self.ignored_train_types
-        mapped_ignored_train_types = {
-            TRAIN_TYPE_MAPPING.get(t, t) for t in ignored_train_types
-        }
-
-        # Some data sources might use other values, ensure compatibility.
-        if "S" in ignored_train_types:
-            mapped_ignored_train_types.add("S-Bahn")
-            mapped_ignored_train_types.add("s_bahn")
-        if "StadtBus" in ignored_train_types:
-            mapped_ignored_train_types.add("MetroBus")
-            mapped_ignored_train_types.add("bus")
-        if "F" in ignored_train_types:
-            mapped_ignored_train_types.add("Fernverkehr")
-            mapped_ignored_train_types.add("long_distance")
-        if "N" in ignored_train_types:
-            mapped_ignored_train_types.add("Regionalverkehr")
-            mapped_ignored_train_types.add("regional_db")
-
-        if mapped_ignored_train_types:
+        if self.ignored_train_classes:
             _LOGGER.debug(
                 "Ignoring train types (mapped): %s",
-                mapped_ignored_train_types,
+                self.ignored_train_classes,
             )
 
-        MAX_SIZE_BYTES = 16000
+        MAX_SIZE_BYTES = self._size_estimator.limit
 
         for departure in departures_to_process:
             _LOGGER.debug("Processing departure: %s", departure)
@@ -1217,32 +1338,27 @@ class DBInfoScreenCoordinator(DataUpdateCoordinator[list[dict[str, Any]]]):
 
             # Via Stations filter (LOCAL)
             if self.via_stations and not self._via_filtered_server_side:
-                # Check both "route" (list of dicts) and "via" (list of strings)
-                route_raw = departure.get("route") or []
-                via_raw = departure.get("via") or []
-
-                # Consolidate all station names into a lowercase set for matching
-                stations_on_route = set()
-
-                # Process route list
-                for stop in route_raw:
-                    if isinstance(stop, dict):
-                        stations_on_route.add(stop.get("name", "").lower())
-                    else:
-                        stations_on_route.add(str(stop).lower())
-
-                # Process via list
-                for stop in via_raw:
-                    stations_on_route.add(str(stop).lower())
-
-                # Also include destination in the check
-                dest = departure.get("destination", "").lower()
-                if dest:
-                    stations_on_route.add(dest)
-
-                via_matches = [
-                    v.lower() in stations_on_route for v in self.via_stations
-                ]
+                if self._station_index is not None:
+                    # Match by station ID; stops missing from the station list
+                    # (and via stations that did not resolve) match by name
+                    route_ids, unknown_stops = self._station_index.route_stations(
+                        departure
+                    )
+                    via_matches = [
+                        (station_id is not None and station_id in route_ids)
+                        or station_key(via_name) in unknown_stops
+                        for via_name, station_id in zip(
+                            self.via_stations, self._via_station_ids or []
+                        )
+                    ]
+                    stations_on_route = [*route_ids, *unknown_stops]
+                else:
+                    # Lowercase names on "route", "via" and the destination
+                    stations_on_route = route_station_names(departure)
+                    via_matches = [
+                        STRING_TABLE.lower(v) in stations_on_route
+                        for v in self.via_stations
+                    ]
 
                 if self.via_stations_logic == "AND":
                     matches = all(via_matches)
@@ -1258,49 +1374,14 @@ class DBInfoScreenCoordinator(DataUpdateCoordinator[list[dict[str, Any]]]):
                     )
                     continue
 
-            # Get train classes from the departure data.
-            train_classes = (
-                departure.get("trainClasses")
-                or departure.get("train_type")
-                or departure.get("type", [])
-            )
-
-            if isinstance(train_classes, str):
-                train_classes = [train_classes]
-
-            # If the API returns an empty list, we try to infer it from the train name.
-            if not train_classes and isinstance(train_classes, list):
-                train_name = str(departure.get("train", "")).upper()
-                if (
-                    "ICE" in train_name
-                    or "IC" in train_name
-                    or "EC" in train_name
-                    or "TGV" in train_name
-                ):
-                    api_classes_to_process = ["ICE"]
-                elif "RE" in train_name:
-                    api_classes_to_process = ["RE"]
-                elif "RB" in train_name:
-                    api_classes_to_process = ["RB"]
-                elif "S " in train_name or "S1" in train_name or "S2" in train_name:
-                    api_classes_to_process = ["S"]
-                else:
-                    api_classes_to_process = [""]
-            else:
-                api_classes_to_process = train_classes
-
-            # Normalize the train classes from the API using the mapping.
-            mapped_api_classes = {
-                TRAIN_TYPE_MAPPING.get(tc, tc) for tc in api_classes_to_process
-            }
+            # Normalize the train classes, inferring them from the name if missing.
+            mapped_api_classes = classify_train(departure)
 
             # Update the departure data with the normalized, more descriptive train classes.
             departure["trainClasses"] = list(mapped_api_classes)
 
             # Filter if any of the departure's train classes are in the ignored list.
-            if mapped_ignored_train_types and not mapped_api_classes.isdisjoint(
-                mapped_ignored_train_types
-            ):
+            if not mapped_api_classes.isdisjoint(self.ignored_train_classes):
                 _LOGGER.debug(
                     "Ignoring departure due to train class. Mapped classes: %s",
                     mapped_api_classes,
@@ -1363,7 +1444,13 @@ class DBInfoScreenCoordinator(DataUpdateCoordinator[list[dict[str, Any]]]):
             if wagon_order_data:
                 # If it's a list, it's the detailed structure
                 if isinstance(wagon_order_data, list):
-                    wagon_info = self._process_wagon_order(wagon_order_data)
+                    wagon_info = self._wagon_order_cache.get(
+                        departure.get("trainId")
+                        or departure.get("tripId")
+                        or departure.get("train"),
+                        wagon_order_data,
+                        self._process_wagon_order,
+                    )
                     if wagon_info:
                         departure["wagon_order_html"] = wagon_info.get("text")
                         departure["wagon_order_structured"] = wagon_info.get(
@@ -1393,23 +1480,10 @@ class DBInfoScreenCoordinator(DataUpdateCoordinator[list[dict[str, Any]]]):
                                 msg_texts.append(msg.get("text", ""))
 
             for text in msg_texts:
-                lower_text = text.lower()
-                if ("wlan" in lower_text or "wifi" in lower_text) and (
-                    "nicht" in lower_text
-                    or "gestört" in lower_text
-                    or "ausfall" in lower_text
-                    or "defekt" in lower_text
-                ):
+                classification = classify_message(text)
+                if classification.wifi_broken:
                     facilities["wifi"] = False
-                if (
-                    "bistro" in lower_text
-                    or "restaurant" in lower_text
-                    or "catering" in lower_text
-                ) and (
-                    "nicht" in lower_text
-                    or "gestört" in lower_text
-                    or "geschlossen" in lower_text
-                ):
+                if classification.bistro_closed:
                     facilities["bistro"] = False
 
             if facilities:
@@ -1454,7 +1528,9 @@ class DBInfoScreenCoordinator(DataUpdateCoordinator[list[dict[str, Any]]]):
             arrival_time_adjusted = None
             if scheduled_arrival is not None:
                 # Use robust centralized parsing
-                arrival_time = parse_datetime_flexible(scheduled_arrival, now)
+                arrival_time = parse_datetime_flexible(
+                    scheduled_arrival, now, time_format
+                )
 
                 if arrival_time:
                     arrival_delay = int(delay_arrival)
@@ -1535,12 +1611,11 @@ class DBInfoScreenCoordinator(DataUpdateCoordinator[list[dict[str, Any]]]):
 
             departure_seconds = (effective_departure_time - now).total_seconds()
             if departure_seconds >= self.offset:
-                # Compute size with candidate included
-                # We do this by serializing iteratively and checking size.
+                # Compute size with candidate included.
+                # Sizes are cached per departure across updates and only
+                # measured exactly for new items or close to the limit.
                 try:
-                    # Serialize just this item
-                    item_json = json.dumps(departure, default=simple_serializer)
-                    item_size = len(item_json)
+                    item_size = self._size_estimator.size(departure, current_size)
 
                     # Calculate overhead: comma separator if list is not empty
                     overhead = 1 if filtered_departures else 0
@@ -1558,11 +1633,18 @@ class DBInfoScreenCoordinator(DataUpdateCoordinator[list[dict[str, Any]]]):
 
                     filtered_departures.append(departure)
                     current_size += item_size + overhead
+                    item_sizes[id(departure)] = item_size
 
                 except (TypeError, ValueError) as e:
                     _LOGGER.error("Failed to serialize departure for size check: %s", e)
                     continue
 
+        self._size_estimator.end_update()
+        self._wagon_order_cache.end_update()
+
+        # Watched trains may be anywhere on the board, not only the visible part
+        self._check_watched_trips(departures_to_process)
+        self.attributes_size = current_size
         _LOGGER.debug(
             "Number of departures added to the filtered list: %d",
             len(filtered_departures),
@@ -1572,34 +1654,7 @@ class DBInfoScreenCoordinator(DataUpdateCoordinator[list[dict[str, Any]]]):
         # For each departure, find other trains going to the same destination
         # that depart later. This helps users find backup options.
         if self.detailed and len(filtered_departures) > 1:
-            for i, dep in enumerate(filtered_departures):
-                dest_search: str | None = dep.get("destination")
-                if not dest_search:
-                    continue
-
-                alternatives = []
-                for j, other_dep in enumerate(filtered_departures):
-                    if i == j:
-                        continue
-                    if other_dep.get("destination") == dest_search:
-                        # Only include if it departs later
-                        my_time = dep.get("departure_timestamp")
-                        other_time = other_dep.get("departure_timestamp")
-                        if my_time and other_time and other_time > my_time:
-                            alternatives.append(
-                                {
-                                    "train": other_dep.get("train"),
-                                    "scheduledDeparture": other_dep.get(
-                                        "scheduledDeparture"
-                                    ),
-                                    "platform": other_dep.get("platform"),
-                                }
-                            )
-
-                if alternatives:
-                    dep["alternative_connections"] = list(alternatives)[
-                        :3
-                    ]  # Limit to 3
+            add_alternative_connections(filtered_departures)
 
         # Punctuality Statistics
         # We track history for ALL departures that passed deduplication,
@@ -1625,8 +1680,12 @@ class DBInfoScreenCoordinator(DataUpdateCoordinator[list[dict[str, Any]]]):
             )
 
         if filtered_departures:
-            # Cache the visible ones if available
-            self._last_valid_value = list(filtered_departures)
+            # Per trip changes of the whole board since the last update, not
+            # only of the part that fits the attributes, optionally fired as
+            # events. Skipped below when the update falls back to cached data.
+            self.departure_changes = self._departure_diff.update(departures_to_process)
+            if self.change_events:
+                self._fire_departure_changes(self.departure_changes)
 
             # Real-time Connection Tracking
             if self.tracked_connections:
@@ -1657,133 +1716,142 @@ class DBInfoScreenCoordinator(DataUpdateCoordinator[list[dict[str, Any]]]):
                                 "target_delay": next_dep.get("delayDeparture"),
                                 "transfer_station": change_station,
                             }
+                            self._notify_connection_change(
+                                my_train_id, conn_config, dep["connection_info"]
+                            )
 
-            return list(filtered_departures)[: int(self.next_departures)]
+            departures = self._paginate(
+                list(filtered_departures)[: int(self.next_departures)], item_sizes
+            )
+            self._build_render_models(departures, now)
+            # Fallbacks return this list, which page_bounds and the render
+            # models describe
+            self._last_valid_value = departures
+            return departures
         else:
             _LOGGER.warning(
                 "Departures fetched but all were filtered out. Using cached data."
             )
             return self._last_valid_value or []
 
-    async def _check_watched_trips(self, departures):
-        """Check for important updates on watched trains and send notifications."""
-        if not self.watched_trips:
-            return
-
-        to_remove = []
-
-        for train_id_to_watch, watch_config in self.watched_trips.items():
-            # Find the trip in current departures
-            trip_found = None
-            for dep in departures:
-                if (
-                    dep.get("train") == train_id_to_watch
-                    or dep.get("trip_id") == train_id_to_watch
-                ):
-                    trip_found = dep
-                    break
-
-            if not trip_found:
-                # Increment missed counter
-                # watch_config should not be None here as it comes from keys()
-                missed = int(watch_config.get("missed_update_count") or 0) + 1
-                watch_config["missed_update_count"] = missed
-                if missed >= 3:
-                    to_remove.append(train_id_to_watch)
-                continue
-
-            # Found it, reset counter
-            watch_config["missed_update_count"] = 0
-
-            delay = (
-                trip_found.get("delay")
-                if "delay" in trip_found
-                else trip_found.get("delayDeparture", 0)
+    def _fire_departure_changes(self, changes: list[DepartureChange]) -> None:
+        """Fire one event per departure change on the Home Assistant bus."""
+        entry_id = self.config_entry.entry_id if self.config_entry else None
+        for change in changes:
+            self.hass.bus.async_fire(
+                change.event_type,
+                {"entry_id": entry_id, "station": self.station, **change.data},
             )
-            platform = trip_found.get("platform")
-            is_cancelled = (
-                trip_found.get("is_cancelled")
-                if "is_cancelled" in trip_found
-                else (
-                    trip_found.get("cancelled", False)
-                    or trip_found.get("isCancelled", False)
-                )
-            )
-            destination = trip_found.get("destination")
-
-            notify = False
-            message = f"Update for {trip_found.get('train')} to {destination}: "
 
-            # 1. Check Delay
-            try:
-                if watch_config is not None:
-                    delay_int = int(delay) if delay else 0
-                    current_threshold = watch_config.get("delay_threshold")
-                    threshold = int(
-                        current_threshold if current_threshold is not None else 0
-                    )
-                    last_delay = watch_config.get("last_notified_delay")
-                    if delay_int >= threshold and delay_int != last_delay:
-                        notify = True
-                        message += f"Delay is now {delay_int} min. "
-                        watch_config["last_notified_delay"] = delay_int
-            except (ValueError, TypeError):
-                pass
-
-            # 2. Check Platform
-            if (
-                watch_config["notify_on_platform_change"]
-                and platform
-                and platform != watch_config["last_notified_platform"]
-            ):
-                if watch_config["last_notified_platform"] is not None:
-                    notify = True
-                    message += f"Platform changed to {platform}. "
-                watch_config["last_notified_platform"] = platform
-
-            # 3. Check Cancellation
-            if (
-                watch_config["notify_on_cancellation"]
-                and is_cancelled
-                and not watch_config["last_notified_cancellation"]
-            ):
-                notify = True
-                message += "Train is CANCELLED! "
-                watch_config["last_notified_cancellation"] = True
-
-            if notify:
-                try:
-                    if watch_config is None or not watch_config.get("notify_service"):
-                        raise ValueError("No notify service configured")
+    def _build_render_models(
+        self, departures: list[dict[str, Any]], now: datetime
+    ) -> None:
+        """
+        Precompute the display values the entities show for each departure.
 
-                    if "." not in str(watch_config["notify_service"]):
-                        raise ValueError("Invalid notify service format (missing '.')")
+        Departures without a trip key, or sharing one, get no model and are
+        rendered by the entities themselves.
+        """
+        text_template = self._text_template if self.enable_text_view else None
+        keys = Counter(trip_key(departure) for departure in departures)
+        self.render_models = {
+            key: build_departure_render(departure, now, self.admode, text_template)
+            for departure in departures
+            if (key := trip_key(departure)) is not None and keys[key] == 1
+        }
 
-                    service_parts = str(watch_config["notify_service"]).split(".")
-                    domain = service_parts[0]
-                    service = ".".join(service_parts[1:])
+    def _first_page_extras_size(self) -> int:
+        """Return the serialized size of the attributes only the first page has."""
+        extras: dict[str, Any] = {}
+        if self.station_messages:
+            extras["station_messages"] = self.station_messages
+        if self.duplicate_counts:
+            extras["duplicates_removed"] = self.duplicate_counts
+        if not extras:
+            return 0
+        try:
+            return len(json_dumps_bytes(extras))
+        except (TypeError, ValueError):
+            return 0
 
-                    if not domain or not service:
-                        raise ValueError(
-                            "Invalid notify service format (empty domain or service)"
-                        )
+    def _paginate(
+        self, departures: list[dict[str, Any]], item_sizes: dict[int, int]
+    ) -> list[dict[str, Any]]:
+        """Split the visible departures into pages below the attribute limit.
 
-                    await self.hass.services.async_call(
-                        domain, service, {"message": message, "title": "🚆 DB Watcher"}
-                    )
+        Pages are consecutive slices of the returned list, stored as
+        ``(start, end)`` index pairs in ``page_bounds``. Departures that do
+        not fit into the last page are dropped.
+        """
+        bounds: list[tuple[int, int]] = []
+        start = 0
+        # The first page also carries the station messages and duplicates
+        page_size = 2 + self._first_page_extras_size()
+        for index, departure in enumerate(departures):
+            item_size = item_sizes.get(id(departure), 0) + 1
+            if index > start and page_size + item_size > MAX_ATTRIBUTES_SIZE:
+                bounds.append((start, index))
+                if len(bounds) == self.departure_pages:
                     _LOGGER.info(
-                        "Sent notification for trip %s: %s", train_id_to_watch, message
-                    )
-                except Exception as e:  # noqa: BLE001
-                    _LOGGER.error(
-                        "Failed to send notification for trip %s: %s",
-                        train_id_to_watch,
-                        e,
+                        "Departures exceed %d page(s) for entry: %s. Dropping %d departure(s).",
+                        self.departure_pages,
+                        self.station,
+                        len(departures) - index,
                     )
+                    self.page_bounds = bounds
+                    return departures[:index]
+                start = index
+                page_size = 2
+            page_size += item_size
+        bounds.append((start, len(departures)))
+        self.page_bounds = bounds
+        return departures
+
+    @property
+    def watched_trips(self) -> dict[str, dict[str, Any]]:
+        """Return the watched trains, shared by all config entries."""
+        return self._watch_registry.watches
+
+    @callback
+    def _check_watched_trips(self, departures: list[dict[str, Any]]) -> None:
+        """Check watched trains on the board and queue their notifications."""
+        for train_id, watch, message in self._watch_registry.async_evaluate(
+            departures, dt_util.now()
+        ):
+            self._notifications.async_enqueue(
+                watch.get("notify_service"), train_id, message
+            )
 
-        for train_id in to_remove:
-            _LOGGER.debug("Removing stale watch for %s", train_id)
-            self.watched_trips.pop(train_id, None)
+    @callback
+    def _notify_connection_change(
+        self,
+        my_train_id: str,
+        conn_config: dict[str, Any],
+        connection_info: dict[str, Any],
+    ) -> None:
+        """Queue a notification if the connecting train's delay or platform changed."""
+        notify_service = conn_config.get("notify_service")
+        if not notify_service:
+            return
+        status = (connection_info["target_delay"], connection_info["target_platform"])
+        last_status = conn_config.get("last_notified_status")
+        conn_config["last_notified_status"] = status
+        if last_status is None:
+            # Only a delay is worth a message on the first sighting
+            try:
+                if not int(status[0] or 0) > 0:
+                    return
+            except (ValueError, TypeError):
+                return
+        elif tuple(last_status) == status:
+            return
+        self._notifications.async_enqueue(
+            notify_service,
+            f"connection {my_train_id}",
+            f"Connection {connection_info['target_train']} at "
+            f"{connection_info['transfer_station']}: delay {status[0] or 0} min, "
+            f"platform {status[1]}.",
+        )
 
     async def _get_train_departure_at_station(self, station, train_id):
         """
@@ -1824,7 +1892,7 @@ class DBInfoScreenCoordinator(DataUpdateCoordinator[list[dict[str, Any]]]):
                     # Handle both sync and async raise_for_status for better test compatibility
                     response.raise_for_status()
 
-                    data = await response.json()
+                    data = await response.json(loads=json_loads)
                     # Fallback for some mock environments where json() returns a coroutine
                     if asyncio.iscoroutine(data) or (
                         hasattr(data, "__await__")
@@ -1857,14 +1925,9 @@ class DBInfoScreenCoordinator(DataUpdateCoordinator[list[dict[str, Any]]]):
         Used to calculate percentage-based punctuality metrics in sensors.
         """
         now_utc = datetime.now(timezone.utc)
-        threshold_24h = now_utc - timedelta(hours=24)
 
         # 1. Purge old history
-        self.departure_history = {
-            tid: data
-            for tid, data in self.departure_history.items()
-            if data["timestamp"] > threshold_24h
-        }
+        self.departure_history.expire(now_utc)
 
         # 2. Record/Update current departures
         for dep in departures:
@@ -1932,17 +1995,45 @@ class DBInfoScreenCoordinator(DataUpdateCoordinator[list[dict[str, Any]]]):
                 or dep.get("isCancelled")
             )
 
-            self.departure_history[history_key] = {
-                "train": train,
-                "timestamp": (
-                    dt_util.utc_from_timestamp(timestamp)
-                    if isinstance(timestamp, (int, float))
-                    else now_utc
-                ),
-                "delay": delay_val,
-                "delay_arrival": dep.get("delay_arrival", 0),
-                "is_cancelled": is_cancelled_val,
-            }
+            self.departure_history.record(
+                history_key,
+                {
+                    "train": train,
+                    "timestamp": (
+                        dt_util.utc_from_timestamp(timestamp)
+                        if isinstance(timestamp, (int, float))
+                        else now_utc
+                    ),
+                    "delay": delay_val,
+                    "delay_arrival": dep.get("delay_arrival", 0),
+                    "is_cancelled": is_cancelled_val,
+                    "line": dep.get("line") or train,
+                },
+            )
+
+        # 3. Roll up the trains that have departed since the last update
+        departed = self.departure_history.departed(now_utc)
+        self.punctuality_rollups.async_add(departed, now_utc)
+        self.delay_quantiles.add(departed, now_utc)
+        if "recorder" in self.hass.config.components:
+            async_import_hourly_statistics(
+                self.hass,
+                self.punctuality_rollups,
+                self.config_entry.entry_id,
+                self.station,
+                now_utc,
+            )
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Count the update and notify the entities."""
+        self.update_count += 1
+        super().async_update_listeners()
+
+    async def async_shutdown(self) -> None:
+        """Cancel updates and write the pending punctuality rollups."""
+        await super().async_shutdown()
+        await self.punctuality_rollups.async_save()
 
     def _handle_update_error(self, error_message: str) -> None:
         """Register a data fetch error and check for stale data issues."""
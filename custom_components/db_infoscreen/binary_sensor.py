@@ -3,7 +3,6 @@
 from __future__ import annotations
 
 import logging
-import re
 from typing import Any, cast
 
 from homeassistant.components.binary_sensor import (
@@ -16,7 +15,8 @@ from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import DOMAIN
-from .entity import DBInfoScreenBaseEntity
+from .entity import DBInfoScreenBaseEntity, cached_per_update
+from .utils import build_facility_issues, index_facility_issues
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -90,6 +90,7 @@ class DBInfoScreenDelayBinarySensor(DBInfoScreenBaseBinarySensor):
         self._attr_icon = "mdi:clock-alert"
 
     @property
+    @cached_per_update
     def is_on(self) -> bool:
         """Return True if any train is delayed."""
         departures: list[dict[str, Any]] = cast(
@@ -105,6 +106,7 @@ class DBInfoScreenDelayBinarySensor(DBInfoScreenBaseBinarySensor):
         return False
 
     @property
+    @cached_per_update
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return additional attributes about delays."""
         departures: list[dict[str, Any]] = cast(
@@ -153,6 +155,7 @@ class DBInfoScreenCancellationBinarySensor(DBInfoScreenBaseBinarySensor):
         self._attr_icon = "mdi:train-car-passenger-door"
 
     @property
+    @cached_per_update
     def is_on(self) -> bool:
         """Return True if any train is cancelled."""
         departures: list[dict[str, Any]] = cast(
@@ -164,6 +167,7 @@ class DBInfoScreenCancellationBinarySensor(DBInfoScreenBaseBinarySensor):
         return False
 
     @property
+    @cached_per_update
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return additional attributes about cancellations."""
         departures: list[dict[str, Any]] = cast(
@@ -195,6 +199,7 @@ class DBInfoScreenConnectionBinarySensor(DBInfoScreenBaseBinarySensor):
     _attr_entity_category = EntityCategory.DIAGNOSTIC
     _attr_has_entity_name = True
     _attr_entity_registry_enabled_default = False  # Disabled by default
+    _volatile_attributes = frozenset({"last_successful_update"})
 
     def __init__(self, coordinator, config_entry: ConfigEntry) -> None:
         """Initialize the connection sensor."""
@@ -204,6 +209,7 @@ class DBInfoScreenConnectionBinarySensor(DBInfoScreenBaseBinarySensor):
         self._attr_icon = "mdi:api"
 
     @property
+    @cached_per_update
     def is_on(self) -> bool:
         """Return True if connection is healthy."""
         return (
@@ -213,6 +219,7 @@ class DBInfoScreenConnectionBinarySensor(DBInfoScreenBaseBinarySensor):
         )
 
     @property
+    @cached_per_update
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return connection details."""
         last_update = getattr(self.coordinator, "last_update", None)
@@ -242,6 +249,7 @@ class DBInfoScreenPausedBinarySensor(DBInfoScreenBaseBinarySensor):
         self._attr_icon = "mdi:pause-circle-outline"
 
     @property
+    @cached_per_update
     def is_on(self) -> bool:
         """Return True if updates are paused."""
         return getattr(self.coordinator, "paused", False)
@@ -291,23 +299,21 @@ class DBInfoScreenElevatorBinarySensor(DBInfoScreenBaseBinarySensor):
         super()._handle_coordinator_update()
 
     @property
+    @cached_per_update
     def is_on(self) -> bool:
         """Return True if a relevant issue is found."""
         return len(self._issues) > 0
 
-    def _compute_issues(self) -> list[str]:
-        """Parse departures for relevant elevator issues."""
-        issues = set()
-        keywords = ["aufzug", "aufzüge", "fahrstuhl", "lift", "rolltreppe"]
-        working_keywords = [
-            "in betrieb",
-            "ok",
-            "behoben",
-            "funktioniert wieder",
-            "verfügbar",
-        ]
+    def _compute_issues(self) -> list[dict[str, Any]]:
+        """Return the elevator issues relevant for this sensor."""
+        # Use the issue index prebuilt by the coordinator if available
+        all_issues = getattr(self.coordinator, "elevator_issues", None)
+        by_platform = getattr(self.coordinator, "elevator_issues_by_platform", None)
+        if isinstance(all_issues, list) and isinstance(by_platform, dict):
+            if self.platform_filter:
+                return by_platform.get(self.platform_filter, [])
+            return all_issues
 
-        # Use pre-extracted raw elevator issues from coordinator if available
         raw_issues = getattr(self.coordinator, "raw_elevator_issues", None)
         if isinstance(raw_issues, list):
             texts = raw_issues
@@ -328,50 +334,19 @@ class DBInfoScreenElevatorBinarySensor(DBInfoScreenBaseBinarySensor):
                                 elif isinstance(m, str):
                                     texts.append(m)
 
-        for text in texts:
-            lower_text = text.lower()
-            if any(k in lower_text for k in keywords):
-                if any(wk in lower_text for wk in working_keywords):
-                    continue
-
-                is_relevant = False
-                if self.platform_filter:
-                    match = re.search(r"(?:gleis|bahnsteig)\s*(\d+)", lower_text)
-                    if match:
-                        if match.group(1) == self.platform_filter:
-                            is_relevant = True
-                    else:
-                        is_relevant = False
-                else:
-                    is_relevant = True
-
-                if is_relevant:
-                    issues.add(text)
-
-        return sorted(issues)
+        issues = build_facility_issues(texts)
+        if self.platform_filter:
+            return index_facility_issues(issues).get(self.platform_filter, [])
+        return issues
 
     @property
+    @cached_per_update
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return details about elevator issues."""
-        issues = self._issues
-        defective_facilities = []
-        for text in issues:
-            lower_text = text.lower()
-            facility_type = "escalator" if "rolltreppe" in lower_text else "elevator"
-
-            platform = None
-            match = re.search(r"(?:gleis|bahnsteig)\s*(\d+)", lower_text)
-            if match:
-                platform = match.group(1)
-
-            defective_facilities.append(
-                {
-                    "facility_type": facility_type,
-                    "platform": platform,
-                    "text": text,
-                    "status": "defective",
-                }
-            )
+        issues = [issue["text"] for issue in self._issues]
+        defective_facilities = [
+            {**issue, "status": "defective"} for issue in self._issues
+        ]
 
         return {
             "issues": issues,
@@ -13,8 +13,13 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.util import dt as dt_util
 
 from .const import DOMAIN
-from .entity import DBInfoScreenBaseEntity
-from .utils import parse_datetime_flexible
+from .entity import DBInfoScreenBaseEntity, cached_per_update
+from .utils import (
+    format_calendar_summary,
+    parse_delay_minutes,
+    scheduled_departure_time,
+    trip_key,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -49,6 +54,7 @@ class DBInfoScreenCalendar(DBInfoScreenBaseEntity, CalendarEntity):
         self._attr_icon = "mdi:calendar-clock"
 
     @property
+    @cached_per_update
     def event(self) -> CalendarEvent | None:
         """Return the next upcoming event."""
         now = dt_util.now()
@@ -89,11 +95,19 @@ class DBInfoScreenCalendar(DBInfoScreenBaseEntity, CalendarEntity):
         event_duration = getattr(self.coordinator, "calendar_event_duration", 5)
         only_favorites = getattr(self.coordinator, "calendar_only_favorites", False)
         only_delayed = getattr(self.coordinator, "calendar_only_delayed", False)
+        render_models = getattr(self.coordinator, "render_models", None)
+        if not isinstance(render_models, dict):
+            render_models = {}
 
         for departure in departures:
             try:
-                # Extract departure time
-                departure_time = self._parse_departure_time(departure, now)
+                # Extract departure time, precomputed by the coordinator
+                render = render_models.get(trip_key(departure))
+                departure_time = (
+                    render.scheduled_time
+                    if render is not None
+                    else self._parse_departure_time(departure, now)
+                )
                 if not departure_time:
                     continue
 
@@ -107,15 +121,7 @@ class DBInfoScreenCalendar(DBInfoScreenBaseEntity, CalendarEntity):
                 cancelled = departure.get("is_cancelled", False)
 
                 # Parse delay
-                try:
-                    delay_int = (
-                        int(delay)
-                        if delay is not None
-                        and (str(delay).isdigit() or isinstance(delay, (int, float)))
-                        else 0
-                    )
-                except (ValueError, TypeError):
-                    delay_int = 0
+                delay_int = parse_delay_minutes(delay)
 
                 # 1. Filter: Only Delayed Trains
                 if only_delayed and delay_int <= 0:
@@ -147,9 +153,11 @@ class DBInfoScreenCalendar(DBInfoScreenBaseEntity, CalendarEntity):
                 actual_start_time = actual_departure_time - timedelta(minutes=walk_time)
                 end_time = actual_departure_time + timedelta(minutes=event_duration)
 
-                delay_str = f" (+{delay_int}min)" if delay_int > 0 else ""
-                cancelled_str = " ⚠️ CANCELLED" if cancelled else ""
-                summary = f"{line} → {destination}{delay_str}{cancelled_str}"
+                summary = (
+                    render.calendar_summary
+                    if render is not None
+                    else format_calendar_summary(departure)
+                )
 
                 # Build description with details
                 description_parts = [
@@ -211,13 +219,4 @@ class DBInfoScreenCalendar(DBInfoScreenBaseEntity, CalendarEntity):
         self, departure: dict[str, Any], now: datetime
     ) -> datetime | None:
         """Parse departure time using centralized logic."""
-        departure_time_str = (
-            departure.get("scheduledDeparture")
-            or departure.get("sched_dep")
-            or departure.get("scheduledArrival")
-            or departure.get("sched_arr")
-            or departure.get("scheduledTime")
-            or departure.get("dep")
-            or departure.get("datetime")
-        )
-        return parse_datetime_flexible(departure_time_str, now)
+        return scheduled_departure_time(departure, now)
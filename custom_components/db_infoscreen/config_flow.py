@@ -24,9 +24,12 @@ from .const import (
     CONF_CALENDAR_EVENT_DURATION,
     CONF_CALENDAR_ONLY_DELAYED,
     CONF_CALENDAR_ONLY_FAVORITES,
+    CONF_CHANGE_EVENTS,
     CONF_DATA_SOURCE,
+    CONF_DECODE_HORIZON,
     CONF_DEDUPLICATE_DEPARTURES,
     CONF_DEDUPLICATE_KEY,
+    CONF_DEPARTURE_PAGES,
     CONF_DETAILED,
     CONF_DIRECTION,
     CONF_DROP_LATE_TRAINS,
@@ -43,26 +46,37 @@ from .const import (
     CONF_PAST_60_MINUTES,
     CONF_PAUSED,
     CONF_PLATFORMS,
+    CONF_PUNCTUALITY_THRESHOLD,
+    CONF_RECORDING_PROFILE,
     CONF_SERVER_TYPE,
     CONF_SERVER_URL,
     CONF_SHOW_OCCUPANCY,
     CONF_STATION,
     CONF_TEXT_VIEW_TEMPLATE,
     CONF_UPDATE_INTERVAL,
+    CONF_VIA_MATCH_BY_ID,
     CONF_VIA_STATIONS,
     CONF_VIA_STATIONS_LOGIC,
     CONF_WALK_TIME,
     DATA_SOURCE_OPTIONS,
     DEFAULT_CACHE_TTL,
     DEFAULT_CALENDAR_EVENT_DURATION,
+    DEFAULT_DECODE_HORIZON,
     DEFAULT_DEDUPLICATE_KEY,
+    DEFAULT_DEPARTURE_PAGES,
     DEFAULT_NEXT_DEPARTURES,
     DEFAULT_OFFSET,
+    DEFAULT_PUNCTUALITY_THRESHOLD,
     DEFAULT_TEXT_VIEW_TEMPLATE,
     DEFAULT_UPDATE_INTERVAL,
     DOMAIN,
     IGNORED_TRAINTYPES_OPTIONS,
+    MAX_DECODE_HORIZON,
+    MAX_DEPARTURE_PAGES,
+    MAX_PUNCTUALITY_THRESHOLD,
     MAX_SENSORS,
+    RECORDING_PROFILE_FULL,
+    RECORDING_PROFILES,
     SERVER_TYPE_CUSTOM,
     SERVER_TYPE_FASERF,
     SERVER_TYPE_OFFICIAL,
@@ -1270,6 +1284,14 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                             CONF_CACHE_TTL, DEFAULT_CACHE_TTL
                         ),
                     ): cv.positive_int,
+                    vol.Optional(
+                        CONF_DECODE_HORIZON,
+                        default=self._get_config_value(
+                            CONF_DECODE_HORIZON, DEFAULT_DECODE_HORIZON
+                        ),
+                    ): vol.All(
+                        vol.Coerce(int), vol.Range(min=0, max=MAX_DECODE_HORIZON)
+                    ),
                     vol.Optional(
                         CONF_OFFSET,
                         default=self._get_config_value(CONF_OFFSET, DEFAULT_OFFSET),
@@ -1278,6 +1300,19 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                         CONF_PAUSED,
                         default=self._get_config_value(CONF_PAUSED, False),
                     ): cv.boolean,
+                    vol.Optional(
+                        CONF_CHANGE_EVENTS,
+                        default=self._get_config_value(CONF_CHANGE_EVENTS, False),
+                    ): cv.boolean,
+                    vol.Optional(
+                        CONF_PUNCTUALITY_THRESHOLD,
+                        default=self._get_config_value(
+                            CONF_PUNCTUALITY_THRESHOLD, DEFAULT_PUNCTUALITY_THRESHOLD
+                        ),
+                    ): vol.All(
+                        vol.Coerce(int),
+                        vol.Range(min=0, max=MAX_PUNCTUALITY_THRESHOLD),
+                    ),
                     vol.Optional(
                         CONF_WALK_TIME,
                         default=self._get_config_value(CONF_WALK_TIME, 0),
@@ -1445,6 +1480,7 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                 vol.Optional(CONF_PLATFORMS): cv.string,
                 vol.Optional(CONF_VIA_STATIONS): cv.string,
                 vol.Optional(CONF_VIA_STATIONS_LOGIC): vol.In(["OR", "AND"]),
+                vol.Optional(CONF_VIA_MATCH_BY_ID): cv.boolean,
                 vol.Optional(CONF_DIRECTION): cv.string,
                 vol.Optional(CONF_EXCLUDED_DIRECTIONS): cv.string,
                 vol.Optional(CONF_IGNORED_TRAINTYPES): cv.multi_select(
@@ -1465,6 +1501,9 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                     CONF_VIA_STATIONS_LOGIC: self._get_config_value(
                         CONF_VIA_STATIONS_LOGIC, "OR"
                     ),
+                    CONF_VIA_MATCH_BY_ID: self._get_config_value(
+                        CONF_VIA_MATCH_BY_ID, False
+                    ),
                     CONF_DIRECTION: self._get_config_value(CONF_DIRECTION, ""),
                     CONF_EXCLUDED_DIRECTIONS: self._get_config_value(
                         CONF_EXCLUDED_DIRECTIONS, ""
@@ -1517,6 +1556,20 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                         CONF_SHOW_OCCUPANCY,
                         default=self._get_config_value(CONF_SHOW_OCCUPANCY, False),
                     ): cv.boolean,
+                    vol.Optional(
+                        CONF_DEPARTURE_PAGES,
+                        default=self._get_config_value(
+                            CONF_DEPARTURE_PAGES, DEFAULT_DEPARTURE_PAGES
+                        ),
+                    ): vol.All(
+                        vol.Coerce(int), vol.Range(min=1, max=MAX_DEPARTURE_PAGES)
+                    ),
+                    vol.Optional(
+                        CONF_RECORDING_PROFILE,
+                        default=self._get_config_value(
+                            CONF_RECORDING_PROFILE, RECORDING_PROFILE_FULL
+                        ),
+                    ): vol.In(RECORDING_PROFILES),
                 }
             ),
         )
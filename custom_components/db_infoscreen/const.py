@@ -4,6 +4,9 @@ CONF_SERVER_TYPE = "server_type"
 CONF_SERVER_URL = "server_url"
 CONF_CACHE_TTL = "cache_ttl"
 DEFAULT_CACHE_TTL = 55
+CONF_DECODE_HORIZON = "decode_horizon"
+DEFAULT_DECODE_HORIZON = 0  # minutes, 0 decodes the whole response
+MAX_DECODE_HORIZON = 1440
 SERVER_TYPE_CUSTOM = "custom"
 SERVER_TYPE_OFFICIAL = "official"
 SERVER_TYPE_FASERF = "faserf"
@@ -17,6 +20,9 @@ DEFAULT_NEXT_DEPARTURES = 4
 DEFAULT_UPDATE_INTERVAL = 3
 MIN_UPDATE_INTERVAL = 0
 MAX_SENSORS = 30
+CONF_DEPARTURE_PAGES = "departure_pages"
+DEFAULT_DEPARTURE_PAGES = 1
+MAX_DEPARTURE_PAGES = 5
 
 CONF_HIDE_LOW_DELAY = "hidelowdelay"
 CONF_DETAILED = "detailed"
@@ -28,6 +34,7 @@ CONF_PLATFORMS = "platforms"
 CONF_ADMODE = "admode"
 CONF_VIA_STATIONS = "via_stations"
 CONF_VIA_STATIONS_LOGIC = "via_stations_logic"
+CONF_VIA_MATCH_BY_ID = "via_match_by_id"
 CONF_DIRECTION = "direction"
 CONF_EXCLUDED_DIRECTIONS = "excluded_directions"
 CONF_IGNORED_TRAINTYPES = "ignored_train_types"
@@ -50,6 +57,21 @@ CONF_CALENDAR_EVENT_DURATION = "calendar_event_duration"
 CONF_CALENDAR_ONLY_FAVORITES = "calendar_only_favorites"
 CONF_CALENDAR_ONLY_DELAYED = "calendar_only_delayed"
 DEFAULT_CALENDAR_EVENT_DURATION = 5
+CONF_CHANGE_EVENTS = "change_events"
+CONF_PUNCTUALITY_THRESHOLD = "punctuality_threshold"
+DEFAULT_PUNCTUALITY_THRESHOLD = 5  # minutes, later trains count as delayed
+MAX_PUNCTUALITY_THRESHOLD = 60
+CONF_RECORDING_PROFILE = "recording_profile"
+RECORDING_PROFILE_FULL = "full"
+RECORDING_PROFILE_LEAN = "lean"
+RECORDING_PROFILES = [RECORDING_PROFILE_FULL, RECORDING_PROFILE_LEAN]
+
+# Events fired on the Home Assistant bus when a departure changes
+EVENT_DEPARTURE_ADDED = "db_infoscreen_departure_added"
+EVENT_DEPARTURE_REMOVED = "db_infoscreen_departure_removed"
+EVENT_DELAY_CHANGED = "db_infoscreen_delay_changed"
+EVENT_PLATFORM_CHANGED = "db_infoscreen_platform_changed"
+EVENT_CANCELLATION_CHANGED = "db_infoscreen_cancellation_changed"
 
 TRAIN_TYPE_MAPPING = {
     "S": "s_bahn",
@@ -77,6 +99,23 @@ TRAIN_TYPE_MAPPING = {
     "Unbekannter Zugtyp": "unknown",
 }
 
+# Substrings of the (uppercased) train name used to infer the class when the
+# API sends none. Rules are checked in order and the first match wins.
+TRAIN_NAME_CLASS_RULES: tuple[tuple[tuple[str, ...], str], ...] = (
+    (("ICE", "IC", "EC", "TGV"), "ICE"),
+    (("RE",), "RE"),
+    (("RB",), "RB"),
+    (("S ", "S1", "S2"), "S"),
+)
+
+# Extra class names some data sources use for an ignored train type option.
+IGNORED_TRAINTYPES_ALIASES: dict[str, tuple[str, ...]] = {
+    "S": ("S-Bahn", "s_bahn"),
+    "StadtBus": ("MetroBus", "bus"),
+    "F": ("Fernverkehr", "long_distance"),
+    "N": ("Regionalverkehr", "regional_db"),
+}
+
 DATA_SOURCE_MAP = {
     "AVV – Aachener Verkehrsverbund": "hafas=AVV",
     "AVV – Augsburger Verkehrs- & Tarifverbund": "efa=AVV",
@@ -0,0 +1,44 @@
+"""Diagnostics support for DB Infoscreen."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .notifications import async_get_notification_dispatcher
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, config_entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+    last_update = getattr(coordinator, "last_update", None)
+    counts: dict[str, dict[str, int]] = getattr(coordinator, "state_write_counts", {})
+    notifications = async_get_notification_dispatcher(hass)
+
+    return {
+        "entry": {
+            "data": dict(config_entry.data),
+            "options": dict(config_entry.options),
+        },
+        "coordinator": {
+            "api_url": getattr(coordinator, "api_url", None),
+            "server_version": getattr(coordinator, "server_version", None),
+            "last_update": last_update.isoformat() if last_update else None,
+            "departures": len(coordinator.data or []),
+            "attributes_size": getattr(coordinator, "attributes_size", 0),
+        },
+        "state_writes": {
+            "written": sum(c["written"] for c in counts.values()),
+            "skipped": sum(c["skipped"] for c in counts.values()),
+            "entities": counts,
+        },
+        "notifications": {
+            **notifications.stats,
+            "pending": notifications.pending,
+        },
+    }
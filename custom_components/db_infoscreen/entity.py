@@ -2,15 +2,49 @@
 
 from __future__ import annotations
 
+import functools
+import hashlib
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+from homeassistant.core import callback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
+from .utils import json_dumps_bytes
+
+_T = TypeVar("_T")
+
+
+def cached_per_update(func: Callable[[Any], _T]) -> Callable[[Any], _T]:
+    """
+    Compute a property once per coordinator update.
+
+    Within ``_handle_coordinator_update`` the state digest and the state
+    write read the same properties, the value is computed for the first and
+    reused for the second. Outside of it the property is computed as usual.
+    """
+
+    @functools.wraps(func)
+    def wrapper(self: DBInfoScreenBaseEntity) -> _T:
+        memo = self._update_memo
+        if memo is None:
+            return func(self)
+        name = func.__name__
+        if name not in memo:
+            memo[name] = func(self)
+        return memo[name]
+
+    return wrapper
 
 
 class DBInfoScreenBaseEntity(CoordinatorEntity):
     """Base entity class for DB Infoscreen."""
 
     _attr_has_entity_name = True
+    # Attributes that change on every update without new information, e.g.
+    # timestamps. They do not trigger a state write on their own.
+    _volatile_attributes: frozenset[str] = frozenset()
 
     def __init__(self, coordinator, config_entry):
         """Initialize the entity."""
@@ -20,6 +54,12 @@ class DBInfoScreenBaseEntity(CoordinatorEntity):
         self.station = config_entry.options.get(
             "station", config_entry.data.get("station", "Unknown")
         )
+        # Digest of the last state written on a coordinator update
+        self._state_digest: bytes | None = None
+        # Values of cached_per_update properties while handling an update
+        self._update_memo: dict[str, Any] | None = None
+        self.state_writes = 0
+        self.skipped_state_writes = 0
 
     @property
     def device_info(self):
@@ -41,3 +81,61 @@ class DBInfoScreenBaseEntity(CoordinatorEntity):
             if hasattr(self.coordinator, "last_update_success")
             else False
         )
+
+    def _compute_state_digest(self) -> bytes | None:
+        """Return a digest of everything a state write would publish."""
+        extra = self.extra_state_attributes
+        if extra and self._volatile_attributes:
+            extra = {
+                key: value
+                for key, value in extra.items()
+                if key not in self._volatile_attributes
+            }
+        try:
+            payload = json_dumps_bytes(
+                (
+                    self.available,
+                    self.state,
+                    self.state_attributes,
+                    extra,
+                    self.icon,
+                )
+            )
+        except (TypeError, ValueError):
+            return None
+        return hashlib.blake2b(payload, digest_size=16).digest()
+
+    def _count_state_write(self, skipped: bool) -> None:
+        """Update the write counters of the entity and the coordinator."""
+        if skipped:
+            self.skipped_state_writes += 1
+        else:
+            self.state_writes += 1
+        counts = getattr(self.coordinator, "state_write_counts", None)
+        if isinstance(counts, dict):
+            entity_counts = counts.setdefault(
+                self.unique_id or self.entity_id or str(id(self)),
+                {"written": 0, "skipped": 0},
+            )
+            entity_counts["skipped" if skipped else "written"] += 1
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state, writes outside of updates invalidate the digest."""
+        self._state_digest = None
+        super().async_write_ha_state()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Only write the state if the entity's output changed."""
+        self._update_memo = {}
+        try:
+            digest = self._compute_state_digest()
+            if digest is not None and digest == self._state_digest:
+                self._count_state_write(skipped=True)
+                return
+            super()._handle_coordinator_update()
+        finally:
+            self._update_memo = None
+        self._state_digest = digest
+        self._count_state_write(skipped=False)
@@ -0,0 +1,487 @@
+"""Departure history for the punctuality statistics."""
+
+from __future__ import annotations
+
+import logging
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator, Mapping
+from datetime import datetime
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DEFAULT_PUNCTUALITY_THRESHOLD, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+# Length of the statistics window, one ring slot per minute
+HISTORY_WINDOW_MINUTES = 24 * 60
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 300  # seconds, the rollups change with every departed train
+# Rollup window -> (bucket length in seconds, number of buckets). Older data
+# is kept at a coarser resolution.
+ROLLUP_TIERS: dict[str, tuple[int, int]] = {
+    "1h": (5 * 60, 12),
+    "24h": (60 * 60, 24),
+    "7d": (6 * 60 * 60, 28),
+    "30d": (24 * 60 * 60, 30),
+}
+
+
+def _minute(timestamp: datetime) -> int:
+    """Return the minute since the epoch a timestamp falls into."""
+    return int(timestamp.timestamp()) // 60
+
+
+def punctuality_stats(
+    total: int, delayed: int, cancelled: int, delay_sum: int
+) -> dict[str, Any]:
+    """Return the punctuality statistics of a set of departures."""
+    not_cancelled = total - cancelled
+    on_time = not_cancelled - delayed
+    return {
+        "punctuality_percent": (
+            round((on_time / total) * 100, 1) if total > 0 else 100.0
+        ),
+        "total_trains": total,
+        "delayed_trains": delayed,
+        "cancelled_trains": cancelled,
+        "average_delay": (
+            round(delay_sum / not_cancelled, 1) if not_cancelled > 0 else 0.0
+        ),
+    }
+
+
+class DepartureHistory(Mapping[str, dict[str, Any]]):
+    """
+    The last 24 hours of departures, keyed by trip.
+
+    Entries sit in a ring of per-minute slots by their scheduled time. Totals
+    are kept up to date as entries are recorded and expire, so reading the
+    statistics does not walk the entries, and expiring only touches the slots
+    that fell out of the window since the last update.
+    """
+
+    def __init__(
+        self,
+        window_minutes: int = HISTORY_WINDOW_MINUTES,
+        delay_threshold: int = DEFAULT_PUNCTUALITY_THRESHOLD,
+    ) -> None:
+        """Initialize an empty history."""
+        self._window = window_minutes
+        self.delay_threshold = delay_threshold
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._entry_minutes: dict[str, int] = {}
+        # Slot ``minute % window`` holds the keys of that minute
+        self._slots: list[set[str]] = [set() for _ in range(window_minutes)]
+        self._slot_minutes: list[int | None] = [None] * window_minutes
+        # All minutes up to this one have been expired
+        self._expired_until: int | None = None
+        # Keys handed out by departed(), and the minute it has reached
+        self._departed: set[str] = set()
+        self._departed_until: int | None = None
+        self._late: list[str] = []
+        self.total = 0
+        self.delayed = 0
+        self.cancelled = 0
+        self.delay_sum = 0
+
+    def __getitem__(self, key: str) -> dict[str, Any]:
+        return self._entries[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _count(self, entry: dict[str, Any], sign: int) -> None:
+        """Add an entry to the totals, or remove it with ``sign=-1``."""
+        self.total += sign
+        if entry["is_cancelled"]:
+            self.cancelled += sign
+            return
+        self.delay_sum += sign * entry["delay"]
+        if entry["delay"] > self.delay_threshold:
+            self.delayed += sign
+
+    def _remove(self, key: str) -> None:
+        """Remove an entry from its slot and the totals."""
+        entry = self._entries.pop(key)
+        minute = self._entry_minutes.pop(key)
+        self._slots[minute % self._window].discard(key)
+        self._count(entry, -1)
+
+    def _clear_slot(self, slot: int) -> None:
+        """Remove all entries of a slot for good."""
+        for key in list(self._slots[slot]):
+            self._remove(key)
+            self._departed.discard(key)
+        self._slot_minutes[slot] = None
+
+    def _slot_range(self, start: int | None, end: int) -> Iterable[int]:
+        """Return the slots of the minutes after ``start`` up to ``end``."""
+        if start is None or end - start >= self._window:
+            return range(self._window)
+        return (minute % self._window for minute in range(start + 1, end + 1))
+
+    def expire(self, now: datetime) -> None:
+        """Remove the entries scheduled 24 hours or more before ``now``."""
+        cutoff = _minute(now) - self._window
+        if self._expired_until is not None and cutoff <= self._expired_until:
+            return
+        for slot in self._slot_range(self._expired_until, cutoff):
+            slot_minute = self._slot_minutes[slot]
+            if slot_minute is not None and slot_minute <= cutoff:
+                self._clear_slot(slot)
+        self._expired_until = cutoff
+
+    def record(self, key: str, entry: dict[str, Any]) -> None:
+        """Record the latest status of a departure, replacing an older one."""
+        minute = _minute(entry["timestamp"])
+        if self._expired_until is not None and minute <= self._expired_until:
+            # Already outside of the window
+            return
+        if key in self._entries:
+            self._remove(key)
+        elif self._departed_until is not None and minute <= self._departed_until:
+            # Seen for the first time after its departure
+            self._late.append(key)
+
+        slot = minute % self._window
+        if self._slot_minutes[slot] != minute:
+            # The slot still holds a minute a full window away, which can
+            # only happen for departures scheduled more than a day ahead
+            self._clear_slot(slot)
+            self._slot_minutes[slot] = minute
+        self._slots[slot].add(key)
+        self._entries[key] = entry
+        self._entry_minutes[key] = minute
+        self._count(entry, 1)
+
+    def departed(self, now: datetime) -> list[dict[str, Any]]:
+        """
+        Return the entries scheduled before the current minute, each once.
+
+        The status of a train when its departure time has passed is taken as
+        final, later updates of it are not returned again.
+        """
+        end = _minute(now) - 1
+        keys = self._late
+        self._late = []
+        if self._departed_until is None or end > self._departed_until:
+            for slot in self._slot_range(self._departed_until, end):
+                slot_minute = self._slot_minutes[slot]
+                if slot_minute is not None and slot_minute <= end:
+                    keys.extend(self._slots[slot])
+            self._departed_until = end
+
+        departed = []
+        for key in keys:
+            if key in self._entries and key not in self._departed:
+                self._departed.add(key)
+                departed.append(self._entries[key])
+        return departed
+
+    def stats(self) -> dict[str, Any]:
+        """Return the punctuality statistics of the window."""
+        return punctuality_stats(
+            self.total, self.delayed, self.cancelled, self.delay_sum
+        )
+
+
+def _new_aggregate() -> list[int]:
+    """Return an empty ``[total, delayed, cancelled, delay_sum]`` aggregate."""
+    return [0, 0, 0, 0]
+
+
+def _add_aggregate(target: list[int], values: list[int], sign: int = 1) -> None:
+    """Add an aggregate to another, or subtract it with ``sign=-1``."""
+    for index, value in enumerate(values):
+        target[index] += sign * value
+
+
+class _RollupTier:
+    """Fixed length buckets of one rollup window with running totals."""
+
+    def __init__(self, bucket_seconds: int, bucket_count: int) -> None:
+        """Initialize a tier without data."""
+        self.bucket_seconds = bucket_seconds
+        self.bucket_count = bucket_count
+        # Bucket start -> [all, {line: aggregate}, {hour of day: aggregate}]
+        self.buckets: dict[int, list[Any]] = {}
+        self.totals: list[Any] = [_new_aggregate(), {}, {}]
+        # Start of the oldest bucket in the window as of the last expire()
+        self.cutoff = 0
+
+    def _apply(self, target: list[Any], bucket: list[Any], sign: int) -> None:
+        """Add all aggregates of a bucket to ``target``."""
+        _add_aggregate(target[0], bucket[0], sign)
+        for index in (1, 2):
+            breakdown = target[index]
+            for group, values in bucket[index].items():
+                aggregate = breakdown.setdefault(group, _new_aggregate())
+                _add_aggregate(aggregate, values, sign)
+                if not aggregate[0]:
+                    del breakdown[group]
+
+    def add(self, timestamp: int, line: str, hour: str, values: list[int]) -> None:
+        """Count one departure in the bucket of its timestamp."""
+        start = timestamp - timestamp % self.bucket_seconds
+        if start < self.cutoff:
+            return
+        bucket = self.buckets.get(start)
+        if bucket is None:
+            bucket = self.buckets[start] = [_new_aggregate(), {}, {}]
+        single = [values, {line: values}, {hour: values}]
+        self._apply(bucket, single, 1)
+        self._apply(self.totals, single, 1)
+
+    def expire(self, now: int) -> bool:
+        """Drop the buckets that left the window, return whether any did."""
+        current = now - now % self.bucket_seconds
+        self.cutoff = current - (self.bucket_count - 1) * self.bucket_seconds
+        expired = [start for start in self.buckets if start < self.cutoff]
+        for start in expired:
+            self._apply(self.totals, self.buckets.pop(start), -1)
+        return bool(expired)
+
+    def restore(self, buckets: list[list[Any]]) -> None:
+        """Load persisted ``[start, all, lines, hours]`` buckets."""
+        for start, *bucket in buckets:
+            self.buckets[int(start)] = bucket
+            self._apply(self.totals, bucket, 1)
+
+
+class PunctualityRollups:
+    """
+    Punctuality of departed trains over 1 hour, 24 hours, 7 days and 30 days.
+
+    Each window is kept as a few buckets with running totals, overall and per
+    line and hour of day, so only aggregates are kept, never single trains.
+    The buckets are saved per config entry and survive a restart.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        delay_threshold: int = DEFAULT_PUNCTUALITY_THRESHOLD,
+    ) -> None:
+        """Initialize empty rollups."""
+        self.hass = hass
+        self.delay_threshold = delay_threshold
+        self.tiers = {
+            name: _RollupTier(bucket_seconds, bucket_count)
+            for name, (bucket_seconds, bucket_count) in ROLLUP_TIERS.items()
+        }
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}_punctuality_{entry_id}"
+        )
+        self._save_pending = False
+        # Long-term statistics: hours up to this start are imported, and the
+        # running total of the imported cancellations
+        self.statistics_imported_until = 0
+        self.cancelled_sum = 0
+
+    async def async_load(self) -> None:
+        """Load the persisted buckets."""
+        try:
+            stored = await self._store.async_load()
+        except Exception as err:  # noqa: BLE001
+            _LOGGER.warning("Failed to load punctuality rollups: %s", err)
+            return
+        if not stored or not isinstance(stored.get("tiers"), dict):
+            return
+        self.statistics_imported_until = stored.get("statistics_imported_until", 0)
+        self.cancelled_sum = stored.get("cancelled_sum", 0)
+        if stored.get("delay_threshold") != self.delay_threshold:
+            # Counts of delayed trains do not convert to another threshold
+            _LOGGER.info("Delay threshold changed, starting new punctuality rollups")
+            return
+        for name, tier in self.tiers.items():
+            tier.restore(stored["tiers"].get(name, []))
+        self.expire(dt_util.utcnow())
+
+    @callback
+    def async_add(self, entries: list[dict[str, Any]], now: datetime) -> None:
+        """Count departed trains and save the result later."""
+        changed = self.expire(now)
+        for entry in entries:
+            timestamp = entry["timestamp"]
+            if entry["is_cancelled"]:
+                values = [1, 0, 1, 0]
+            else:
+                delay = entry["delay"]
+                values = [1, int(delay > self.delay_threshold), 0, delay]
+            line = str(entry.get("line") or entry["train"])
+            hour = str(dt_util.as_local(timestamp).hour)
+            for tier in self.tiers.values():
+                tier.add(int(timestamp.timestamp()), line, hour, values)
+            changed = True
+        if changed:
+            self.async_schedule_save()
+
+    def expire(self, now: datetime) -> bool:
+        """Drop buckets that left their window, return whether any did."""
+        timestamp = int(now.timestamp())
+        expired = [tier.expire(timestamp) for tier in self.tiers.values()]
+        return any(expired)
+
+    def stats(self, window: str) -> dict[str, Any]:
+        """Return the punctuality statistics of a window."""
+        return punctuality_stats(*self.tiers[window].totals[0])
+
+    def line_stats(self, window: str) -> dict[str, dict[str, Any]]:
+        """Return the punctuality statistics of a window per line."""
+        return {
+            line: punctuality_stats(*values)
+            for line, values in sorted(self.tiers[window].totals[1].items())
+        }
+
+    def hour_stats(self, window: str) -> dict[int, dict[str, Any]]:
+        """Return the punctuality statistics of a window per hour of day."""
+        return {
+            int(hour): punctuality_stats(*values)
+            for hour, values in sorted(
+                self.tiers[window].totals[2].items(), key=lambda item: int(item[0])
+            )
+        }
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Save the buckets after a delay, batching many updates."""
+        self._save_pending = True
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    async def async_save(self) -> None:
+        """Write a scheduled save right away."""
+        if self._save_pending:
+            await self._store.async_save(self._data_to_save())
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the buckets as compact lists."""
+        self._save_pending = False
+        return {
+            "delay_threshold": self.delay_threshold,
+            "statistics_imported_until": self.statistics_imported_until,
+            "cancelled_sum": self.cancelled_sum,
+            "tiers": {
+                name: [[start, *bucket] for start, bucket in tier.buckets.items()]
+                for name, tier in self.tiers.items()
+            },
+        }
+
+
+# Lower edges of the delay histogram bins in minutes: one minute wide up to
+# half an hour, then coarser. The last bin takes everything above.
+DELAY_BIN_EDGES: tuple[int, ...] = (
+    *range(30),
+    *range(30, 60, 5),
+    *range(60, 120, 10),
+    120,
+)
+QUANTILES: dict[str, float] = {"p50": 0.5, "p90": 0.9, "p99": 0.99}
+# Older trains count half as much for every day that passed
+QUANTILE_HALF_LIFE = 24 * 60 * 60
+# Lines with their own histogram, further lines only count for the station
+MAX_QUANTILE_LINES = 50
+MIN_LINE_WEIGHT = 0.01
+
+
+class DelayHistogram:
+    """Delay counts in fixed bins, so the memory does not grow with trains."""
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        self.counts = [0.0] * len(DELAY_BIN_EDGES)
+        self.total = 0.0
+
+    def add(self, delay: int) -> None:
+        """Count one delay, early trains count as on time."""
+        self.counts[max(bisect_right(DELAY_BIN_EDGES, delay) - 1, 0)] += 1
+        self.total += 1
+
+    def scale(self, factor: float) -> None:
+        """Multiply all counts by a factor."""
+        self.counts = [count * factor for count in self.counts]
+        self.total *= factor
+
+    def quantile(self, q: float) -> int | None:
+        """Return the lower edge of the bin holding the ``q`` quantile."""
+        if self.total <= 0:
+            return None
+        target = q * self.total
+        cumulative = 0.0
+        for edge, count in zip(DELAY_BIN_EDGES, self.counts, strict=True):
+            cumulative += count
+            if cumulative >= target:
+                return edge
+        return DELAY_BIN_EDGES[-1]
+
+    def quantiles(self) -> dict[str, int | None]:
+        """Return the p50, p90 and p99 delay."""
+        return {name: self.quantile(q) for name, q in QUANTILES.items()}
+
+
+class DelayQuantiles:
+    """
+    Streaming delay percentiles of departed trains, per station and per line.
+
+    Each histogram has a fixed number of bins and at most
+    ``MAX_QUANTILE_LINES`` lines are tracked, so the memory stays the same no
+    matter how many trains depart. Counts decay with a half-life of a day to
+    follow the recent situation.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty histograms."""
+        self.station = DelayHistogram()
+        self.lines: dict[str, DelayHistogram] = {}
+        self._decayed_at: float | None = None
+
+    def _decay(self, now: datetime) -> None:
+        """Age the counts to ``now``."""
+        timestamp = now.timestamp()
+        if self._decayed_at is not None and timestamp > self._decayed_at:
+            factor = 0.5 ** ((timestamp - self._decayed_at) / QUANTILE_HALF_LIFE)
+            self.station.scale(factor)
+            for line, histogram in list(self.lines.items()):
+                histogram.scale(factor)
+                if histogram.total < MIN_LINE_WEIGHT:
+                    # Not seen for about a week, make room for other lines
+                    del self.lines[line]
+        self._decayed_at = timestamp
+
+    def add(self, entries: list[dict[str, Any]], now: datetime) -> None:
+        """Count the delays of departed, not cancelled trains."""
+        if not entries:
+            return
+        self._decay(now)
+        for entry in entries:
+            if entry["is_cancelled"]:
+                continue
+            delay = entry["delay"]
+            self.station.add(delay)
+            line = str(entry.get("line") or entry["train"])
+            histogram = self.lines.get(line)
+            if histogram is None:
+                if len(self.lines) >= MAX_QUANTILE_LINES:
+                    continue
+                histogram = self.lines[line] = DelayHistogram()
+            histogram.add(delay)
+
+    def line_quantiles(self) -> dict[str, dict[str, int | None]]:
+        """Return the p50, p90 and p99 delay per line."""
+        return {
+            line: histogram.quantiles()
+            for line, histogram in sorted(self.lines.items())
+        }
+
+
+async def async_remove_rollups(hass: HomeAssistant, entry_id: str) -> None:
+    """Delete the persisted rollups of a config entry."""
+    await PunctualityRollups(hass, entry_id)._store.async_remove()
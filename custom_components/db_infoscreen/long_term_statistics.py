@@ -0,0 +1,119 @@
+"""Hourly punctuality figures as long-term statistics of the recorder."""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.components.recorder.models import (
+    StatisticData,
+    StatisticMeanType,
+    StatisticMetaData,
+)
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+)
+from homeassistant.const import PERCENTAGE, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .history import PunctualityRollups, punctuality_stats
+
+_LOGGER = logging.getLogger(__name__)
+
+# Wait this long after an hour ended, trains first seen late still count
+IMPORT_DELAY = timedelta(minutes=10)
+HOURLY_WINDOW = "24h"
+
+
+def statistic_id(entry_id: str, name: str) -> str:
+    """Return the external statistic ID of a figure of a config entry."""
+    return f"{DOMAIN}:{entry_id.lower()}_{name}"
+
+
+def _metadata(
+    entry_id: str, station: str, name: str, label: str, unit: str, has_sum: bool
+) -> StatisticMetaData:
+    """Return the metadata of one statistic."""
+    return {
+        "has_mean": not has_sum,
+        "mean_type": (
+            StatisticMeanType.NONE if has_sum else StatisticMeanType.ARITHMETIC
+        ),
+        "has_sum": has_sum,
+        "name": f"{station} {label}",
+        "source": DOMAIN,
+        "statistic_id": statistic_id(entry_id, name),
+        "unit_of_measurement": unit,
+    }
+
+
+@callback
+def async_import_hourly_statistics(
+    hass: HomeAssistant,
+    rollups: PunctualityRollups,
+    entry_id: str,
+    station: str,
+    now: datetime,
+) -> int:
+    """
+    Add the finished hours of the rollups to the long-term statistics.
+
+    Imports the mean delay, the on-time share and the number of cancellations
+    of every hour not imported yet, and returns the number of hours imported.
+    """
+    tier = rollups.tiers[HOURLY_WINDOW]
+    last_hour = int((now - IMPORT_DELAY).timestamp()) // 3600 * 3600 - 3600
+    if last_hour <= rollups.statistics_imported_until:
+        return 0
+
+    mean_delay: list[StatisticData] = []
+    on_time: list[StatisticData] = []
+    cancellations: list[StatisticData] = []
+    for start in sorted(tier.buckets):
+        if not rollups.statistics_imported_until < start <= last_hour:
+            continue
+        total, delayed, cancelled, delay_sum = tier.buckets[start][0]
+        if not total:
+            continue
+        start_time = dt_util.utc_from_timestamp(start)
+        stats: dict[str, Any] = punctuality_stats(total, delayed, cancelled, delay_sum)
+        if total > cancelled:
+            mean_delay.append({"start": start_time, "mean": stats["average_delay"]})
+        on_time.append({"start": start_time, "mean": stats["punctuality_percent"]})
+        rollups.cancelled_sum += cancelled
+        cancellations.append(
+            {"start": start_time, "state": cancelled, "sum": rollups.cancelled_sum}
+        )
+    rollups.statistics_imported_until = last_hour
+    rollups.async_schedule_save()
+
+    for metadata, statistics in (
+        (
+            _metadata(
+                entry_id,
+                station,
+                "mean_delay",
+                "mean delay",
+                UnitOfTime.MINUTES,
+                False,
+            ),
+            mean_delay,
+        ),
+        (
+            _metadata(entry_id, station, "on_time", "on time", PERCENTAGE, False),
+            on_time,
+        ),
+        (
+            _metadata(entry_id, station, "cancellations", "cancellations", None, True),
+            cancellations,
+        ),
+    ):
+        if statistics:
+            async_add_external_statistics(hass, metadata, statistics)
+    _LOGGER.debug(
+        "Imported %d hours of punctuality statistics for %s", len(on_time), station
+    )
+    return len(on_time)
@@ -0,0 +1,181 @@
+"""Batched, rate limited notifications for watched trains and connections."""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HassJob, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_NOTIFICATION_DISPATCHER = f"{DOMAIN}_notification_dispatcher"
+NOTIFICATION_TITLE = "🚆 DB Watcher"
+# Changes within this many seconds are sent as one message
+COALESCE_WINDOW = 30
+# At most one message per notify service within this many seconds
+MIN_SEND_INTERVAL = 60
+# Pending messages per notify service, the oldest are dropped beyond that
+MAX_QUEUE_SIZE = 20
+
+
+def split_notify_service(notify_service: Any) -> tuple[str, str]:
+    """Split ``notify.mobile_app_x`` into domain and service."""
+    if not notify_service:
+        raise ValueError("No notify service configured")
+    if "." not in str(notify_service):
+        raise ValueError("Invalid notify service format (missing '.')")
+    domain, _, service = str(notify_service).partition(".")
+    if not domain or not service:
+        raise ValueError("Invalid notify service format (empty domain or service)")
+    return domain, service
+
+
+class NotificationDispatcher:
+    """
+    Queue notifications per notify service and send them in batches.
+
+    Messages are keyed, typically by train, and are either a text or a mapping
+    of message parts joined in order. A newer message for a key that is still
+    queued is merged into the older one: parts of the same name are replaced,
+    others are kept. So a flapping delay (5, 6, 7 min) ends up as a single
+    line that still reports a platform change queued in between. A queue is flushed ``COALESCE_WINDOW`` seconds
+    after its first message, but never sooner than ``MIN_SEND_INTERVAL``
+    seconds after the last message to the same service.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coalesce_window: float = COALESCE_WINDOW,
+        min_send_interval: float = MIN_SEND_INTERVAL,
+        max_queue_size: int = MAX_QUEUE_SIZE,
+    ) -> None:
+        """Initialize the dispatcher without pending messages."""
+        self.hass = hass
+        self.coalesce_window = coalesce_window
+        self.min_send_interval = min_send_interval
+        self.max_queue_size = max_queue_size
+        # notify service -> key -> message parts, in insertion order
+        self._queues: dict[str, dict[str, dict[str, str]]] = {}
+        self._timers: dict[str, CALLBACK_TYPE] = {}
+        self._last_sent: dict[str, float] = {}
+        self.stats = {
+            "queued": 0,
+            "coalesced": 0,
+            "dropped": 0,
+            "deferred": 0,
+            "sent": 0,
+            "failed": 0,
+        }
+
+    @property
+    def pending(self) -> int:
+        """Return the number of queued messages."""
+        return sum(len(queue) for queue in self._queues.values())
+
+    @callback
+    def async_enqueue(
+        self,
+        notify_service: str | None,
+        key: str,
+        message: str | Mapping[str, str],
+    ) -> None:
+        """Queue a message, merging it into a queued one with the same key."""
+        try:
+            split_notify_service(notify_service)
+        except ValueError as err:
+            self.stats["failed"] += 1
+            _LOGGER.error("Cannot send notification for %s: %s", key, err)
+            return
+        parts = {"": message} if isinstance(message, str) else dict(message)
+        queue = self._queues.setdefault(notify_service, {})
+        if key in queue:
+            # Move the key to the end, the newest state of each part wins
+            parts = {**queue.pop(key), **parts}
+            self.stats["coalesced"] += 1
+        elif len(queue) >= self.max_queue_size:
+            dropped = next(iter(queue))
+            del queue[dropped]
+            self.stats["dropped"] += 1
+            _LOGGER.warning(
+                "Notification queue for %s is full, dropped the message for %s",
+                notify_service,
+                dropped,
+            )
+        queue[key] = parts
+        self.stats["queued"] += 1
+
+        if notify_service not in self._timers:
+            self._schedule(notify_service, self.coalesce_window)
+
+    @callback
+    def _schedule(self, notify_service: str, delay: float) -> None:
+        """Flush the queue of a notify service after a delay."""
+        last_sent = self._last_sent.get(notify_service)
+        if last_sent is not None:
+            wait = last_sent + self.min_send_interval - dt_util.now().timestamp()
+            if wait > delay:
+                self.stats["deferred"] += 1
+                delay = wait
+
+        @callback
+        def _flush_later(_now: datetime) -> None:
+            self._timers.pop(notify_service, None)
+            self.hass.async_create_background_task(
+                self.async_flush(notify_service),
+                f"{DOMAIN} notification {notify_service}",
+            )
+
+        self._timers[notify_service] = async_call_later(
+            self.hass, delay, HassJob(_flush_later, cancel_on_shutdown=True)
+        )
+
+    async def async_flush(self, notify_service: str | None = None) -> None:
+        """Send the queued messages now, of one notify service or of all."""
+        services = (
+            [notify_service] if notify_service is not None else list(self._queues)
+        )
+        for service in services:
+            if cancel := self._timers.pop(service, None):
+                cancel()
+            queue = self._queues.pop(service, None)
+            if queue:
+                await self._async_send(
+                    service,
+                    "\n".join(
+                        "".join(parts.values()).strip() for parts in queue.values()
+                    ),
+                )
+
+    async def _async_send(self, notify_service: str, message: str) -> None:
+        """Send one message through a notify service."""
+        self._last_sent[notify_service] = dt_util.now().timestamp()
+        try:
+            domain, service = split_notify_service(notify_service)
+            await self.hass.services.async_call(
+                domain, service, {"message": message, "title": NOTIFICATION_TITLE}
+            )
+        except Exception as err:  # noqa: BLE001
+            self.stats["failed"] += 1
+            _LOGGER.error("Failed to send notification via %s: %s", notify_service, err)
+            return
+        self.stats["sent"] += 1
+        _LOGGER.info("Sent notification via %s: %s", notify_service, message)
+
+
+@callback
+def async_get_notification_dispatcher(hass: HomeAssistant) -> NotificationDispatcher:
+    """Return the notification dispatcher shared by all config entries."""
+    dispatcher = hass.data.get(DATA_NOTIFICATION_DISPATCHER)
+    if not isinstance(dispatcher, NotificationDispatcher):
+        dispatcher = hass.data[DATA_NOTIFICATION_DISPATCHER] = NotificationDispatcher(
+            hass
+        )
+    return dispatcher
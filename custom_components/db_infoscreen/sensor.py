@@ -8,14 +8,24 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.util import dt as dt_util
 
 from .const import (
+    CONF_DEPARTURE_PAGES,
     CONF_ENABLE_TEXT_VIEW,
     CONF_TEXT_VIEW_TEMPLATE,
     CONF_WALK_TIME,
+    DEFAULT_DEPARTURE_PAGES,
     DEFAULT_TEXT_VIEW_TEMPLATE,
     DOMAIN,
+    RECORDING_PROFILE_FULL,
+    RECORDING_PROFILE_LEAN,
+)
+from .entity import DBInfoScreenBaseEntity, cached_per_update
+from .history import ROLLUP_TIERS
+from .utils import (
+    DepartureRender,
+    build_departure_render,
+    compile_text_template,
+    trip_key,
 )
-from .entity import DBInfoScreenBaseEntity
-from .utils import parse_datetime_flexible
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -31,6 +41,16 @@ class DBInfoSensor(DBInfoScreenBaseEntity, SensorEntity):
     """
 
     _attr_has_entity_name = True
+    _volatile_attributes = frozenset({"last_updated"})
+    # Served through the get_departures service, too big for every state row
+    _unrecorded_attributes = frozenset(
+        {
+            "next_departures",
+            "next_departures_text",
+            "station_messages",
+            "duplicates_removed",
+        }
+    )
 
     def __init__(
         self,
@@ -41,33 +61,57 @@ class DBInfoSensor(DBInfoScreenBaseEntity, SensorEntity):
         direction,
         platforms,
         enable_text_view,
+        page=0,
+        pages=1,
     ):
-        """Initialize the sensor."""
+        """Initialize the sensor.
+
+        With ``pages`` > 1 the sensor only shows the slice ``page`` (0-based)
+        of the coordinator's paged departure list.
+        """
         super().__init__(coordinator, config_entry)
         self.via_stations = via_stations
         self.direction = direction
         self.platforms = platforms
         self.enable_text_view = enable_text_view
+        self.page = page
+        self.pages = pages
 
         platforms_suffix_name = f" platform {platforms}" if platforms else ""
         via_suffix_name = f" via {' '.join(via_stations)}" if via_stations else ""
         direction_suffix_name = f" direction {self.direction}" if self.direction else ""
+        page_suffix_name = f" page {page + 1}" if page else ""
 
         # Entity name
         self._attr_translation_key = "departures"
         self._attr_name = (
             f"Departures{platforms_suffix_name}{via_suffix_name}{direction_suffix_name}"
         )
+        if page_suffix_name:
+            self._attr_name = (
+                self._attr_name[: MAX_LENGTH - len(page_suffix_name)] + page_suffix_name
+            )
 
         if len(self._attr_name) > MAX_LENGTH:
             self._attr_name = self._attr_name[:MAX_LENGTH]
 
         # Unique ID
         self._attr_unique_id = f"db_infoscreen_{config_entry.entry_id}"
+        if page:
+            self._attr_unique_id += f"_page_{page + 1}"
         self._attr_icon = "mdi:train"
 
+        # Text view template, resolved like the coordinator does (options over data)
+        template = getattr(coordinator, "text_view_template", None)
+        if not isinstance(template, str):
+            conf = {**config_entry.data, **config_entry.options}
+            template = conf.get(CONF_TEXT_VIEW_TEMPLATE, DEFAULT_TEXT_VIEW_TEMPLATE)
+        self._text_template = compile_text_template(template)
+
         # Initial value
         self._last_valid_value = None
+        # Attributes built for the current coordinator data, see extra_state_attributes
+        self._attributes_cache: tuple[tuple[Any, int], dict[str, Any]] | None = None
 
         _LOGGER.debug(
             "DBInfoSensor initialized for station: %s, via_stations: %s, direction: %s, unique_id: %s, name: %s",
@@ -78,22 +122,23 @@ class DBInfoSensor(DBInfoScreenBaseEntity, SensorEntity):
             self._attr_name,
         )
 
-    def format_departure_time(self, departure_time: Any) -> str | None:
-        """Format a departure time using centralized robust parsing."""
-        if departure_time is None:
-            return None
-
-        now = dt_util.now()
-        today = now.date()
+    def _render(self, departure: dict[str, Any]) -> DepartureRender:
+        """Return the display values of a departure.
 
-        dt_val = parse_datetime_flexible(departure_time, now)
-
-        if not dt_val:
-            return None
-
-        if dt_val.date() != today:
-            return dt_val.strftime("%Y-%m-%d %H:%M")
-        return dt_val.strftime("%H:%M")
+        Uses the render model the coordinator built for the current data and
+        only computes the values here if it has none for this departure.
+        """
+        render_models = getattr(self.coordinator, "render_models", None)
+        if isinstance(render_models, dict):
+            render = render_models.get(trip_key(departure))
+            if render is not None:
+                return render
+        return build_departure_render(
+            departure,
+            dt_util.now(),
+            getattr(self.coordinator, "admode", "preferred departure"),
+            self._text_template if self.enable_text_view else None,
+        )
 
     def _get_filtered_departures(self):
         """
@@ -104,6 +149,13 @@ class DBInfoSensor(DBInfoScreenBaseEntity, SensorEntity):
         raw_departures: list[dict[str, Any]] = cast(
             list[dict[str, Any]], self.coordinator.data or []
         )
+        if self.pages > 1:
+            page_bounds = getattr(self.coordinator, "page_bounds", None) or []
+            if self.page < len(page_bounds):
+                start, end = page_bounds[self.page]
+                raw_departures = raw_departures[start:end]
+            else:
+                raw_departures = []
         # 1. Time filtering (keep future and very recent past trains)
         filtered = [
             dep
@@ -121,6 +173,7 @@ class DBInfoSensor(DBInfoScreenBaseEntity, SensorEntity):
         return filtered
 
     @property
+    @cached_per_update
     def native_value(self) -> str | None:
         """
         Return the main state of the sensor (e.g., '10:30' or '10:30 +5').
@@ -139,53 +192,12 @@ class DBInfoSensor(DBInfoScreenBaseEntity, SensorEntity):
         # Check if there is data and if it is valid
         if main_departure:
             try:
-                # Try to get the scheduled departure time
-                departure_time = (
-                    main_departure.get("scheduledDeparture")
-                    or main_departure.get("sched_dep")
-                    or main_departure.get("scheduledArrival")
-                    or main_departure.get("sched_arr")
-                    or main_departure.get("scheduledTime")
-                    or main_departure.get("dep")
-                    or main_departure.get("datetime")
-                )
-
-                # Use normalized fields from coordinator
-                delay_departure = main_departure.get("delay", 0)
-
-                _LOGGER.debug("Raw departure time: %s", departure_time)
-
-                # Use the admode from coordinator to determine the display format
-                admode = getattr(self.coordinator, "admode", "preferred departure")
-
-                if admode == "preferred departure":
-                    # For preferred departure, show actual time (scheduled + delay)
-                    # departure_timestamp already includes the delay
-                    actual_time = main_departure.get("departure_timestamp")
-                    departure_time = self.format_departure_time(actual_time)
-
-                    if departure_time is None:
-                        _LOGGER.debug(
-                            "Formatted departure time is None, skipping update."
-                        )
-                        return self._last_valid_value or "invalid_time"
-
-                    self._last_valid_value = departure_time
-                else:
-                    # For "departure" and "arrival" modes, show scheduled time + delay notation
-                    departure_time = self.format_departure_time(departure_time)
-                    if departure_time is None:
-                        _LOGGER.debug(
-                            "Formatted departure time is None, skipping update."
-                        )
-                        return self._last_valid_value or "invalid_time"
-
-                    if delay_departure in (0, None, "None"):
-                        self._last_valid_value = departure_time
-                    else:
-                        departure_time = f"{departure_time} +{delay_departure}"
-                        self._last_valid_value = departure_time
+                departure_time = self._render(main_departure).state
+                if departure_time is None:
+                    _LOGGER.debug("Formatted departure time is None, skipping update.")
+                    return self._last_valid_value or "invalid_time"
 
+                self._last_valid_value = departure_time
                 _LOGGER.debug("Sensor state updated: %s", self._last_valid_value)
                 return self._last_valid_value
             except Exception as e:  # noqa: BLE001
@@ -209,31 +221,40 @@ class DBInfoSensor(DBInfoScreenBaseEntity, SensorEntity):
                 return "no_data"
 
     @property
+    @cached_per_update
     def extra_state_attributes(self) -> dict[str, Any]:
         """
         Return additional state attributes for the sensor including next departures and metadata.
+
+        The result is built once per coordinator update and reused until the
+        next update or until a departure drops out of the time window.
         """
+        raw_departures: list[dict[str, Any]] = self._get_filtered_departures()
+        cache_key = (
+            getattr(self.coordinator, "update_count", None),
+            len(raw_departures),
+        )
+        if self._attributes_cache and self._attributes_cache[0] == cache_key:
+            return self._attributes_cache[1]
+
         full_api_url = getattr(self.coordinator, "_base_url", "dbf.finalrewind.org")
         attribution = f"Data provided by API {full_api_url}"
 
-        # Create a deep copy or new list of dicts to avoid mutating the coordinator data
-        raw_departures: list[dict[str, Any]] = self._get_filtered_departures()
+        if (
+            getattr(self.coordinator, "recording_profile", RECORDING_PROFILE_FULL)
+            == RECORDING_PROFILE_LEAN
+        ):
+            attributes = self._lean_attributes(raw_departures, attribution)
+            self._attributes_cache = (cache_key, attributes)
+            return attributes
+
+        # Create a new list of dicts to avoid mutating the coordinator data
         next_departures = []
 
         for departure in raw_departures:
             # Create a shallow copy of the departure so we can modify fields for display
             dep_copy = departure.copy()
-
-            if "scheduledTime" in dep_copy and isinstance(
-                dep_copy["scheduledTime"], (int, float)
-            ):
-                dep_copy["scheduledTime"] = dt_util.as_local(
-                    dt_util.utc_from_timestamp(int(dep_copy["scheduledTime"]))
-                ).strftime("%Y-%m-%d %H:%M:%S")
-            if "time" in dep_copy and isinstance(dep_copy["time"], (int, float)):
-                dep_copy["time"] = dt_util.as_local(
-                    dt_util.utc_from_timestamp(int(dep_copy["time"]))
-                ).strftime("%Y-%m-%d %H:%M:%S")
+            dep_copy.update(self._render(departure).local_times)
 
             next_departures.append(dep_copy)
 
@@ -255,62 +276,56 @@ class DBInfoSensor(DBInfoScreenBaseEntity, SensorEntity):
             "station_messages": getattr(self.coordinator, "station_messages", []),
         }
 
+        duplicate_counts = getattr(self.coordinator, "duplicate_counts", None)
+        if isinstance(duplicate_counts, dict) and duplicate_counts:
+            attributes["duplicates_removed"] = duplicate_counts
+
+        if self.pages > 1:
+            attributes["page"] = self.page + 1
+            attributes["pages"] = self.pages
+            # Station messages are shared by all pages, keep them on the first
+            if self.page:
+                attributes.pop("station_messages")
+
         if self.enable_text_view:
             next_departures_text = []
             for dep in raw_departures:
-                line = dep.get("line", "?")
-                destination = dep.get("destination", "?")
-                platform = dep.get("platform", "?")
-                time = (
-                    dep.get("time")
-                    or dep.get("departure_current")
-                    or dep.get("scheduledDeparture")
-                    or dep.get("sched_dep")
-                    or dep.get("datetime")
-                    or "?"
-                )
-                delay = dep.get("delay", 0)
-
-                # Format time if it is an int/timestamp, otherwise use as is
-                if isinstance(time, (int, float)):
-                    time = dt_util.as_local(
-                        dt_util.utc_from_timestamp(int(time))
-                    ).strftime("%H:%M")
-
-                delay_str = ""
-                if delay:
-                    try:
-                        if int(delay) > 0:
-                            delay_str = f" +{delay}"
-                    except (ValueError, TypeError):
-                        pass
-
-                class SafeDict(dict):
-                    def __missing__(self, key):
-                        return "{" + str(key) + "}"
-
-                format_dict = {
-                    "line": line,
-                    "destination": destination,
-                    "platform": platform,
-                    "time": time,
-                    "delay": delay if delay else "",
-                    "delay_str": delay_str,
-                }
-
-                template = self.config_entry.options.get(
-                    CONF_TEXT_VIEW_TEMPLATE, DEFAULT_TEXT_VIEW_TEMPLATE
-                )
-
-                try:
-                    text = template.format_map(SafeDict(format_dict))
-                except Exception as e:  # noqa: BLE001
-                    _LOGGER.warning("Failed to format next_departures_text: %s", e)
-                    text = f"{line} -> {destination} (Pl {platform}): {time}{delay_str}"
-
+                text = self._render(dep).text_line
+                if text is None:
+                    text = self._text_template.render(dep)
                 next_departures_text.append(text)
             attributes["next_departures_text"] = next_departures_text
 
+        self._attributes_cache = (cache_key, attributes)
+        return attributes
+
+    def _lean_attributes(
+        self, departures: list[dict[str, Any]], attribution: str
+    ) -> dict[str, Any]:
+        """Return a compact summary instead of the departure list."""
+        attributes: dict[str, Any] = {
+            "station": self.station,
+            "departure_count": len(departures),
+            "cancelled_count": sum(
+                1 for dep in departures if dep.get("is_cancelled", False)
+            ),
+            "station_message_count": len(
+                getattr(self.coordinator, "station_messages", [])
+            ),
+            "attribution": attribution,
+            "is_paused": getattr(self.coordinator, "paused", False),
+        }
+        main_departure = next(
+            (dep for dep in departures if not dep.get("is_cancelled", False)), None
+        )
+        if main_departure is not None:
+            attributes["next_train"] = main_departure.get("train")
+            attributes["next_destination"] = main_departure.get("destination")
+            attributes["next_platform"] = main_departure.get("platform")
+            attributes["next_delay"] = main_departure.get("delay", 0)
+        if self.pages > 1:
+            attributes["page"] = self.page + 1
+            attributes["pages"] = self.pages
         return attributes
 
     async def async_update(self):
@@ -322,9 +337,8 @@ class DBInfoSensor(DBInfoScreenBaseEntity, SensorEntity):
             self.station,
             self.via_stations,
         )
-        self.async_on_remove(
-            self.coordinator.async_add_listener(self.async_write_ha_state)
-        )
+        # CoordinatorEntity registers the update listener
+        await super().async_added_to_hass()
         _LOGGER.debug(
             "Listener attached for station: %s, via_stations: %s",
             self.station,
@@ -351,6 +365,7 @@ class DBInfoScreenWatchdogSensor(DBInfoScreenBaseEntity, SensorEntity):
         self._attr_translation_key = "trip_watchdog"
 
     @property
+    @cached_per_update
     def native_value(self) -> str | None:
         """
         Return the current watchdog state.
@@ -385,6 +400,7 @@ class DBInfoScreenWatchdogSensor(DBInfoScreenBaseEntity, SensorEntity):
         return "Trip Origin / First Stop"
 
     @property
+    @cached_per_update
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return details about the watched trip."""
         return self._get_watchdog_data() or {}
@@ -507,6 +523,7 @@ class DBInfoScreenLeaveNowSensor(DBInfoScreenBaseEntity, SensorEntity):
         return None
 
     @property
+    @cached_per_update
     def native_value(self):
         """
         Return the number of minutes until the user must leave.
@@ -532,6 +549,7 @@ class DBInfoScreenLeaveNowSensor(DBInfoScreenBaseEntity, SensorEntity):
         return int(minutes_until_leave)
 
     @property
+    @cached_per_update
     def extra_state_attributes(self):
         next_dep = self._get_next_departure()
         if not next_dep:
@@ -566,14 +584,25 @@ class DBInfoScreenPunctualitySensor(DBInfoScreenBaseEntity, SensorEntity):
     """
     Statistical sensor for station punctuality.
 
-    Displays the percentage of trains that were on time (delay <= 5 min)
-    over the last 24 hours.
+    Displays the percentage of trains that were on time (delay up to the
+    configured threshold, 5 min by default) over the last 24 hours. The
+    attributes add the persisted rollups of departed trains.
     """
 
     _attr_has_entity_name = True
     _attr_translation_key = "punctuality"
     _attr_entity_registry_enabled_default = False  # Disabled by default
     _attr_native_unit_of_measurement = "%"
+    # The long-term statistics keep the history of these
+    _unrecorded_attributes = frozenset(
+        {
+            "windows",
+            "by_line",
+            "by_hour",
+            "delay_percentiles",
+            "delay_percentiles_by_line",
+        }
+    )
 
     def __init__(self, coordinator, config_entry):
         super().__init__(coordinator, config_entry)
@@ -581,57 +610,31 @@ class DBInfoScreenPunctualitySensor(DBInfoScreenBaseEntity, SensorEntity):
         self._attr_icon = "mdi:chart-line"
 
     @property
+    @cached_per_update
     def native_value(self):
         """Return the calculated punctuality percentage."""
         stats = self._get_stats()
         return stats.get("punctuality_percent")
 
     @property
+    @cached_per_update
     def extra_state_attributes(self):
-        return self._get_stats()
-
-    def _get_stats(self):
-        """Calculate statistics from history."""
-        history = getattr(self.coordinator, "departure_history", {})
-        if not history:
-            return {
-                "punctuality_percent": 100.0,
-                "total_trains": 0,
-                "delayed_trains": 0,
-                "cancelled_trains": 0,
-                "average_delay": 0.0,
-            }
-
-        total = len(history)
-        delayed = sum(
-            1
-            for d in history.values()
-            if d.get("delay", 0) > 5 and not d.get("is_cancelled", False)
-        )
-        cancelled = sum(1 for d in history.values() if d.get("is_cancelled", False))
-        on_time = total - delayed - cancelled
-
-        punctuality = round((on_time / total) * 100, 1) if total > 0 else 100.0
-
-        total_delay = sum(
-            d.get("delay", 0)
-            for d in history.values()
-            if not d.get("is_cancelled", False)
-        )
-        avg_delay = (
-            round(total_delay / (total - cancelled), 1)
-            if (total - cancelled) > 0
-            else 0.0
-        )
-
+        rollups = self.coordinator.punctuality_rollups
+        quantiles = self.coordinator.delay_quantiles
         return {
-            "punctuality_percent": punctuality,
-            "total_trains": total,
-            "delayed_trains": delayed,
-            "cancelled_trains": cancelled,
-            "average_delay": avg_delay,
+            **self._get_stats(),
+            "delay_threshold": self.coordinator.punctuality_threshold,
+            "windows": {window: rollups.stats(window) for window in ROLLUP_TIERS},
+            "by_line": rollups.line_stats("30d"),
+            "by_hour": rollups.hour_stats("30d"),
+            "delay_percentiles": quantiles.station.quantiles(),
+            "delay_percentiles_by_line": quantiles.line_quantiles(),
         }
 
+    def _get_stats(self):
+        """Return the statistics the coordinator keeps up to date."""
+        return self.coordinator.departure_history.stats()
+
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """
@@ -648,9 +651,13 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
     platforms = conf.get("platforms", "")
     enable_text_view = conf.get(CONF_ENABLE_TEXT_VIEW, False)
 
+    pages = int(conf.get(CONF_DEPARTURE_PAGES, DEFAULT_DEPARTURE_PAGES))
+
     _LOGGER.debug("Setting up DBInfoScreen sensors for station: %s", station)
 
-    entities = [
+    # With paging enabled, the main sensor shows the first page and one
+    # companion sensor is added per further page.
+    departure_sensors = [
         DBInfoSensor(
             coordinator,
             config_entry,
@@ -659,7 +666,14 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
             direction,
             platforms,
             enable_text_view,
-        ),
+            page=page,
+            pages=pages,
+        )
+        for page in range(pages)
+    ]
+
+    entities = [
+        *departure_sensors,
         DBInfoScreenWatchdogSensor(coordinator, config_entry),
         DBInfoScreenLeaveNowSensor(coordinator, config_entry),
         DBInfoScreenPunctualitySensor(coordinator, config_entry),
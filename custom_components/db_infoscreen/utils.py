@@ -1,14 +1,31 @@
 from __future__ import annotations
 
 import asyncio
+import bisect
 import difflib
+import functools
 import json
 import logging
 import re
+import string
+from collections.abc import Callable
 from datetime import datetime, timedelta, timezone
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, NamedTuple
 from urllib.parse import quote, unquote
 
+import orjson
+
+from .const import (
+    EVENT_CANCELLATION_CHANGED,
+    EVENT_DELAY_CHANGED,
+    EVENT_DEPARTURE_ADDED,
+    EVENT_DEPARTURE_REMOVED,
+    EVENT_PLATFORM_CHANGED,
+    IGNORED_TRAINTYPES_ALIASES,
+    TRAIN_NAME_CLASS_RULES,
+    TRAIN_TYPE_MAPPING,
+)
+
 if TYPE_CHECKING:
     from homeassistant.core import HomeAssistant
 
@@ -30,60 +47,269 @@ def normalize_whitespace(value: Any) -> str:
     return " ".join(str(value).split()).strip()
 
 
-def parse_datetime_flexible(value: Any, now: datetime) -> datetime | None:
+class StringTable:
+    """
+    Interning table for strings that repeat across departures and entries.
+
+    Station names, lines and destinations are stored once and every decoded
+    copy is swapped for the shared instance. The lowercase form used for
+    matching is cached alongside. The table is cleared when it grows past
+    ``max_size`` so that names of long gone trains do not pile up.
+    """
+
+    def __init__(self, max_size: int = 20000) -> None:
+        self.max_size = max_size
+        self._strings: dict[str, str] = {}
+        self._lower: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def intern(self, value: Any) -> Any:
+        """Return the shared instance of a string, other values unchanged."""
+        if not isinstance(value, str):
+            return value
+        shared = self._strings.get(value)
+        if shared is None:
+            if len(self._strings) >= self.max_size:
+                self.clear()
+            shared = self._strings[value] = value
+        return shared
+
+    def lower(self, value: Any) -> str:
+        """Return the cached lowercase form of a value."""
+        value = self.intern(str(value))
+        lowered = self._lower.get(value)
+        if lowered is None:
+            lowered = self._lower[value] = self.intern(value.lower())
+        return lowered
+
+    def clear(self) -> None:
+        """Drop all interned strings."""
+        self._strings.clear()
+        self._lower.clear()
+
+
+# Shared by all config entries, stations repeat across boards as well
+STRING_TABLE = StringTable()
+
+INTERNED_DEPARTURE_KEYS = ("destination", "train", "line", "platform", "direction")
+
+
+def intern_departure_strings(
+    departure: dict[str, Any], table: StringTable = STRING_TABLE
+) -> None:
+    """Replace the repeating strings of a departure with interned ones."""
+    for key in INTERNED_DEPARTURE_KEYS:
+        value = departure.get(key)
+        if isinstance(value, str):
+            departure[key] = table.intern(value)
+
+    for key in ("via", "route", "prev_route", "next_route"):
+        stops = departure.get(key)
+        if not isinstance(stops, list):
+            continue
+        for i, stop in enumerate(stops):
+            if isinstance(stop, str):
+                stops[i] = table.intern(stop)
+            elif isinstance(stop, dict) and isinstance(stop.get("name"), str):
+                stop["name"] = table.intern(stop["name"])
+
+
+def intern_board_strings(data: Any, table: StringTable = STRING_TABLE) -> None:
+    """Intern the departures of a freshly decoded API response in place."""
+    departures = data.get("departures", []) if isinstance(data, dict) else data
+    if not isinstance(departures, list):
+        return
+    for departure in departures:
+        if isinstance(departure, dict):
+            intern_departure_strings(departure, table)
+
+
+DATETIME_FORMAT_TIMESTAMP = "timestamp"
+DATETIME_FORMAT_ISO = "iso"
+DATETIME_FORMAT_CLOCK = "clock"
+
+
+def detect_datetime_format(value: Any) -> str | None:
+    """
+    Detect the format of a raw time value.
+
+    Responses use one format for all departures, so this is called once per
+    response and passed to parse_datetime_flexible as a hint.
+    """
+    if isinstance(value, (int, float)) or (isinstance(value, str) and value.isdigit()):
+        return DATETIME_FORMAT_TIMESTAMP
+    if not value:
+        return None
+    if _parse_iso(str(value), timezone.utc) is not None:
+        return DATETIME_FORMAT_ISO
+    if isinstance(value, str) and _parse_clock(value) is not None:
+        return DATETIME_FORMAT_CLOCK
+    return None
+
+
+@functools.lru_cache(maxsize=2048)
+def _parse_timestamp(value: float | str, tzinfo: Any) -> datetime:
+    """Convert a unix timestamp to an aware datetime."""
+    return datetime.fromtimestamp(int(value), timezone.utc).astimezone(tzinfo)
+
+
+@functools.lru_cache(maxsize=2048)
+def _parse_iso(value: str, tzinfo: Any) -> datetime | None:
+    """Parse an ISO datetime, assuming ``tzinfo`` for naive values."""
+    try:
+        parsed_dt: datetime | None = datetime.fromisoformat(value)
+    except ValueError:
+        from homeassistant.util import dt as dt_util
+
+        parsed_dt = dt_util.parse_datetime(value)
+    if parsed_dt is None:
+        return None
+    if parsed_dt.tzinfo is None:
+        return parsed_dt.replace(tzinfo=tzinfo)
+    return parsed_dt.astimezone(tzinfo)
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_clock(value: str) -> tuple[int, int] | None:
+    """Parse hour and minute from an HH:MM value."""
+    parts = value.split(":")
+    if len(parts) < 2:
+        return None
+    try:
+        hour, minute = int(parts[0]), int(parts[1])
+    except ValueError:
+        return None
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        return None
+    return hour, minute
+
+
+def _clock_datetime(value: str, now: datetime) -> datetime | None:
+    """Anchor an HH:MM value to the day closest to ``now``."""
+    clock = _parse_clock(value)
+    if clock is None:
+        return None
+    parsed_dt = now.replace(hour=clock[0], minute=clock[1], second=0, microsecond=0)
+    # If the parsed time is significantly in the past, it's likely tomorrow
+    if parsed_dt < now - timedelta(hours=12):
+        parsed_dt += timedelta(days=1)
+    # If it's significantly in the future (e.g. 23:00 vs 01:00), it's likely yesterday
+    elif parsed_dt > now + timedelta(hours=12):
+        parsed_dt -= timedelta(days=1)
+    return parsed_dt
+
+
+def parse_datetime_flexible(
+    value: Any, now: datetime, fmt: str | None = None
+) -> datetime | None:
     """
     Parse a datetime from various formats (timestamp, ISO, HH:MM).
     Standardizes parsing logic used across the integration.
-    """
-    from homeassistant.util import dt as dt_util
 
+    Parsed values are memoized per raw value and timezone. HH:MM values only
+    cache hour and minute; the day is anchored to ``now`` on every call so the
+    midnight rollover stays correct. ``fmt`` is the format detected for the
+    response and is tried first.
+    """
     if not value:
         return None
 
+    tzinfo = now.tzinfo
     try:
+        if fmt == DATETIME_FORMAT_ISO and isinstance(value, str):
+            parsed_dt = _parse_iso(value, tzinfo)
+            if parsed_dt:
+                return parsed_dt
+        elif fmt == DATETIME_FORMAT_CLOCK and isinstance(value, str):
+            parsed_dt = _clock_datetime(value, now)
+            if parsed_dt:
+                return parsed_dt
+
         # 1. Numeric timestamp
         if isinstance(value, (int, float)) or (
             isinstance(value, str) and value.isdigit()
         ):
-            return dt_util.utc_from_timestamp(int(value)).astimezone(now.tzinfo)
+            return _parse_timestamp(value, tzinfo)
 
         # 2. ISO format or similar via HA helper
-        parsed_dt = dt_util.parse_datetime(str(value))
+        parsed_dt = _parse_iso(str(value), tzinfo)
         if parsed_dt:
-            if parsed_dt.tzinfo is None:
-                # If no date part was in the string (unlikely for parse_datetime, but safe)
-                # or if we need to ensure local timezone
-                return parsed_dt.replace(tzinfo=now.tzinfo)
-            return parsed_dt.astimezone(now.tzinfo)
+            return parsed_dt
 
         # 3. Fallback for HH:MM format
-        if isinstance(value, str) and ":" in value:
-            parts = value.split(":")
-            if len(parts) >= 2:
-                try:
-                    hour, minute = int(parts[0]), int(parts[1])
-                    parsed_dt = now.replace(
-                        hour=hour,
-                        minute=minute,
-                        second=0,
-                        microsecond=0,
-                    )
-                    # If the parsed time is significantly in the past, it's likely tomorrow
-                    if parsed_dt < now - timedelta(hours=12):
-                        parsed_dt += timedelta(days=1)
-                    # If it's significantly in the future (e.g. 23:00 vs 01:00), it's likely yesterday
-                    elif parsed_dt > now + timedelta(hours=12):
-                        parsed_dt -= timedelta(days=1)
-                    return parsed_dt
-                except ValueError:
-                    pass
+        if isinstance(value, str):
+            return _clock_datetime(value, now)
 
-    except (ValueError, TypeError):
+    except (ValueError, TypeError, OverflowError, OSError):
         pass
 
     return None
 
 
+# Fields holding the scheduled time, in the order the coordinator reads them
+SCHEDULED_TIME_KEYS = (
+    "scheduledDeparture",
+    "sched_dep",
+    "scheduledArrival",
+    "sched_arr",
+    "scheduledTime",
+    "dep",
+    "datetime",
+)
+
+
+def scheduled_time_value(departure: dict[str, Any]) -> Any:
+    """Return the raw scheduled time of a departure from the first field set."""
+    return next((departure[k] for k in SCHEDULED_TIME_KEYS if departure.get(k)), None)
+
+
+_DEPARTURES_ARRAY_RE = re.compile(r'"departures"\s*:\s*\[')
+_ITEM_SEPARATOR_RE = re.compile(r"[\s,]*")
+_JSON_DECODER = json.JSONDecoder()
+
+
+def decode_departures_window(
+    payload: bytes | str,
+    now: datetime,
+    horizon: timedelta,
+    offset: timedelta = timedelta(0),
+) -> dict[str, Any]:
+    """
+    Decode the departures of a response up to a time horizon.
+
+    Departures are decoded one by one and decoding stops at the first one
+    scheduled later than ``now + offset + horizon``, so the rest of a large board is
+    never turned into Python objects. Departures are assumed to be sorted by
+    time, as returned by the API. Only the ``departures`` key is returned;
+    payloads without a departures array are decoded in full.
+    """
+    text = payload.decode() if isinstance(payload, bytes) else payload
+    match = _DEPARTURES_ARRAY_RE.search(text)
+    if match is None:
+        return orjson.loads(text)
+
+    end = now + offset + horizon
+    departures: list[Any] = []
+    time_format: str | None = None
+    idx = match.end()
+    while True:
+        idx = _ITEM_SEPARATOR_RE.match(text, idx).end()  # type: ignore[union-attr]
+        if idx >= len(text) or text[idx] == "]":
+            break
+        departure, idx = _JSON_DECODER.raw_decode(text, idx)
+        if isinstance(departure, dict):
+            raw_time = scheduled_time_value(departure)
+            if time_format is None and raw_time:
+                time_format = detect_datetime_format(raw_time)
+            departure_time = parse_datetime_flexible(raw_time, now, time_format)
+            if departure_time and departure_time > end:
+                break
+        departures.append(departure)
+    return {"departures": departures}
+
+
 def prune_response_cache(cache: dict, ttl: timedelta) -> None:
     """Remove expired entries from the global response cache."""
     from homeassistant.util import dt as dt_util
@@ -98,15 +324,884 @@ def prune_response_cache(cache: dict, ttl: timedelta) -> None:
         cache.pop(url, None)
 
 
-def simple_serializer(obj: Any) -> Any:
-    """JSON serializer for objects not serializable by default json code."""
-    from datetime import datetime, timedelta
+def json_default(obj: Any) -> Any:
+    """
+    Fallback for objects orjson cannot serialize natively.
 
-    if isinstance(obj, (datetime, timedelta)):
+    orjson already handles datetime, date and time. This hook covers the
+    remaining types that can end up in departure dicts.
+    """
+    if isinstance(obj, timedelta):
         return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
     raise TypeError(f"Type {type(obj)} not serializable")
 
 
+def json_dumps_bytes(obj: Any) -> bytes:
+    """Serialize an object to JSON bytes using the orjson fast path."""
+    return orjson.dumps(obj, default=json_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _length(value: Any) -> int | None:
+    """Return the length of a sized value, None for everything else."""
+    try:
+        return len(value)
+    except TypeError:
+        return None
+
+
+def _messages_signature(messages: Any) -> tuple | None:
+    """Return the message texts per type, which make up most of their size."""
+    if isinstance(messages, dict):
+        items = messages.items()
+    elif isinstance(messages, list):
+        items = (("", messages),)
+    else:
+        return None
+    return tuple(
+        (
+            msg_type,
+            tuple(m.get("text") if isinstance(m, dict) else str(m) for m in msg_list)
+            if isinstance(msg_list, list)
+            else None,
+        )
+        for msg_type, msg_list in items
+    )
+
+
+class DepartureSizeEstimator:
+    """
+    Estimate the serialized size of departures across updates.
+
+    Sizes are cached per departure signature (trip, schedule, the fields
+    that usually change between polls and the variable sub-structures such
+    as messages, route and wagon order), so an unchanged train is not
+    serialized again on every tick. Cached values are estimates: once the
+    running total gets within ``margin`` bytes of the limit, items are
+    measured exactly. A field outside the signature that changes its size
+    can still make the cached total drift from the real one.
+    """
+
+    def __init__(self, limit: int, margin: int | None = None) -> None:
+        """Initialize the estimator for a byte limit."""
+        self.limit = limit
+        self.margin = margin if margin is not None else limit // 10
+        self._sizes: dict[tuple, int] = {}
+        self._seen: set[tuple] = set()
+        self.exact_measurements = 0
+
+    @staticmethod
+    def signature(departure: dict[str, Any]) -> tuple:
+        """Return a cheap key that changes whenever the departure likely does."""
+        return (
+            departure.get("trip_id") or departure.get("train"),
+            departure.get("scheduled_timestamp"),
+            departure.get("destination"),
+            departure.get("delay"),
+            departure.get("delay_arrival"),
+            departure.get("platform"),
+            departure.get("is_cancelled"),
+            len(departure),
+            _messages_signature(departure.get("messages")),
+            _length(departure.get("route")),
+            _length(departure.get("route_details")),
+            departure.get("wagon_order_html"),
+            _length(departure.get("facilities")),
+            _length(departure.get("occupancy")),
+        )
+
+    def measure(self, departure: dict[str, Any]) -> int:
+        """Serialize the departure and cache its exact size."""
+        size = len(json_dumps_bytes(departure))
+        key = self.signature(departure)
+        self._sizes[key] = size
+        self._seen.add(key)
+        self.exact_measurements += 1
+        return size
+
+    def size(self, departure: dict[str, Any], current_total: int) -> int:
+        """
+        Return the size of a departure given the running total.
+
+        Uses the cached size unless the item is unknown or the total is
+        close enough to the limit that an estimate could overshoot it.
+        """
+        key = self.signature(departure)
+        cached = self._sizes.get(key)
+        if cached is None or current_total + cached > self.limit - self.margin:
+            return self.measure(departure)
+        self._seen.add(key)
+        return cached
+
+    def end_update(self) -> None:
+        """Evict sizes of departures that were not seen in this update."""
+        self._sizes = {k: v for k, v in self._sizes.items() if k in self._seen}
+        self._seen = set()
+
+
+class WagonOrderCache:
+    """
+    Cache processed wagon orders per formation signature.
+
+    A train's formation rarely changes between polls, so the sectors and
+    HTML are only rebuilt when the trip, the wagon count or the classes and
+    sections of a wagon change. Entries of trains that left the board are
+    evicted at the end of each update, and the cache never holds more than
+    ``max_size`` formations.
+    """
+
+    def __init__(self, max_size: int = 256) -> None:
+        """Initialize an empty cache."""
+        self.max_size = max_size
+        self._results: dict[tuple, Any] = {}
+        self._seen: set[tuple] = set()
+        self.hits = 0
+
+    @staticmethod
+    def signature(trip_id: Any, wagon_order: list) -> tuple | None:
+        """Return the formation key, or None if the formation is unusual."""
+        try:
+            formation = tuple(
+                (
+                    wagon.get("type", ""),
+                    str(wagon.get("class", "")),
+                    tuple(wagon.get("sections") or ()),
+                )
+                for wagon in wagon_order
+            )
+            key = (trip_id, len(wagon_order), formation)
+            hash(key)
+        except (AttributeError, TypeError):
+            return None
+        return key
+
+    def get(
+        self,
+        trip_id: Any,
+        wagon_order: list,
+        process: Callable[[list], Any],
+    ) -> Any:
+        """Return the processed wagon order, calling ``process`` on a miss."""
+        key = self.signature(trip_id, wagon_order)
+        if key is None:
+            return process(wagon_order)
+        self._seen.add(key)
+        if key in self._results:
+            self.hits += 1
+            return self._results[key]
+        if len(self._results) >= self.max_size:
+            # Drop the oldest formation
+            del self._results[next(iter(self._results))]
+        result = self._results[key] = process(wagon_order)
+        return result
+
+    def end_update(self) -> None:
+        """Evict formations of trains that were not on the board in this update."""
+        self._results = {k: v for k, v in self._results.items() if k in self._seen}
+        self._seen = set()
+
+
+class DepartureDeduplicator:
+    """
+    Drop departures that repeat a trip within a short time window.
+
+    The key template (e.g. ``{journeyID}{line}``) is compiled once into the
+    list of fields to read. Departures are hashed into buckets of ``window``
+    seconds per key, so a duplicate is found by looking at the neighbouring
+    buckets instead of comparing it with every kept departure. The earliest
+    departure of a trip is kept.
+    """
+
+    def __init__(self, key_template: str, window: int = 120) -> None:
+        """Compile the key template."""
+        self.window = window
+        self._fields = tuple(re.findall(r"\{([^}]+)\}", key_template))
+        # Fallback if no placeholders found (legacy behavior or static string)
+        self._static_key = key_template.strip().lower()
+        # Duplicates removed in the last run, per key source
+        self.duplicate_counts: dict[str, int] = {}
+
+    def key(self, departure: dict[str, Any]) -> tuple[str, tuple] | None:
+        """Return the key source and the trip key of a departure."""
+        if not self._fields:
+            if self._static_key:
+                return "static", (self._static_key,)
+        else:
+            sources = []
+            values = []
+            for field in self._fields:
+                val = departure.get(field)
+                if val is None:
+                    continue
+                # Normalize components (strip whitespace, lowercase) for robustness
+                val = str(val).strip().lower()
+                if val:
+                    sources.append(field)
+                    values.append(val)
+            if values:
+                return "+".join(sources), tuple(values)
+
+        # Fall back to line and destination if the template yields nothing
+        line = str(departure.get("line") or departure.get("train") or "")
+        destination = str(departure.get("destination") or "")
+        line, destination = line.strip().lower(), destination.strip().lower()
+        if line or destination:
+            return "line+destination", (line, destination)
+        return None
+
+    def deduplicate(self, departures: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        Return the departures without duplicates, keeping their order.
+
+        An earlier duplicate replaces the kept departure at its position, and
+        only then is the result sorted by departure time again.
+        """
+        # (key, bucket) -> (timestamp, position in result) of the kept departure
+        kept: dict[tuple[tuple, int], tuple[float, int]] = {}
+        counts: dict[str, int] = {}
+        result = []
+        replaced = False
+        for departure in departures:
+            resolved = self.key(departure)
+            if resolved is None:
+                # Without any key, treat as unique to avoid over-deduplication
+                result.append(departure)
+                continue
+            source, key = resolved
+            timestamp = departure["departure_datetime"].timestamp()
+            bucket = int(timestamp // self.window)
+            # Kept departures within the window can only be in adjacent buckets
+            hit = next(
+                (
+                    (key, b)
+                    for b in (bucket - 1, bucket, bucket + 1)
+                    if (key, b) in kept
+                    and abs(kept[(key, b)][0] - timestamp) <= self.window
+                ),
+                None,
+            )
+            if hit is None:
+                kept[(key, bucket)] = (timestamp, len(result))
+                result.append(departure)
+                continue
+            counts[source] = counts.get(source, 0) + 1
+            kept_timestamp, position = kept[hit]
+            if timestamp < kept_timestamp:
+                # Keep the earliest departure regardless of the input order
+                del kept[hit]
+                kept[(key, bucket)] = (timestamp, position)
+                result[position] = departure
+                replaced = True
+        self.duplicate_counts = counts
+        if replaced:
+            result.sort(key=lambda d: d["departure_datetime"])
+        return result
+
+
+_TRAIN_NAME_RULES = tuple(
+    (re.compile("|".join(re.escape(part) for part in parts)), train_class)
+    for parts, train_class in TRAIN_NAME_CLASS_RULES
+)
+
+
+@functools.lru_cache(maxsize=512)
+def _classify_train(raw_classes: tuple, train_name: str) -> frozenset[str]:
+    """Map raw train classes, or a class inferred from the name, to normalized ones."""
+    if not raw_classes:
+        name = train_name.upper()
+        raw_classes = next(
+            (
+                (train_class,)
+                for pattern, train_class in _TRAIN_NAME_RULES
+                if pattern.search(name)
+            ),
+            ("",),
+        )
+    return frozenset(TRAIN_TYPE_MAPPING.get(tc, tc) for tc in raw_classes)
+
+
+def classify_train(departure: dict[str, Any]) -> frozenset[str]:
+    """
+    Return the normalized train classes of a departure.
+
+    Uses ``trainClasses``, ``train_type`` or ``type`` from the API and falls
+    back to the train name if none is given. Results are memoized per raw
+    classes and train name.
+    """
+    train_classes = (
+        departure.get("trainClasses")
+        or departure.get("train_type")
+        or departure.get("type", [])
+    )
+    if isinstance(train_classes, str):
+        train_classes = [train_classes]
+    elif not isinstance(train_classes, (list, tuple)):
+        train_classes = []
+    # The name is only needed for inference, keep it out of the cache key otherwise
+    train_name = "" if train_classes else str(departure.get("train", ""))
+    try:
+        return _classify_train(tuple(train_classes), train_name)
+    except TypeError:
+        # Unhashable class entries, classify without the cache
+        return _classify_train.__wrapped__(tuple(train_classes), train_name)
+
+
+def build_ignored_train_classes(ignored_train_types: list[str]) -> frozenset[str]:
+    """
+    Return the normalized classes for the configured ignored train types.
+
+    e.g., if config is ['S'], this contains 's_bahn' and the 'S-Bahn' alias.
+    """
+    ignored = {TRAIN_TYPE_MAPPING.get(t, t) for t in ignored_train_types}
+    for train_type in ignored_train_types:
+        ignored.update(IGNORED_TRAINTYPES_ALIASES.get(train_type, ()))
+    return frozenset(ignored)
+
+
+def trip_key(departure: dict[str, Any]) -> str | None:
+    """Return a key that identifies a departure's trip across updates."""
+    trip_id = (
+        departure.get("trip_id") or departure.get("trainId") or departure.get("tripId")
+    )
+    if trip_id:
+        return str(trip_id)
+    train = departure.get("train") or departure.get("line")
+    scheduled = scheduled_time_value(departure)
+    if train and scheduled is not None:
+        return f"{train}@{scheduled}"
+    return None
+
+
+class TripSnapshot(NamedTuple):
+    """The compared fields of a departure."""
+
+    train: str | None
+    destination: str | None
+    scheduled_departure: Any
+    delay: Any
+    platform: Any
+    cancelled: bool
+
+    @classmethod
+    def of(cls, departure: dict[str, Any]) -> TripSnapshot:
+        """
+        Take the snapshot of a departure.
+
+        Reads the delay and cancellation like the coordinator normalizes them,
+        so a departure gives the same snapshot before and after normalization.
+        """
+        delay = (
+            departure.get("delayDeparture")
+            or departure.get("dep_delay")
+            or departure.get("delay")
+        )
+        try:
+            delay = int(delay) if delay not in (None, "") else 0
+        except (TypeError, ValueError):
+            delay = 0
+        return cls(
+            departure.get("train"),
+            departure.get("destination"),
+            scheduled_time_value(departure),
+            delay,
+            departure.get("platform"),
+            bool(
+                departure.get("cancelled")
+                or departure.get("isCancelled")
+                or departure.get("is_cancelled")
+            ),
+        )
+
+
+class DepartureChange(NamedTuple):
+    """A change of one trip between two updates."""
+
+    event_type: str
+    trip_key: str
+    data: dict[str, Any]
+
+
+class DepartureDiff:
+    """
+    Compare consecutive departure lists by trip.
+
+    Only a small snapshot per trip is kept between updates. The first update
+    only records the board, changes are reported from the second one on.
+    """
+
+    def __init__(self) -> None:
+        """Start without a previous board."""
+        self.trips: dict[str, TripSnapshot] | None = None
+
+    def update(self, departures: list[dict[str, Any]]) -> list[DepartureChange]:
+        """Record the new board and return what changed since the last one."""
+        trips: dict[str, TripSnapshot] = {}
+        for departure in departures:
+            key = trip_key(departure)
+            if key is not None and key not in trips:
+                trips[key] = TripSnapshot.of(departure)
+
+        previous, self.trips = self.trips, trips
+        if previous is None:
+            return []
+
+        changes: list[DepartureChange] = []
+        for key, trip in trips.items():
+            old = previous.get(key)
+            if old is None:
+                changes.append(self._change(EVENT_DEPARTURE_ADDED, key, trip))
+                continue
+            if old.delay != trip.delay:
+                changes.append(
+                    self._change(
+                        EVENT_DELAY_CHANGED,
+                        key,
+                        trip,
+                        old_delay=old.delay,
+                        new_delay=trip.delay,
+                    )
+                )
+            if old.platform != trip.platform:
+                changes.append(
+                    self._change(
+                        EVENT_PLATFORM_CHANGED,
+                        key,
+                        trip,
+                        old_platform=old.platform,
+                        new_platform=trip.platform,
+                    )
+                )
+            if old.cancelled != trip.cancelled:
+                changes.append(
+                    self._change(
+                        EVENT_CANCELLATION_CHANGED,
+                        key,
+                        trip,
+                        cancelled=trip.cancelled,
+                    )
+                )
+        for key, old in previous.items():
+            if key not in trips:
+                changes.append(self._change(EVENT_DEPARTURE_REMOVED, key, old))
+        return changes
+
+    @staticmethod
+    def _change(
+        event_type: str, key: str, trip: TripSnapshot, **fields: Any
+    ) -> DepartureChange:
+        """Build a change with the identifying fields of the trip."""
+        return DepartureChange(
+            event_type,
+            key,
+            {
+                "trip_key": key,
+                "train": trip.train,
+                "destination": trip.destination,
+                "scheduled_departure": trip.scheduled_departure,
+                **fields,
+            },
+        )
+
+
+def add_alternative_connections(
+    departures: list[dict[str, Any]], limit: int = 3
+) -> None:
+    """
+    Attach the next later departures to the same destination to each departure.
+
+    Builds a destination -> time-sorted index once and looks up the later
+    trains by bisect instead of comparing every pair of departures.
+    """
+    index: dict[str, tuple[list[float], list[dict[str, Any]]]] = {}
+    for dep in sorted(
+        (
+            d
+            for d in departures
+            if d.get("destination") and d.get("departure_timestamp")
+        ),
+        key=lambda d: d["departure_timestamp"],
+    ):
+        times, entries = index.setdefault(dep["destination"], ([], []))
+        times.append(dep["departure_timestamp"])
+        entries.append(
+            {
+                "train": dep.get("train"),
+                "scheduledDeparture": dep.get("scheduledDeparture"),
+                "platform": dep.get("platform"),
+            }
+        )
+
+    for dep in departures:
+        my_time = dep.get("departure_timestamp")
+        indexed = index.get(dep.get("destination") or "")
+        if not my_time or indexed is None:
+            continue
+        times, entries = indexed
+        start = bisect.bisect_right(times, my_time)
+        if start < len(entries):
+            # Own copies, the same entry is offered to several departures
+            dep["alternative_connections"] = [
+                dict(entry) for entry in entries[start : start + limit]
+            ]
+
+
+# Keywords (lowercase) that tag a message text with a label. A keyword may
+# carry several labels, e.g. "nicht" marks both broken and closed facilities.
+MESSAGE_KEYWORDS: dict[str, tuple[str, ...]] = {
+    "elevator": ("aufzug", "aufzüge", "fahrstuhl", "lift"),
+    "escalator": ("rolltreppe",),
+    "working": ("in betrieb", "ok", "behoben", "funktioniert wieder", "verfügbar"),
+    "wifi": ("wlan", "wifi"),
+    "bistro": ("bistro", "restaurant", "catering"),
+    "broken": ("nicht", "gestört", "ausfall", "defekt"),
+    "closed": ("nicht", "gestört", "geschlossen"),
+}
+
+_KEYWORD_LABELS: dict[str, frozenset[str]] = {}
+for _label, _keywords in MESSAGE_KEYWORDS.items():
+    for _keyword in _keywords:
+        _KEYWORD_LABELS[_keyword] = _KEYWORD_LABELS.get(_keyword, frozenset()) | {
+            _label
+        }
+
+# A lookahead matches at every position, so overlapping keywords are all found
+# in a single pass over the text.
+_KEYWORD_RE = re.compile(
+    "(?=("
+    + "|".join(re.escape(k) for k in sorted(_KEYWORD_LABELS, key=len, reverse=True))
+    + "))"
+)
+_PLATFORM_NUMBER_RE = re.compile(r"(?:gleis|bahnsteig)\s*(\d+)")
+
+
+class MessageClassification(NamedTuple):
+    """Labels and platform number found in a message text."""
+
+    labels: frozenset[str]
+    platform: str | None
+
+    @property
+    def facility_issue(self) -> str | None:
+        """Return "elevator" or "escalator" for an unresolved outage."""
+        if "working" in self.labels:
+            return None
+        if "escalator" in self.labels:
+            return "escalator"
+        if "elevator" in self.labels:
+            return "elevator"
+        return None
+
+    @property
+    def wifi_broken(self) -> bool:
+        """Return True if the message reports a WiFi outage."""
+        return "wifi" in self.labels and "broken" in self.labels
+
+    @property
+    def bistro_closed(self) -> bool:
+        """Return True if the message reports a closed bistro."""
+        return "bistro" in self.labels and "closed" in self.labels
+
+
+@functools.lru_cache(maxsize=1024)
+def classify_message(text: str) -> MessageClassification:
+    """
+    Classify a message text by its keywords.
+
+    Results are memoized per text, as the same messages are repeated for
+    many trains and across updates.
+    """
+    lower_text = text.lower()
+    labels: frozenset[str] = frozenset()
+    for match in _KEYWORD_RE.finditer(lower_text):
+        labels |= _KEYWORD_LABELS[match.group(1)]
+    platform_match = _PLATFORM_NUMBER_RE.search(lower_text)
+    return MessageClassification(
+        labels, platform_match.group(1) if platform_match else None
+    )
+
+
+def build_facility_issues(texts: list[str]) -> list[dict[str, Any]]:
+    """Return structured elevator/escalator outages, sorted by message text."""
+    issues = []
+    for text in sorted(set(texts)):
+        classification = classify_message(text)
+        if classification.facility_issue:
+            issues.append(
+                {
+                    "facility_type": classification.facility_issue,
+                    "platform": classification.platform,
+                    "text": text,
+                }
+            )
+    return issues
+
+
+def index_facility_issues(
+    issues: list[dict[str, Any]],
+) -> dict[str, list[dict[str, Any]]]:
+    """Group facility issues by the platform mentioned in their text."""
+    by_platform: dict[str, list[dict[str, Any]]] = {}
+    for issue in issues:
+        if issue["platform"] is not None:
+            by_platform.setdefault(issue["platform"], []).append(issue)
+    return by_platform
+
+
+def scheduled_departure_time(
+    departure: dict[str, Any], now: datetime
+) -> datetime | None:
+    """Return the scheduled time of a departure from the first field set."""
+    value = scheduled_time_value(departure)
+    if value is None:
+        return None
+    return parse_datetime_flexible(value, now)
+
+
+def format_display_time(dt_val: datetime | None, now: datetime) -> str | None:
+    """Format a departure time as HH:MM, with the date if it is not today."""
+    if not dt_val:
+        return None
+    if dt_val.date() != now.date():
+        return dt_val.strftime("%Y-%m-%d %H:%M")
+    return dt_val.strftime("%H:%M")
+
+
+def format_delay_str(delay: Any) -> str:
+    """Return ' +N' for a positive delay, an empty string otherwise."""
+    if delay:
+        try:
+            if int(delay) > 0:
+                return f" +{delay}"
+        except (ValueError, TypeError):
+            pass
+    return ""
+
+
+class _SafeFormatDict(dict):
+    """Keep unknown template keys as ``{key}`` instead of failing."""
+
+    def __missing__(self, key):
+        return "{" + str(key) + "}"
+
+
+_TEXT_TIME_KEYS = (
+    "time",
+    "departure_current",
+    "scheduledDeparture",
+    "sched_dep",
+    "datetime",
+)
+
+
+def _text_view_time(departure: dict[str, Any]) -> Any:
+    """Return the time shown in the text view, timestamps as local HH:MM."""
+    from homeassistant.util import dt as dt_util
+
+    time = next((departure[k] for k in _TEXT_TIME_KEYS if departure.get(k)), "?")
+    if isinstance(time, (int, float)):
+        time = dt_util.as_local(dt_util.utc_from_timestamp(int(time))).strftime("%H:%M")
+    return time
+
+
+# Placeholder -> (departure keys it depends on, value getter)
+TEXT_VIEW_FIELDS: dict[str, tuple[tuple[str, ...], Callable[[dict[str, Any]], Any]]] = {
+    "line": (("line",), lambda d: d.get("line", "?")),
+    "train": (("train",), lambda d: d.get("train", "?")),
+    "destination": (("destination",), lambda d: d.get("destination", "?")),
+    "platform": (("platform",), lambda d: d.get("platform", "?")),
+    "platform_sectors": (
+        ("platform_sectors",),
+        lambda d: d.get("platform_sectors", ""),
+    ),
+    "time": (_TEXT_TIME_KEYS, _text_view_time),
+    "delay": (("delay",), lambda d: d.get("delay", 0) or ""),
+    "delay_str": (("delay",), lambda d: format_delay_str(d.get("delay", 0))),
+    "delay_arrival": (("delay_arrival",), lambda d: d.get("delay_arrival", 0) or ""),
+    "delay_arrival_str": (
+        ("delay_arrival",),
+        lambda d: format_delay_str(d.get("delay_arrival", 0)),
+    ),
+}
+
+_CONVERSIONS: dict[str | None, Callable[[Any], Any]] = {
+    None: lambda value: value,
+    "s": str,
+    "r": repr,
+    "a": ascii,
+}
+
+
+class TextViewTemplate:
+    """
+    A text view template parsed once into a renderer for its placeholders.
+
+    Only the fields used by the template are computed, and rendered lines
+    are cached per version of those fields, so unchanged departures are not
+    formatted again. Unknown placeholders stay as ``{key}``.
+    """
+
+    def __init__(self, template: str, max_cache: int = 512) -> None:
+        """Parse the template."""
+        self.template = template
+        self.max_cache = max_cache
+        self._cache: dict[tuple, str] = {}
+        # (literal, field, conversion, format spec), None for the format_map path
+        self._parts: list[tuple[str, str | None, Any, str]] | None = None
+        try:
+            parsed = list(string.Formatter().parse(template))
+        except ValueError:
+            parsed = []
+        else:
+            if all(
+                field is None
+                or (
+                    field.isidentifier()
+                    and conversion in _CONVERSIONS
+                    and "{" not in (spec or "")
+                )
+                for _literal, field, spec, conversion in parsed
+            ):
+                self._parts = [
+                    (literal, field, _CONVERSIONS[conversion], spec or "")
+                    for literal, field, spec, conversion in parsed
+                ]
+        used = {field for _literal, field, _spec, _conv in parsed if field}
+        if self._parts is None:
+            # Attribute or index lookups, render through format_map with all fields
+            used = set(TEXT_VIEW_FIELDS)
+        self._fields = [name for name in TEXT_VIEW_FIELDS if name in used]
+        self._source_keys = tuple(
+            dict.fromkeys(k for name in self._fields for k in TEXT_VIEW_FIELDS[name][0])
+        )
+
+    def render(self, departure: dict[str, Any]) -> str:
+        """Render the text view line of a departure."""
+        key = tuple(departure.get(k) for k in self._source_keys)
+        try:
+            cached = self._cache.get(key)
+        except TypeError:
+            key, cached = None, None
+        if cached is not None:
+            return cached
+
+        values = {name: TEXT_VIEW_FIELDS[name][1](departure) for name in self._fields}
+        try:
+            if self._parts is None:
+                text = self.template.format_map(_SafeFormatDict(values))
+            else:
+                text = "".join(
+                    literal
+                    + (
+                        ""
+                        if field is None
+                        else format(convert(values.get(field, "{" + field + "}")), spec)
+                    )
+                    for literal, field, convert, spec in self._parts
+                )
+        except Exception as e:  # noqa: BLE001
+            _LOGGER.warning("Failed to format next_departures_text: %s", e)
+            return (
+                f"{departure.get('line', '?')} -> {departure.get('destination', '?')}"
+                f" (Pl {departure.get('platform', '?')}): {_text_view_time(departure)}"
+                f"{format_delay_str(departure.get('delay', 0))}"
+            )
+
+        if key is not None:
+            if len(self._cache) >= self.max_cache:
+                del self._cache[next(iter(self._cache))]
+            self._cache[key] = text
+        return text
+
+
+@functools.lru_cache(maxsize=32)
+def compile_text_template(template: str) -> TextViewTemplate:
+    """Return the compiled renderer for a text view template."""
+    return TextViewTemplate(template)
+
+
+def parse_delay_minutes(delay: Any) -> int:
+    """Return a delay as whole minutes, 0 if it is missing or not a number."""
+    try:
+        return (
+            int(delay)
+            if delay is not None
+            and (str(delay).isdigit() or isinstance(delay, (int, float)))
+            else 0
+        )
+    except (ValueError, TypeError):
+        return 0
+
+
+def format_calendar_summary(departure: dict[str, Any]) -> str:
+    """Return the calendar event summary of a departure."""
+    line = departure.get("line", departure.get("train", "Unknown"))
+    destination = departure.get("destination", "Unknown")
+    delay_int = parse_delay_minutes(
+        departure.get("delay", departure.get("delayDeparture", 0))
+    )
+    delay_str = f" (+{delay_int}min)" if delay_int > 0 else ""
+    cancelled_str = " ⚠️ CANCELLED" if departure.get("is_cancelled", False) else ""
+    return f"{line} → {destination}{delay_str}{cancelled_str}"
+
+
+class DepartureRender(NamedTuple):
+    """Display values of a departure, built once per coordinator update."""
+
+    state: str | None
+    scheduled_time: datetime | None
+    text_line: str | None
+    calendar_summary: str
+    local_times: dict[str, str]
+
+
+def build_departure_render(
+    departure: dict[str, Any],
+    now: datetime,
+    admode: str = "preferred departure",
+    text_template: TextViewTemplate | None = None,
+) -> DepartureRender:
+    """
+    Build the display values of a departure.
+
+    ``state`` is the departures sensor state in the given admode,
+    ``scheduled_time`` the start of the calendar event and ``text_line`` is only rendered when a compiled text view template is given.
+    """
+    from homeassistant.util import dt as dt_util
+
+    delay = departure.get("delay", 0)
+    scheduled_time = scheduled_departure_time(departure, now)
+    if admode == "preferred departure":
+        # departure_timestamp already includes the delay
+        timestamp = departure.get("departure_timestamp")
+        state = format_display_time(
+            parse_datetime_flexible(timestamp, now) if timestamp is not None else None,
+            now,
+        )
+    else:
+        state = format_display_time(scheduled_time, now)
+        if state is not None and delay not in (0, None, "None"):
+            state = f"{state} +{delay}"
+
+    local_times = {}
+    for key in ("scheduledTime", "time"):
+        value = departure.get(key)
+        if isinstance(value, (int, float)):
+            local_times[key] = dt_util.as_local(
+                dt_util.utc_from_timestamp(int(value))
+            ).strftime("%Y-%m-%d %H:%M:%S")
+
+    return DepartureRender(
+        state=state,
+        scheduled_time=scheduled_time,
+        text_line=(
+            text_template.render(departure) if text_template is not None else None
+        ),
+        calendar_summary=format_calendar_summary(departure),
+        local_times=local_times,
+    )
+
+
 async def async_get_autocomplete_path(hass: HomeAssistant, base_url: str) -> str:
     """Dynamically discover the autocomplete.js path from the server's homepage HTML."""
     from homeassistant.helpers.aiohttp_client import async_get_clientsession
@@ -203,6 +1298,7 @@ async def async_get_stations(hass: HomeAssistant, base_url: str) -> list[str]:
     Refreshes cache if older than 24 hours.
     """
     from homeassistant.helpers.aiohttp_client import async_get_clientsession
+    from homeassistant.util.json import json_loads
 
     now = datetime.now(timezone.utc)
     autocomplete_path = await async_get_autocomplete_path(hass, base_url)
@@ -270,7 +1366,7 @@ async def async_get_stations(hass: HomeAssistant, base_url: str) -> list[str]:
                     # We normalize this by replacing single quotes with double quotes
                     # and ensuring we have a valid JSON list of strings.
                     json_str = json_str.replace("'", '"')
-                    stations = json.loads(json_str)
+                    stations = json_loads(json_str)
                     hass.data[data_key] = stations
                     hass.data[update_key] = now
                     try:
@@ -371,6 +1467,7 @@ async def async_get_station_candidates(
     ]
 
     from homeassistant.helpers.aiohttp_client import async_get_clientsession
+    from homeassistant.util.json import json_loads
 
     session = async_get_clientsession(hass)
 
@@ -446,7 +1543,7 @@ async def async_get_station_candidates(
                         or "mode=json" in url
                     ):
                         try:
-                            data = await response.json()
+                            data = await response.json(loads=json_loads)
                             # Candidates in JSON
                             if data.get("candidates"):
                                 return [
@@ -550,3 +1647,128 @@ def parse_dbf_multiple_choices(html_text: str) -> list[dict[str, str]]:
             seen.add(c["code"])
 
     return result
+
+
+def route_station_names(departure: dict[str, Any]) -> set[str]:
+    """Return the lowercase names of all stations on a departure's route."""
+    lower = STRING_TABLE.lower
+    names = set()
+    for stop in departure.get("route") or []:
+        if isinstance(stop, dict):
+            names.add(lower(stop.get("name") or ""))
+        else:
+            names.add(lower(stop))
+    for stop in departure.get("via") or []:
+        names.add(lower(stop))
+    destination = lower(departure.get("destination") or "")
+    if destination:
+        names.add(destination)
+    return names
+
+
+@functools.lru_cache(maxsize=4096)
+def station_key(name: str) -> str:
+    """Return the lowercase, whitespace normalized form of a station name."""
+    return STRING_TABLE.lower(normalize_whitespace(name))
+
+
+class StationIndex:
+    """
+    Maps station names to integer IDs based on the server's station list.
+
+    The ID is the position in the list, so names that differ only in case or
+    spacing resolve to the same station. Route stops are matched by ID with
+    plain dictionary lookups instead of building name sets.
+    """
+
+    def __init__(self, stations: list[str]) -> None:
+        self.stations = stations
+        self._ids: dict[str, int] = {}
+        for station_id, name in enumerate(stations):
+            if isinstance(name, str):
+                self._ids.setdefault(station_key(name), station_id)
+
+    def station_id(self, name: Any) -> int | None:
+        """Return the ID of an exact (case-insensitive) station name."""
+        if not name:
+            return None
+        return self._ids.get(station_key(str(name)))
+
+    def resolve(self, name: str) -> int | None:
+        """
+        Resolve a user supplied name, tolerating small spelling differences.
+
+        A misspelled name is only resolved if exactly one station is a close
+        match, so similar names (e.g. "München Ost" and "München West") do
+        not resolve to the wrong station.
+        """
+        station_id = self.station_id(name)
+        if station_id is not None or not name:
+            return station_id
+        close = difflib.get_close_matches(
+            station_key(name), list(self._ids), n=2, cutoff=0.9
+        )
+        if len(close) != 1:
+            _LOGGER.info(
+                "Via station '%s' not resolved to a station ID (candidates: %s), "
+                "matching it by name",
+                name,
+                [self.stations[self._ids[c]] for c in close],
+            )
+            return None
+        station_id = self._ids[close[0]]
+        _LOGGER.info(
+            "Via station '%s' resolved to '%s'", name, self.stations[station_id]
+        )
+        return station_id
+
+    def resolve_all(self, names: list[str]) -> list[int | None]:
+        """
+        Resolve several user supplied names, see ``resolve``.
+
+        Misspelled names are compared with the whole station list, so this
+        runs in the executor.
+        """
+        return [self.resolve(name) for name in names]
+
+    def route_stations(self, departure: dict[str, Any]) -> tuple[set[int], set[str]]:
+        """
+        Return the stations on a departure's route, destination included.
+
+        Known stations are returned as IDs, stops missing from the station
+        list as their lowercase, normalized names.
+        """
+        names = [
+            stop.get("name") if isinstance(stop, dict) else stop
+            for stop in departure.get("route") or []
+        ]
+        names.extend(departure.get("via") or [])
+        names.append(departure.get("destination"))
+        ids: set[int] = set()
+        unknown: set[str] = set()
+        for name in names:
+            if not name:
+                continue
+            key = station_key(str(name))
+            station_id = self._ids.get(key)
+            if station_id is None:
+                unknown.add(key)
+            else:
+                ids.add(station_id)
+        return ids, unknown
+
+
+_STATION_INDEXES: dict[str, StationIndex] = {}
+
+
+async def async_get_station_index(
+    hass: HomeAssistant, base_url: str
+) -> StationIndex | None:
+    """Return the station index for a server, shared by all its entries."""
+    stations = await async_get_stations(hass, base_url)
+    if not stations:
+        return None
+    index = _STATION_INDEXES.get(base_url)
+    if index is None or index.stations is not stations:
+        index = _STATION_INDEXES[base_url] = StationIndex(stations)
+    return index
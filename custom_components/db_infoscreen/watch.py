@@ -0,0 +1,209 @@
+"""Watched trains, shared by all config entries and kept across restarts."""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_WATCH_REGISTRY = f"{DOMAIN}_watch_registry"
+STORAGE_KEY = f"{DOMAIN}_watched_trains"
+STORAGE_VERSION = 1
+SAVE_DELAY = 10  # seconds, batches the saves of several updates
+# A watch ends once no departure board has shown the train for this long
+WATCH_TIMEOUT = timedelta(minutes=5)
+
+
+def build_watch(
+    notify_service: str,
+    delay_threshold: int = 5,
+    notify_on_platform_change: bool = True,
+    notify_on_cancellation: bool = True,
+) -> dict[str, Any]:
+    """Return a new watch with nothing notified yet."""
+    return {
+        "notify_service": notify_service,
+        "delay_threshold": delay_threshold,
+        "notify_on_platform_change": notify_on_platform_change,
+        "notify_on_cancellation": notify_on_cancellation,
+        "last_notified_delay": -1,
+        "last_notified_platform": None,
+        "last_notified_cancellation": False,
+        "last_seen": dt_util.now().timestamp(),
+    }
+
+
+def watch_update_message(
+    watch: dict[str, Any], departure: dict[str, Any]
+) -> dict[str, str] | None:
+    """
+    Return the notification for a watched departure, None if nothing changed.
+
+    The message is split into its parts, the header and one part per change
+    (``delay``, ``platform``, ``cancelled``), so that queued messages of the
+    same train can be merged. Records the notified delay, platform and
+    cancellation in the watch.
+    """
+    delay = (
+        departure.get("delay")
+        if "delay" in departure
+        else departure.get("delayDeparture", 0)
+    )
+    platform = departure.get("platform")
+    is_cancelled = (
+        departure.get("is_cancelled")
+        if "is_cancelled" in departure
+        else (departure.get("cancelled", False) or departure.get("isCancelled", False))
+    )
+
+    message = {
+        "header": f"Update for {departure.get('train')} to "
+        f"{departure.get('destination')}: "
+    }
+
+    # 1. Check Delay
+    try:
+        delay_int = int(delay) if delay else 0
+        current_threshold = watch.get("delay_threshold")
+        threshold = int(current_threshold if current_threshold is not None else 0)
+        if delay_int >= threshold and delay_int != watch.get("last_notified_delay"):
+            message["delay"] = f"Delay is now {delay_int} min. "
+            watch["last_notified_delay"] = delay_int
+    except (ValueError, TypeError):
+        pass
+
+    # 2. Check Platform
+    if (
+        watch.get("notify_on_platform_change", True)
+        and platform
+        and platform != watch.get("last_notified_platform")
+    ):
+        if watch.get("last_notified_platform") is not None:
+            message["platform"] = f"Platform changed to {platform}. "
+        watch["last_notified_platform"] = platform
+
+    # 3. Check Cancellation
+    if (
+        watch.get("notify_on_cancellation", True)
+        and is_cancelled
+        and not watch.get("last_notified_cancellation")
+    ):
+        message["cancelled"] = "Train is CANCELLED! "
+        watch["last_notified_cancellation"] = True
+
+    return message if len(message) > 1 else None
+
+
+class WatchRegistry:
+    """
+    Watched trains of all config entries, keyed by train name or trip ID.
+
+    Each departure is matched with one dictionary lookup per key, so checking a
+    board costs the same no matter how many trains are watched. Changes are
+    saved with a delay to batch the writes of several updates.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize an empty registry."""
+        self.hass = hass
+        self.watches: dict[str, dict[str, Any]] = {}
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._loaded = False
+
+    async def async_load(self) -> None:
+        """Load the persisted watches once."""
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            stored = await self._store.async_load()
+        except Exception as err:  # noqa: BLE001
+            _LOGGER.warning("Failed to load watched trains: %s", err)
+            return
+        if not stored or not isinstance(stored.get("watches"), dict):
+            return
+        # Give restored watches a full timeout to show up on a board again
+        now = dt_util.now().timestamp()
+        for watch in stored["watches"].values():
+            watch["last_seen"] = now
+        # Watches added while loading take priority
+        self.watches = {**stored["watches"], **self.watches}
+
+    @callback
+    def async_add(self, train_id: str, watch: dict[str, Any]) -> None:
+        """Watch a train, replacing an existing watch of the same train."""
+        self.watches[train_id] = watch
+        self.async_schedule_save()
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Save the watches after a short delay."""
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        return {"watches": self.watches}
+
+    def match(self, departure: dict[str, Any]) -> tuple[str, dict[str, Any]] | None:
+        """Return the watched train ID and watch of a departure, if any."""
+        for key in ("train", "trip_id", "trainId"):
+            value = departure.get(key)
+            if value and (watch := self.watches.get(value)) is not None:
+                return value, watch
+        return None
+
+    @callback
+    def async_evaluate(
+        self, departures: list[dict[str, Any]], now: datetime
+    ) -> list[tuple[str, dict[str, Any], dict[str, str]]]:
+        """
+        Check a board against the watches.
+
+        Returns ``(train_id, watch, message)`` for every watch to notify and
+        ends watches whose train has not been seen for ``WATCH_TIMEOUT``.
+        """
+        if not self.watches:
+            return []
+
+        timestamp = now.timestamp()
+        notifications = []
+        for departure in departures:
+            found = self.match(departure)
+            if found is None:
+                continue
+            train_id, watch = found
+            watch["last_seen"] = timestamp
+            message = watch_update_message(watch, departure)
+            if message:
+                notifications.append((train_id, watch, message))
+
+        cutoff = timestamp - WATCH_TIMEOUT.total_seconds()
+        expired = [
+            train_id
+            for train_id, watch in self.watches.items()
+            if watch.get("last_seen", 0) < cutoff
+        ]
+        for train_id in expired:
+            _LOGGER.debug("Removing stale watch for %s", train_id)
+            self.watches.pop(train_id, None)
+
+        if notifications or expired:
+            self.async_schedule_save()
+        return notifications
+
+
+@callback
+def async_get_watch_registry(hass: HomeAssistant) -> WatchRegistry:
+    """Return the watch registry shared by all config entries."""
+    registry = hass.data.get(DATA_WATCH_REGISTRY)
+    if not isinstance(registry, WatchRegistry):
+        registry = hass.data[DATA_WATCH_REGISTRY] = WatchRegistry(hass)
+    return registry
@@ -0,0 +1,163 @@
+"""Websocket API that streams departure boards to dashboards."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+import voluptuous as vol
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from .const import DOMAIN
+from .utils import trip_key
+
+# Sent with the entry ID when a config entry unloads, ends its subscriptions
+SIGNAL_ENTRY_UNLOADED = f"{DOMAIN}_entry_unloaded_{{}}"
+
+
+@callback
+def async_register_websocket_commands(hass: HomeAssistant) -> None:
+    """Register the websocket commands of the integration."""
+    websocket_api.async_register_command(hass, ws_subscribe_departures)
+
+
+def project_departures(
+    departures: list[dict[str, Any]], fields: list[str] | None
+) -> dict[str, dict[str, Any]]:
+    """
+    Return the departures keyed by trip, reduced to the requested fields.
+
+    Departures without a trip key, or with one already taken, are keyed by
+    their position so that every departure is sent.
+    """
+    board: dict[str, dict[str, Any]] = {}
+    for index, departure in enumerate(departures):
+        key = trip_key(departure)
+        if key is None or key in board:
+            key = f"#{index}"
+        if fields is None:
+            board[key] = dict(departure)
+        else:
+            board[key] = {
+                field: departure[field] for field in fields if field in departure
+            }
+    return board
+
+
+def diff_boards(
+    old: dict[str, dict[str, Any]], new: dict[str, dict[str, Any]]
+) -> dict[str, Any] | None:
+    """
+    Return the changes between two projected boards, None if there are none.
+
+    Changed departures only carry the fields whose value changed, and a field
+    that disappeared is sent as None. ``order`` is included when the order of
+    the departures changed.
+    """
+    added = {key: departure for key, departure in new.items() if key not in old}
+    removed = [key for key in old if key not in new]
+    changed: dict[str, dict[str, Any]] = {}
+    for key, departure in new.items():
+        previous = old.get(key)
+        if previous is None or previous == departure:
+            continue
+        fields = {
+            field: value
+            for field, value in departure.items()
+            if previous.get(field) != value
+        }
+        fields.update({field: None for field in previous if field not in departure})
+        changed[key] = fields
+
+    diff: dict[str, Any] = {}
+    if added:
+        diff["added"] = added
+    if changed:
+        diff["changed"] = changed
+    if removed:
+        diff["removed"] = removed
+    old_order = [key for key in old if key in new]
+    new_order = [key for key in new if key in old]
+    if added or old_order != new_order:
+        diff["order"] = list(new)
+    return diff or None
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/subscribe_departures",
+        vol.Required("entry_id"): str,
+        vol.Optional("fields"): [str],
+    }
+)
+@callback
+def ws_subscribe_departures(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """
+    Stream the departures of a config entry.
+
+    The first event carries the whole board as ``departures``, in board
+    order. Each later update sends only what changed, see ``diff_boards``.
+    With ``fields``, the departures only carry these fields. When the entry
+    unloads, e.g. to reload after an options change, the subscription ends
+    with an error and the client has to subscribe again.
+    """
+    # Imported here, the package imports this module
+    from . import DBInfoScreenCoordinator
+
+    coordinator = hass.data.get(DOMAIN, {}).get(msg["entry_id"])
+    if not isinstance(coordinator, DBInfoScreenCoordinator):
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, "Config entry not found"
+        )
+        return
+
+    fields: list[str] | None = msg.get("fields")
+    board = project_departures(coordinator.data or [], fields)
+
+    @callback
+    def _async_forward_update() -> None:
+        """Send the changes of the board to the subscriber."""
+        nonlocal board
+        new_board = project_departures(coordinator.data or [], fields)
+        diff = diff_boards(board, new_board)
+        board = new_board
+        if diff is not None:
+            connection.send_message(websocket_api.event_message(msg["id"], diff))
+
+    unsubscribers: list[Callable[[], None]] = []
+
+    @callback
+    def _async_unsubscribe() -> None:
+        """Stop forwarding the updates of the entry."""
+        while unsubscribers:
+            unsubscribers.pop()()
+
+    @callback
+    def _async_entry_unloaded() -> None:
+        """End the subscription, the coordinator will not update any more."""
+        _async_unsubscribe()
+        if connection.subscriptions.pop(msg["id"], None) is not None:
+            connection.send_error(
+                msg["id"], websocket_api.ERR_NOT_FOUND, "Config entry unloaded"
+            )
+
+    unsubscribers.append(coordinator.async_add_listener(_async_forward_update))
+    unsubscribers.append(
+        async_dispatcher_connect(
+            hass, SIGNAL_ENTRY_UNLOADED.format(msg["entry_id"]), _async_entry_unloaded
+        )
+    )
+    connection.subscriptions[msg["id"]] = _async_unsubscribe
+    connection.send_result(msg["id"])
+    connection.send_message(
+        websocket_api.event_message(
+            msg["id"],
+            {"departures": [{"key": key, **dep} for key, dep in board.items()]},
+        )
+    )
@@ -0,0 +1,214 @@
+"""Micro-benchmarks for the hot paths of the DB Infoscreen coordinator.
+
+Run from the repository root with the test requirements installed:
+
+    python scripts/benchmark.py              # all benchmarks
+    python scripts/benchmark.py json         # only the JSON benchmark
+    python scripts/benchmark.py decode       # full vs. windowed decode
+    python scripts/benchmark.py memory       # string interning with keep_route
+    python scripts/benchmark.py --size 800   # bigger synthetic board
+"""
+
+import argparse
+import copy
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+from datetime import UTC, datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from custom_components.db_infoscreen.utils import (
+    StringTable,
+    decode_departures_window,
+    intern_board_strings,
+    json_dumps_bytes,
+)
+
+STATIONS = [
+    "München Hbf",
+    "München-Pasing",
+    "Augsburg Hbf",
+    "Ulm Hbf",
+    "Stuttgart Hbf",
+    "Mannheim Hbf",
+    "Frankfurt(Main)Hbf",
+    "Köln Hbf",
+    "Düsseldorf Hbf",
+    "Dortmund Hbf",
+]
+
+
+def make_board(size: int, detailed: bool = True) -> dict:
+    """Build a synthetic DBF response resembling a big station with past=1."""
+    now = datetime.now(UTC)
+    departures = []
+    for i in range(size):
+        sched = now + timedelta(minutes=i - size // 4)
+        dep = {
+            "train": f"ICE {500 + i}",
+            "line": f"ICE {500 + i}",
+            "trainNumber": str(500 + i),
+            "trainClasses": ["F"],
+            "destination": STATIONS[i % len(STATIONS)],
+            "scheduledDeparture": sched.strftime("%Y-%m-%dT%H:%M"),
+            "scheduledArrival": (sched - timedelta(minutes=2)).strftime(
+                "%Y-%m-%dT%H:%M"
+            ),
+            "delayDeparture": i % 7,
+            "delayArrival": i % 5,
+            "platform": str(i % 16 + 1),
+            "scheduledPlatform": str(i % 16 + 1),
+            "isCancelled": 0,
+            "trainId": f"{1000000 + i}-2510191030-{i % 12}",
+            "via": STATIONS[: 3 + i % 5],
+            "messages": {
+                "delay": [{"text": "Verspätung aus vorheriger Fahrt"}],
+                "qos": [{"text": "Aufzug zu Gleis 3 defekt"}],
+            },
+        }
+        if detailed:
+            dep["route"] = [
+                {"name": name, "arr_delay": i % 3, "dep_delay": i % 4}
+                for name in STATIONS
+            ]
+            dep["wagonorder"] = [
+                {"type": "Apmz", "class": "1", "sections": ["A", "B"]},
+                {"type": "WRmz", "class": "", "sections": ["C"]},
+                {"type": "Bpmz", "class": "2", "sections": ["D", "E"]},
+            ]
+        departures.append(dep)
+    return {"departures": departures}
+
+
+def _legacy_serializer(obj):
+    """The stdlib default hook used before the orjson fast path."""
+    if isinstance(obj, (datetime, timedelta)):
+        return str(obj)
+    raise TypeError(f"Type {type(obj)} not serializable")
+
+
+def bench_json(size: int, number: int) -> None:
+    """Compare stdlib json against the orjson helpers on a large board."""
+    import orjson
+
+    board = make_board(size)
+    payload = json.dumps(board).encode()
+    departures = board["departures"]
+    for dep in departures:
+        dep["departure_datetime"] = datetime.now(UTC)
+
+    def size_stdlib():
+        return sum(
+            len(json.dumps(dep, default=_legacy_serializer)) for dep in departures
+        )
+
+    def size_orjson():
+        return sum(len(json_dumps_bytes(dep)) for dep in departures)
+
+    results = [
+        ("decode  stdlib json.loads", lambda: json.loads(payload)),
+        ("decode  orjson.loads", lambda: orjson.loads(payload)),
+        ("size    stdlib json.dumps/item", size_stdlib),
+        ("size    json_dumps_bytes/item", size_orjson),
+        (
+            "encode  stdlib json.dumps",
+            lambda: json.dumps(departures, default=_legacy_serializer),
+        ),
+        ("encode  json_dumps_bytes", lambda: json_dumps_bytes(departures)),
+    ]
+    print(f"JSON ({size} departures, {len(payload) / 1024:.0f} KiB payload)")
+    _report(results, number)
+
+
+def bench_decode(size: int, number: int) -> None:
+    """Compare a full decode against the windowed departures decode."""
+    import orjson
+
+    payload = json.dumps(make_board(size)).encode()
+    now = datetime.now(UTC)
+
+    # The coordinator deep-copies the decoded departures before processing
+    results = [
+        (
+            "full    orjson.loads + deepcopy",
+            lambda: copy.deepcopy(orjson.loads(payload)),
+        )
+    ]
+    for minutes in (60, 180):
+        horizon = timedelta(minutes=minutes)
+        count = len(decode_departures_window(payload, now, horizon)["departures"])
+        results.append(
+            (
+                f"window  {minutes} min ({count} items) + deepcopy",
+                lambda horizon=horizon: copy.deepcopy(
+                    decode_departures_window(payload, now, horizon)
+                ),
+            )
+        )
+    print(f"Decode ({size} departures, {len(payload) / 1024:.0f} KiB payload)")
+    _report(results, number)
+
+
+def bench_memory(size: int, number: int) -> None:
+    """Measure the memory of retained boards with and without interning."""
+    import orjson
+
+    payload = json.dumps(make_board(size)).encode()
+    # One board per config entry, all kept in memory as with keep_route
+    entries = max(number, 1)
+
+    def retained(intern: bool) -> int:
+        table = StringTable()
+        tracemalloc.start()
+        boards = []
+        for _ in range(entries):
+            data = orjson.loads(payload)
+            if intern:
+                intern_board_strings(data, table)
+            # The coordinator keeps the raw response and a cached deep copy
+            boards.append((data, copy.deepcopy(data)))
+        current, _peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return current
+
+    plain = retained(False)
+    interned = retained(True)
+    print(f"Memory ({entries} boards x {size} departures, keep_route)")
+    print(f"  {'plain decode':<40} {plain / 1024 / 1024:8.2f} MiB")
+    print(f"  {'interned strings':<40} {interned / 1024 / 1024:8.2f} MiB")
+
+
+def _report(results, number: int) -> None:
+    """Print per-call timings for a list of (label, callable) pairs."""
+    for label, func in results:
+        elapsed = timeit.timeit(func, number=number) / number
+        print(f"  {label:<40} {elapsed * 1000:8.3f} ms")
+
+
+BENCHMARKS = {
+    "json": bench_json,
+    "decode": bench_decode,
+    "memory": bench_memory,
+}
+
+
+def main() -> None:
+    """Run the selected benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", help=", ".join(BENCHMARKS))
+    parser.add_argument("--size", type=int, default=400)
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+    unknown = set(args.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+
+    for name in args.names or BENCHMARKS:
+        BENCHMARKS[name](args.size, args.number)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 """Shared test helpers."""
 
+import json
 from contextlib import contextmanager
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -15,6 +16,7 @@ def patch_session(mock_data=None, side_effect=None):
         resp = MagicMock()
         resp.status = 200
         resp.json = AsyncMock(return_value=data)
+        resp.read = AsyncMock(return_value=json.dumps(data, default=str).encode())
         resp.raise_for_status = MagicMock()
         resp.__aenter__ = AsyncMock(return_value=resp)
         resp.__aexit__ = AsyncMock(return_value=None)
@@ -259,6 +259,13 @@ if not PYTEST_HA_AVAILABLE:
         ha_util_dt.utc_from_timestamp = utc_from_timestamp  # type: ignore[attr-defined]
         sys.modules["homeassistant.util.dt"] = ha_util_dt
 
+    if "homeassistant.util.json" not in sys.modules:
+        import json
+
+        ha_util_json = types.ModuleType("homeassistant.util.json")
+        ha_util_json.json_loads = json.loads  # type: ignore[attr-defined]
+        sys.modules["homeassistant.util.json"] = ha_util_json
+
     # Mock homeassistant.util.logging
     if "homeassistant.util.logging" not in sys.modules:
         sys.modules["homeassistant.util.logging"] = MagicMock()
@@ -0,0 +1,62 @@
+"""Tests for the alternative connection lookup."""
+
+from custom_components.db_infoscreen.utils import add_alternative_connections
+
+
+def _dep(train, destination, timestamp):
+    return {
+        "train": train,
+        "destination": destination,
+        "departure_timestamp": timestamp,
+        "scheduledDeparture": f"{timestamp}",
+        "platform": "1",
+    }
+
+
+def test_next_later_departures_by_destination():
+    """Only strictly later trains to the same destination are listed."""
+    departures = [
+        _dep("ICE 5", "Berlin", 500),
+        _dep("ICE 1", "Berlin", 100),
+        _dep("RE 1", "Ulm", 150),
+        _dep("ICE 2", "Berlin", 200),
+        _dep("ICE 3", "Berlin", 300),
+        _dep("ICE 4", "Berlin", 400),
+        _dep("ICE 2b", "Berlin", 200),
+    ]
+
+    add_alternative_connections(departures)
+
+    first = departures[1]["alternative_connections"]
+    assert [alt["train"] for alt in first] == ["ICE 2", "ICE 2b", "ICE 3"]
+    assert [a["train"] for a in departures[3]["alternative_connections"]] == [
+        "ICE 3",
+        "ICE 4",
+        "ICE 5",
+    ]
+    assert "alternative_connections" not in departures[0]
+    assert "alternative_connections" not in departures[2]
+
+
+def test_missing_timestamp_is_ignored():
+    """Departures without a timestamp neither get nor provide alternatives."""
+    departures = [_dep("S 1", "Pasing", 0), _dep("S 2", "Pasing", 100)]
+
+    add_alternative_connections(departures)
+
+    assert "alternative_connections" not in departures[0]
+    assert "alternative_connections" not in departures[1]
+
+
+def test_alternatives_are_not_shared():
+    """Editing one departure's alternatives leaves the others untouched."""
+    departures = [
+        _dep("ICE 1", "Berlin", 100),
+        _dep("ICE 2", "Berlin", 200),
+        _dep("ICE 3", "Berlin", 300),
+    ]
+
+    add_alternative_connections(departures)
+
+    departures[0]["alternative_connections"][1]["platform"] = "7"
+    assert departures[1]["alternative_connections"][0]["platform"] == "1"
@@ -0,0 +1,98 @@
+"""Tests for the cached attribute size accounting."""
+
+from unittest.mock import MagicMock
+
+from custom_components.db_infoscreen.const import CONF_STATION
+from custom_components.db_infoscreen.sensor import DBInfoSensor
+from custom_components.db_infoscreen.utils import (
+    DepartureSizeEstimator,
+    json_dumps_bytes,
+)
+
+
+def _departure(delay=0):
+    return {
+        "trip_id": "123-456",
+        "train": "ICE 1",
+        "destination": "Berlin Hbf",
+        "scheduled_timestamp": 1760000000,
+        "delay": delay,
+        "platform": "5",
+        "is_cancelled": False,
+    }
+
+
+def test_size_is_cached_per_signature():
+    """An unchanged departure is only serialized once."""
+    estimator = DepartureSizeEstimator(limit=16000)
+    dep = _departure()
+
+    assert estimator.size(dep, 2) == len(json_dumps_bytes(dep))
+    estimator.end_update()
+    assert estimator.size(dict(dep), 2) == len(json_dumps_bytes(dep))
+    assert estimator.exact_measurements == 1
+
+    # A changed delay yields a new signature and a new measurement
+    estimator.size(_departure(delay=5), 2)
+    assert estimator.exact_measurements == 2
+
+
+def test_changed_messages_are_measured_again():
+    """Growing sub-structures like messages do not reuse the old size."""
+    estimator = DepartureSizeEstimator(limit=16000)
+    dep = _departure()
+    dep["messages"] = {"qos": []}
+    estimator.size(dep, 2)
+
+    grown = dict(dep, messages={"qos": [{"text": "Aufzug defekt " * 100}]})
+    assert estimator.size(grown, 2) == len(json_dumps_bytes(grown))
+    assert estimator.exact_measurements == 2
+
+
+def test_exact_measurement_near_limit():
+    """Close to the budget boundary the cached estimate is not trusted."""
+    dep = _departure()
+    size = len(json_dumps_bytes(dep))
+    estimator = DepartureSizeEstimator(limit=size * 3, margin=size)
+
+    estimator.size(dep, 0)
+    estimator.size(dep, 0)
+    assert estimator.exact_measurements == 1
+
+    estimator.size(dep, size + 1)
+    assert estimator.exact_measurements == 2
+
+
+def test_unseen_departures_are_evicted():
+    """Sizes of trains that left the board are dropped after an update."""
+    estimator = DepartureSizeEstimator(limit=16000)
+    estimator.size(_departure(), 2)
+    estimator.end_update()
+    estimator.end_update()
+
+    estimator.size(_departure(), 2)
+    assert estimator.exact_measurements == 2
+
+
+def test_sensor_attributes_are_built_once_per_update():
+    """A fallback update that returns the same list still refreshes the sensor."""
+    entry = MagicMock()
+    entry.data = {CONF_STATION: "Berlin Hbf"}
+    entry.options = {}
+    coordinator = MagicMock()
+    coordinator.data = [_departure()]
+    coordinator.config_entry = entry
+    coordinator.station_messages = []
+    coordinator.update_count = 1
+    sensor = DBInfoSensor(coordinator, entry, "Berlin Hbf", [], "", "", True)
+
+    first = sensor.extra_state_attributes
+    assert sensor.extra_state_attributes is first
+
+    # The coordinator keeps its cached list but refreshed the messages
+    coordinator.station_messages = [{"text": "Elevator out of order"}]
+    coordinator.update_count = 2
+
+    assert sensor.extra_state_attributes["station_messages"] == [
+        {"text": "Elevator out of order"}
+    ]
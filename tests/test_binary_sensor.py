@@ -76,3 +76,31 @@ def test_elevator_sensor_keywords(mock_coordinator, mock_config_entry):
     )
     assert sensor_p5.is_on is True
     assert len(sensor_p5.extra_state_attributes["issues"]) == 2
+
+
+def test_elevator_sensor_uses_coordinator_index(mock_coordinator, mock_config_entry):
+    issue = {
+        "facility_type": "escalator",
+        "platform": "7",
+        "text": "Rolltreppe Gleis 7",
+    }
+    mock_coordinator.elevator_issues = [issue]
+    mock_coordinator.elevator_issues_by_platform = {"7": [issue]}
+
+    sensor_p7 = DBInfoScreenElevatorBinarySensor(
+        mock_coordinator, mock_config_entry, "7"
+    )
+    assert sensor_p7.is_on is True
+    attrs = sensor_p7.extra_state_attributes
+    assert attrs["issues"] == ["Rolltreppe Gleis 7"]
+    assert attrs["defective_facilities"][0]["status"] == "defective"
+
+    sensor_p8 = DBInfoScreenElevatorBinarySensor(
+        mock_coordinator, mock_config_entry, "8"
+    )
+    assert sensor_p8.is_on is False
+
+    sensor_general = DBInfoScreenElevatorBinarySensor(
+        mock_coordinator, mock_config_entry, None
+    )
+    assert sensor_general.extra_state_attributes["issue_count"] == 1
@@ -7,6 +7,7 @@ import pytest
 from homeassistant.core import HomeAssistant
 
 from custom_components.db_infoscreen.calendar import DBInfoScreenCalendar
+from custom_components.db_infoscreen.utils import build_departure_render, trip_key
 
 
 @pytest.mark.asyncio
@@ -84,3 +85,35 @@ async def test_calendar_event_generation(hass: HomeAssistant) -> None:
         fav_events = entity._get_events_from_departures()
     assert len(fav_events) == 1
     assert fav_events[0].summary == "S 3 → Holzkirchen (+5min)"
+
+
+@pytest.mark.asyncio
+async def test_calendar_uses_render_model(hass: HomeAssistant) -> None:
+    """Events take start time and summary from the coordinator render model."""
+    now = datetime(2026, 6, 21, 12, 0, 0, tzinfo=timezone.utc)
+    departure = {
+        "line": "S 3",
+        "destination": "Holzkirchen",
+        "scheduledDeparture": "2026-06-21T12:15:00Z",
+        "delay": 0,
+    }
+    mock_coordinator = MagicMock()
+    mock_coordinator.walk_time = 0
+    mock_coordinator.calendar_event_duration = 5
+    mock_coordinator.calendar_only_favorites = False
+    mock_coordinator.calendar_only_delayed = False
+    mock_coordinator.data = [departure]
+    mock_coordinator.render_models = {
+        trip_key(departure): build_departure_render(departure, now)
+    }
+
+    entity = DBInfoScreenCalendar(mock_coordinator, MagicMock())
+    with (
+        patch("homeassistant.util.dt.now", return_value=now),
+        patch.object(entity, "_parse_departure_time") as parse,
+    ):
+        events = entity._get_events_from_departures()
+
+    parse.assert_not_called()
+    assert events[0].start == datetime(2026, 6, 21, 12, 15, tzinfo=timezone.utc)
+    assert events[0].summary == "S 3 → Holzkirchen"
@@ -1,11 +1,12 @@
 import copy
+import json
 from datetime import timedelta
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from homeassistant.util import dt as dt_util
 
-from custom_components.db_infoscreen import DBInfoScreenCoordinator
+from custom_components.db_infoscreen import RESPONSE_CACHE, DBInfoScreenCoordinator
 from custom_components.db_infoscreen.const import (
     CONF_DATA_SOURCE,
     CONF_DETAILED,
@@ -373,6 +374,72 @@ async def test_coordinator_wagon_order(hass, mock_config_entry):
         assert "platform_sectors" not in data[1]
 
 
+@pytest.mark.asyncio
+async def test_coordinator_wagon_order_cache(hass, mock_config_entry):
+    """A formation is only processed again once it changes."""
+    wagon_order = [
+        {"sections": ["A"], "class": "1", "type": "Apmz"},
+        {"sections": ["B"], "class": "2", "type": "Bpmz"},
+    ]
+    departure = {
+        "scheduledDeparture": (dt_util.now() + timedelta(minutes=15)).strftime(
+            "%Y-%m-%dT%H:%M"
+        ),
+        "destination": "With Sectors",
+        "train": "ICE 1",
+        "trainId": "123-2510191030-1",
+        "wagonorder": wagon_order,
+    }
+
+    RESPONSE_CACHE.clear()
+    coordinator = DBInfoScreenCoordinator(hass, mock_config_entry)
+    process = MagicMock(wraps=coordinator._process_wagon_order)
+    coordinator._process_wagon_order = process
+    with patch_session({"departures": [departure]}):
+        await coordinator._async_update_data()
+        data = await coordinator._async_update_data()
+
+    assert process.call_count == 1
+    assert "<b>1. Klasse:</b> A" in data[0]["wagon_order_html"]
+
+    # A changed formation is processed again, the old one is evicted
+    departure["wagonorder"] = [*wagon_order, {"sections": ["C"], "type": "WRmz"}]
+    RESPONSE_CACHE.clear()
+    with patch_session({"departures": [departure]}):
+        data = await coordinator._async_update_data()
+
+    assert process.call_count == 2
+    assert "<b>Bordbistro:</b> C" in data[0]["wagon_order_html"]
+    assert len(coordinator._wagon_order_cache._results) == 1
+
+
+@pytest.mark.asyncio
+async def test_coordinator_interns_before_caching(hass, mock_config_entry):
+    """The cached response and the raw data share the interned strings."""
+    departure = {
+        "scheduledDeparture": (dt_util.now() + timedelta(minutes=15)).strftime(
+            "%Y-%m-%dT%H:%M"
+        ),
+        "destination": "Interned Dest",
+        "train": "ICE 1",
+    }
+    # A fresh decode creates a new string object per departure
+    payload = json.loads(json.dumps({"departures": [departure, departure]}))
+    first, second = payload["departures"]
+    assert first["destination"] is not second["destination"]
+
+    RESPONSE_CACHE.clear()
+    coordinator = DBInfoScreenCoordinator(hass, mock_config_entry)
+    with patch_session(payload):
+        await coordinator._async_update_data()
+
+    _timestamp, cached = RESPONSE_CACHE[coordinator._cache_key]
+    raw = coordinator._raw_api_data["departures"]
+    assert raw[0]["destination"] is raw[1]["destination"]
+    assert cached["departures"][0]["destination"] is raw[0]["destination"]
+    assert cached["departures"][1]["train"] is raw[0]["train"]
+
+
 @pytest.mark.asyncio
 async def test_coordinator_qos(hass, mock_config_entry):
     """Test QoS parsing and facilities extraction."""
@@ -414,6 +481,41 @@ async def test_coordinator_qos(hass, mock_config_entry):
         assert "facilities" not in data[1]
 
 
+@pytest.mark.asyncio
+async def test_coordinator_elevator_issue_index(hass, mock_config_entry):
+    """Test that elevator issues are indexed by platform once per update."""
+    mock_data = {
+        "departures": [
+            {
+                "scheduledDeparture": (dt_util.now() + timedelta(minutes=15)).strftime(
+                    "%Y-%m-%dT%H:%M"
+                ),
+                "destination": "Elevator Train",
+                "train": "S 1",
+                "messages": [
+                    {"text": "Aufzug zu Gleis 4 defekt", "type": "qos"},
+                    {"text": "Rolltreppe im Zwischengeschoss gestört"},
+                    {"text": "Aufzug zu Gleis 5 wieder in Betrieb"},
+                ],
+            },
+        ]
+    }
+
+    coordinator = DBInfoScreenCoordinator(hass, mock_config_entry)
+    with patch_session(mock_data):
+        await coordinator._async_update_data()
+
+    assert [i["text"] for i in coordinator.elevator_issues] == [
+        "Aufzug zu Gleis 4 defekt",
+        "Rolltreppe im Zwischengeschoss gestört",
+    ]
+    assert coordinator.elevator_issues[1]["facility_type"] == "escalator"
+    assert list(coordinator.elevator_issues_by_platform) == ["4"]
+    assert coordinator.elevator_issues_by_platform["4"][0]["facility_type"] == (
+        "elevator"
+    )
+
+
 @pytest.mark.asyncio
 async def test_coordinator_route_details(hass, mock_config_entry):
     """Test route details parsing."""
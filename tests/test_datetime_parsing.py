@@ -0,0 +1,65 @@
+"""Tests for the memoized departure time parsing."""
+
+from datetime import datetime, timedelta, timezone
+
+from custom_components.db_infoscreen.utils import (
+    DATETIME_FORMAT_CLOCK,
+    DATETIME_FORMAT_ISO,
+    DATETIME_FORMAT_TIMESTAMP,
+    detect_datetime_format,
+    parse_datetime_flexible,
+)
+
+TZ = timezone(timedelta(hours=2))
+
+
+def test_detect_format():
+    """The format is detected from a single sample value."""
+    assert detect_datetime_format(1760862600) == DATETIME_FORMAT_TIMESTAMP
+    assert detect_datetime_format("1760862600") == DATETIME_FORMAT_TIMESTAMP
+    assert detect_datetime_format("2025-10-19T10:30") == DATETIME_FORMAT_ISO
+    assert detect_datetime_format("10:30") == DATETIME_FORMAT_CLOCK
+    assert detect_datetime_format("soon") is None
+
+
+def test_parse_absolute_formats():
+    """Timestamps and ISO values convert to the timezone of ``now``."""
+    now = datetime(2025, 10, 19, 10, 0, tzinfo=TZ)
+
+    parsed = parse_datetime_flexible(1760862600, now)
+    assert parsed == datetime(2025, 10, 19, 8, 30, tzinfo=timezone.utc)
+    assert parsed.tzinfo == TZ
+
+    naive = parse_datetime_flexible("2025-10-19T10:30", now, DATETIME_FORMAT_ISO)
+    assert naive == datetime(2025, 10, 19, 10, 30, tzinfo=TZ)
+
+    aware = parse_datetime_flexible("2025-10-19T08:30:00+00:00", now)
+    assert aware == naive
+
+
+def test_clock_rollover_around_midnight():
+    """HH:MM values are anchored to the closest day on every call."""
+    before_midnight = datetime(2025, 10, 19, 23, 50, tzinfo=TZ)
+    after_midnight = datetime(2025, 10, 20, 0, 10, tzinfo=TZ)
+
+    assert parse_datetime_flexible(
+        "00:05", before_midnight, DATETIME_FORMAT_CLOCK
+    ) == datetime(2025, 10, 20, 0, 5, tzinfo=TZ)
+    assert parse_datetime_flexible(
+        "23:55", after_midnight, DATETIME_FORMAT_CLOCK
+    ) == datetime(2025, 10, 19, 23, 55, tzinfo=TZ)
+    # The same raw value resolves to a new day once the anchor moves on
+    assert parse_datetime_flexible(
+        "00:05", after_midnight, DATETIME_FORMAT_CLOCK
+    ) == datetime(2025, 10, 20, 0, 5, tzinfo=TZ)
+
+
+def test_wrong_hint_falls_back():
+    """A value not matching the detected format is still parsed."""
+    now = datetime(2025, 10, 19, 10, 0, tzinfo=TZ)
+
+    assert parse_datetime_flexible("10:30", now, DATETIME_FORMAT_ISO) == datetime(
+        2025, 10, 19, 10, 30, tzinfo=TZ
+    )
+    assert parse_datetime_flexible("25:99", now, DATETIME_FORMAT_CLOCK) is None
+    assert parse_datetime_flexible("", now) is None
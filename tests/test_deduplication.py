@@ -1,4 +1,4 @@
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
 from unittest.mock import MagicMock
 
 import pytest
@@ -11,6 +11,7 @@ from custom_components.db_infoscreen.const import (
     CONF_NEXT_DEPARTURES,
     CONF_STATION,
 )
+from custom_components.db_infoscreen.utils import DepartureDeduplicator
 from tests.common import patch_session
 
 
@@ -138,3 +139,86 @@ async def test_deduplication_fallback(hass, mock_config_entry):
         data = await coordinator._async_update_data()
         # Should fallback to (line, destination) and deduplicate
         assert len(data) == 1
+        assert coordinator.duplicate_counts == {"line+destination": 1}
+
+
+def _dep(minute_offset, seconds=0, **fields):
+    base = datetime(2025, 10, 19, 10, 0, tzinfo=timezone.utc)
+    return {
+        "departure_datetime": base + timedelta(minutes=minute_offset, seconds=seconds),
+        **fields,
+    }
+
+
+def test_deduplicator_across_bucket_boundary():
+    """Duplicates straddling a 2-minute bucket boundary are still caught."""
+    deduplicator = DepartureDeduplicator("{journeyID}")
+    departures = [
+        _dep(1, 50, journeyID="A"),
+        _dep(2, 10, journeyID="A"),
+        _dep(2, 10, journeyID="B"),
+    ]
+
+    result = deduplicator.deduplicate(departures)
+
+    assert result == [departures[0], departures[2]]
+    assert deduplicator.duplicate_counts == {"journeyID": 1}
+
+
+def test_deduplicator_compares_with_kept_departure():
+    """A repeat is only dropped relative to the last departure that was kept."""
+    deduplicator = DepartureDeduplicator("{line}")
+    departures = [
+        _dep(0, line="S2"),
+        _dep(1, 40, line="S2"),
+        _dep(3, 20, line="S2"),
+    ]
+
+    result = deduplicator.deduplicate(departures)
+
+    assert result == [departures[0], departures[2]]
+
+
+def test_deduplicator_keeps_earliest_in_any_order():
+    """The earliest departure is kept and the result is sorted by time."""
+    deduplicator = DepartureDeduplicator("{line}")
+    departures = [
+        _dep(1, 40, line="S2"),
+        _dep(0, line="S2"),
+        _dep(3, 20, line="S2"),
+    ]
+
+    result = deduplicator.deduplicate(departures)
+
+    assert result == [departures[1], departures[2]]
+    assert deduplicator.duplicate_counts == {"line": 1}
+
+
+def test_deduplicator_only_sorts_after_a_replacement():
+    """Without a replaced departure the board is returned in its own order."""
+    deduplicator = DepartureDeduplicator("{line}")
+    departures = [_dep(5, line="S1"), _dep(1, line="S2"), _dep(5, 30, line="S1")]
+
+    result = deduplicator.deduplicate(departures)
+
+    assert result == [departures[0], departures[1]]
+
+
+def test_deduplicator_key_sources():
+    """Counts are reported per combination of fields that formed the key."""
+    deduplicator = DepartureDeduplicator("{journeyID}{trainNumber}")
+    departures = [
+        _dep(0, journeyID="A", trainNumber="1"),
+        _dep(0, journeyID=" a ", trainNumber="1"),
+        _dep(0, trainNumber="2"),
+        _dep(1, trainNumber="2"),
+        _dep(0),
+    ]
+
+    result = deduplicator.deduplicate(departures)
+
+    assert result == [departures[0], departures[2], departures[4]]
+    assert deduplicator.duplicate_counts == {
+        "journeyID+trainNumber": 1,
+        "trainNumber": 1,
+    }
@@ -0,0 +1,159 @@
+"""Tests for the per trip departure diff and its bus events."""
+
+import json
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+import pytest
+from homeassistant.util import dt as dt_util
+
+from custom_components.db_infoscreen import RESPONSE_CACHE, DBInfoScreenCoordinator
+from custom_components.db_infoscreen.const import (
+    CONF_CHANGE_EVENTS,
+    CONF_STATION,
+    CONF_UPDATE_INTERVAL,
+    EVENT_CANCELLATION_CHANGED,
+    EVENT_DELAY_CHANGED,
+    EVENT_DEPARTURE_ADDED,
+    EVENT_DEPARTURE_REMOVED,
+    EVENT_PLATFORM_CHANGED,
+)
+from custom_components.db_infoscreen.utils import DepartureDiff, trip_key
+from tests.common import patch_session
+
+
+def _dep(trip_id, delay=0, platform="1", cancelled=False):
+    return {
+        "trip_id": trip_id,
+        "train": f"ICE {trip_id}",
+        "destination": "Berlin",
+        "scheduledDeparture": "10:00",
+        "delay": delay,
+        "platform": platform,
+        "is_cancelled": cancelled,
+    }
+
+
+def test_first_board_reports_nothing():
+    """Without a previous board there is nothing to compare with."""
+    diff = DepartureDiff()
+    assert diff.update([_dep("1"), _dep("2")]) == []
+
+
+def test_changes_are_typed_per_trip():
+    """Each changed field of a trip yields its own change."""
+    diff = DepartureDiff()
+    diff.update([_dep("1"), _dep("2"), _dep("3")])
+
+    changes = diff.update(
+        [_dep("1", delay=5), _dep("2", platform="4", cancelled=True), _dep("4")]
+    )
+
+    by_type = {(c.event_type, c.trip_key): c.data for c in changes}
+    assert by_type[(EVENT_DELAY_CHANGED, "1")]["old_delay"] == 0
+    assert by_type[(EVENT_DELAY_CHANGED, "1")]["new_delay"] == 5
+    assert by_type[(EVENT_PLATFORM_CHANGED, "2")]["new_platform"] == "4"
+    assert by_type[(EVENT_CANCELLATION_CHANGED, "2")]["cancelled"] is True
+    assert by_type[(EVENT_DEPARTURE_ADDED, "4")]["train"] == "ICE 4"
+    assert by_type[(EVENT_DEPARTURE_REMOVED, "3")]["train"] == "ICE 3"
+    assert len(changes) == 5
+
+    # Unchanged boards report nothing
+    assert diff.update([_dep("1", delay=5)]) != []
+    assert diff.update([_dep("1", delay=5)]) == []
+
+
+def test_trip_key_without_trip_id():
+    """Train and scheduled time identify trips without an ID."""
+    assert trip_key({"train": "S 1", "scheduledDeparture": "10:00"}) == "S 1@10:00"
+    assert trip_key({"destination": "Berlin"}) is None
+
+
+@pytest.fixture
+def mock_config_entry():
+    entry = MagicMock()
+    entry.entry_id = "diff_entry"
+    entry.data = {CONF_STATION: "München Hbf", CONF_UPDATE_INTERVAL: 2}
+    entry.options = {CONF_CHANGE_EVENTS: True}
+    return entry
+
+
+@pytest.mark.asyncio
+async def test_coordinator_fires_change_events(hass, mock_config_entry):
+    """Delay changes between updates are fired on the bus."""
+    departure = {
+        "scheduledDeparture": (dt_util.now() + timedelta(minutes=15)).strftime(
+            "%Y-%m-%dT%H:%M"
+        ),
+        "destination": "Berlin",
+        "train": "ICE 1",
+        "trainId": "123-1",
+        "delayDeparture": 0,
+    }
+
+    coordinator = DBInfoScreenCoordinator(hass, mock_config_entry)
+    with patch_session({"departures": [departure]}):
+        await coordinator._async_update_data()
+
+    departure["delayDeparture"] = 6
+    RESPONSE_CACHE.clear()
+    coordinator._last_api_fetch = 0
+    with patch_session({"departures": [departure]}):
+        await coordinator._async_update_data()
+
+    hass.bus.async_fire.assert_called_once()
+    event_type, data = hass.bus.async_fire.call_args.args
+    assert event_type == EVENT_DELAY_CHANGED
+    assert data["entry_id"] == "diff_entry"
+    assert data["trip_key"] == "123-1"
+    assert data["old_delay"] == 0
+    assert data["new_delay"] == 6
+
+
+def test_raw_and_normalized_departures_compare_equal():
+    """A departure is the same trip state before and after normalization."""
+    diff = DepartureDiff()
+    raw = {"trip_id": "1", "train": "ICE 1", "delayDeparture": "5", "isCancelled": 0}
+    diff.update([raw])
+
+    assert diff.update([{**raw, "delay": 5, "is_cancelled": False}]) == []
+
+
+@pytest.mark.asyncio
+async def test_diff_covers_the_whole_board(hass, mock_config_entry):
+    """Trains cut by the size budget or a fallback update are not removed."""
+    departures = [
+        {
+            "scheduledDeparture": (
+                dt_util.now() + timedelta(minutes=15 + index)
+            ).strftime("%Y-%m-%dT%H:%M"),
+            "destination": "Berlin",
+            "train": f"ICE {index}",
+            "trainId": f"{index}-1",
+            "delayDeparture": 0,
+        }
+        for index in range(3)
+    ]
+
+    coordinator = DBInfoScreenCoordinator(hass, mock_config_entry)
+    with patch_session({"departures": departures}):
+        board = await coordinator._async_update_data()
+
+    # Only the first train fits the attributes now
+    coordinator._size_estimator.limit = len(json.dumps(board[0])) * 3 // 2
+    coordinator._size_estimator.margin = 0
+    RESPONSE_CACHE.clear()
+    coordinator._last_api_fetch = 0
+    with patch_session({"departures": departures}):
+        visible = await coordinator._async_update_data()
+    assert len(visible) < len(departures)
+
+    # Every train is filtered out, the update falls back to the cached board
+    coordinator.favorite_trains = ["RE 99"]
+    RESPONSE_CACHE.clear()
+    coordinator._last_api_fetch = 0
+    with patch_session({"departures": departures}):
+        await coordinator._async_update_data()
+
+    hass.bus.async_fire.assert_not_called()
+    assert coordinator.departure_changes == []
@@ -0,0 +1,109 @@
+"""Tests for splitting the departure list across page sensors."""
+
+from unittest.mock import MagicMock
+
+import pytest
+from homeassistant.util import dt as dt_util
+
+from custom_components.db_infoscreen import (
+    MAX_ATTRIBUTES_SIZE,
+    DBInfoScreenCoordinator,
+)
+from custom_components.db_infoscreen.const import (
+    CONF_DEPARTURE_PAGES,
+    CONF_STATION,
+    CONF_UPDATE_INTERVAL,
+)
+from custom_components.db_infoscreen.sensor import DBInfoSensor
+
+
+@pytest.fixture
+def mock_config_entry():
+    entry = MagicMock()
+    entry.entry_id = "test_entry"
+    entry.data = {CONF_STATION: "München Hbf", CONF_UPDATE_INTERVAL: 2}
+    entry.options = {CONF_DEPARTURE_PAGES: 3}
+    return entry
+
+
+@pytest.mark.asyncio
+async def test_paginate_splits_at_attribute_limit(hass, mock_config_entry):
+    """Pages are consecutive slices that each stay below the limit."""
+    coordinator = DBInfoScreenCoordinator(hass, mock_config_entry)
+    assert coordinator.departure_pages == 3
+
+    departures = [{"train": f"ICE {i}"} for i in range(7)]
+    item_size = MAX_ATTRIBUTES_SIZE // 3
+    sizes = {id(dep): item_size for dep in departures}
+
+    result = coordinator._paginate(departures, sizes)
+
+    assert coordinator.page_bounds == [(0, 2), (2, 4), (4, 6)]
+    # The seventh departure does not fit on any page
+    assert result == departures[:6]
+
+
+@pytest.mark.asyncio
+async def test_paginate_single_page(hass, mock_config_entry):
+    """A small board ends up on the first page only."""
+    coordinator = DBInfoScreenCoordinator(hass, mock_config_entry)
+    departures = [{"train": "S 1"}, {"train": "S 2"}]
+
+    result = coordinator._paginate(departures, {id(dep): 50 for dep in departures})
+
+    assert result == departures
+    assert coordinator.page_bounds == [(0, 2)]
+
+
+@pytest.mark.asyncio
+async def test_paginate_reserves_first_page_extras(hass, mock_config_entry):
+    """Station messages on the first page leave less room for departures."""
+    coordinator = DBInfoScreenCoordinator(hass, mock_config_entry)
+    coordinator.station_messages = [{"text": "x" * (MAX_ATTRIBUTES_SIZE // 3)}]
+
+    departures = [{"train": f"ICE {i}"} for i in range(6)]
+    item_size = MAX_ATTRIBUTES_SIZE // 3
+    sizes = {id(dep): item_size for dep in departures}
+
+    result = coordinator._paginate(departures, sizes)
+
+    assert coordinator.page_bounds == [(0, 1), (1, 3), (3, 5)]
+    assert result == departures[:5]
+
+
+def test_page_sensors_show_their_slice(mock_config_entry):
+    """Each page sensor only exposes its own part of the list."""
+    now = dt_util.now().timestamp()
+    coordinator = MagicMock()
+    coordinator.data = [
+        {"train": f"S {i}", "departure_timestamp": now + 600 + i} for i in range(5)
+    ]
+    coordinator.page_bounds = [(0, 3), (3, 5)]
+    coordinator.station_messages = []
+
+    sensors = [
+        DBInfoSensor(
+            coordinator,
+            mock_config_entry,
+            "München Hbf",
+            [],
+            "",
+            "",
+            False,
+            page=page,
+            pages=3,
+        )
+        for page in range(3)
+    ]
+
+    assert sensors[0]._attr_unique_id == "db_infoscreen_test_entry"
+    assert sensors[1]._attr_unique_id == "db_infoscreen_test_entry_page_2"
+    assert sensors[1]._attr_name.endswith("page 2")
+
+    first, second, third = (s.extra_state_attributes for s in sensors)
+    assert [d["train"] for d in first["next_departures"]] == ["S 0", "S 1", "S 2"]
+    assert [d["train"] for d in second["next_departures"]] == ["S 3", "S 4"]
+    assert third["next_departures"] == []
+    assert (second["page"], second["pages"]) == (2, 3)
+    assert "station_messages" in first
+    assert "station_messages" not in second
@@ -0,0 +1,90 @@
+"""Tests for importing punctuality figures as long-term statistics."""
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.db_infoscreen.history import PunctualityRollups
+from custom_components.db_infoscreen.long_term_statistics import (
+    async_import_hourly_statistics,
+)
+
+ADD_STATISTICS = (
+    "custom_components.db_infoscreen.long_term_statistics.async_add_external_statistics"
+)
+
+
+def _entry(timestamp, delay=0, cancelled=False):
+    return {
+        "train": "S 1",
+        "line": "S 1",
+        "timestamp": timestamp,
+        "delay": delay,
+        "is_cancelled": cancelled,
+    }
+
+
+def test_finished_hours_are_imported_once(hass):
+    """Every finished hour becomes one row per statistic, exactly once."""
+    now = dt_util.utcnow().replace(minute=30, second=0, microsecond=0)
+    hour = now.replace(minute=0) - timedelta(hours=2)
+    rollups = PunctualityRollups(hass, "ENTRY1")
+
+    with (
+        patch.object(rollups, "async_schedule_save"),
+        patch(ADD_STATISTICS) as add_statistics,
+    ):
+        rollups.async_add(
+            [
+                _entry(hour + timedelta(minutes=5), delay=2),
+                _entry(hour + timedelta(minutes=20), delay=10),
+                _entry(hour + timedelta(minutes=40), cancelled=True),
+                # The current hour is not finished yet
+                _entry(now - timedelta(minutes=5), cancelled=True),
+            ],
+            now,
+        )
+        imported = async_import_hourly_statistics(
+            hass, rollups, "ENTRY1", "München Hbf", now
+        )
+        assert imported == 1
+
+        rows = {
+            call.args[1]["statistic_id"]: (call.args[1], call.args[2])
+            for call in add_statistics.call_args_list
+        }
+        metadata, statistics = rows["db_infoscreen:entry1_mean_delay"]
+        assert metadata["name"] == "München Hbf mean delay"
+        assert metadata["source"] == "db_infoscreen"
+        assert statistics == [{"start": hour, "mean": 6.0}]
+        _, statistics = rows["db_infoscreen:entry1_on_time"]
+        assert statistics == [{"start": hour, "mean": 33.3}]
+        metadata, statistics = rows["db_infoscreen:entry1_cancellations"]
+        assert metadata["has_sum"] is True
+        assert statistics == [{"start": hour, "state": 1, "sum": 1}]
+
+        # Nothing new within the same hour
+        add_statistics.reset_mock()
+        assert (
+            async_import_hourly_statistics(hass, rollups, "ENTRY1", "München Hbf", now)
+            == 0
+        )
+        add_statistics.assert_not_called()
+
+        # The next hour continues the cancellation sum
+        later = now + timedelta(hours=1)
+        assert (
+            async_import_hourly_statistics(
+                hass, rollups, "ENTRY1", "München Hbf", later
+            )
+            == 1
+        )
+    rows = {
+        call.args[1]["statistic_id"]: call.args[2]
+        for call in add_statistics.call_args_list
+    }
+    assert rows["db_infoscreen:entry1_cancellations"][0]["sum"] == 2
+    # Only cancelled trains in that hour, there is no mean delay
+    assert "db_infoscreen:entry1_mean_delay" not in rows
+    assert rollups._data_to_save()["cancelled_sum"] == 2
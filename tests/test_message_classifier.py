@@ -0,0 +1,35 @@
+"""Tests for the shared message keyword classifier."""
+
+from custom_components.db_infoscreen.utils import classify_message
+
+
+def test_facility_issues():
+    """Elevator and escalator outages are detected with their platform."""
+    elevator = classify_message("Aufzug zu Gleis 3 defekt")
+    assert elevator.facility_issue == "elevator"
+    assert elevator.platform == "3"
+
+    escalator = classify_message("Rolltreppe am Bahnsteig 12 außer Betrieb")
+    assert escalator.facility_issue == "escalator"
+    assert escalator.platform == "12"
+
+    assert (
+        classify_message("Aufzug zu Gleis 3 wieder in Betrieb").facility_issue is None
+    )
+    assert classify_message("Verspätung aus vorheriger Fahrt").facility_issue is None
+
+
+def test_onboard_facilities():
+    """WiFi and bistro outages need both the facility and a failure keyword."""
+    assert classify_message("WLAN im Zug gestört").wifi_broken
+    assert not classify_message("WLAN verfügbar").wifi_broken
+    assert classify_message("Bordbistro geschlossen").bistro_closed
+    assert not classify_message("Bordrestaurant geöffnet").bistro_closed
+
+
+def test_results_are_memoized():
+    """The same text is only classified once."""
+    classify_message.cache_clear()
+    classify_message("Fahrstuhl Gleis 1 gestört")
+    classify_message("Fahrstuhl Gleis 1 gestört")
+    assert classify_message.cache_info().hits == 1
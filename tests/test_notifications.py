@@ -0,0 +1,163 @@
+"""Tests for the batched notification dispatcher."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.db_infoscreen import DBInfoScreenCoordinator
+from custom_components.db_infoscreen.notifications import (
+    NOTIFICATION_TITLE,
+    NotificationDispatcher,
+    async_get_notification_dispatcher,
+    split_notify_service,
+)
+from custom_components.db_infoscreen.watch import build_watch, watch_update_message
+
+CALL_LATER = "custom_components.db_infoscreen.notifications.async_call_later"
+
+
+@pytest.fixture
+def dispatcher(hass):
+    hass.services.async_call = AsyncMock()
+    return NotificationDispatcher(
+        hass, coalesce_window=30, min_send_interval=60, max_queue_size=2
+    )
+
+
+def test_split_notify_service():
+    """Only ``domain.service`` names are accepted."""
+    assert split_notify_service("notify.phone") == ("notify", "phone")
+    for invalid in (None, "", "notify", "notify.", ".phone"):
+        with pytest.raises(ValueError):
+            split_notify_service(invalid)
+
+
+@pytest.mark.asyncio
+async def test_changes_of_a_train_are_coalesced(hass, dispatcher):
+    """A flapping delay ends up as one line with the newest state."""
+    with patch(CALL_LATER) as call_later:
+        dispatcher.async_enqueue("notify.phone", "ICE 1", "Delay is now 5 min.")
+        dispatcher.async_enqueue("notify.phone", "ICE 1", "Delay is now 6 min.")
+        dispatcher.async_enqueue("notify.phone", "ICE 2", "Platform changed to 4.")
+
+    # One flush is scheduled for the whole window
+    call_later.assert_called_once()
+    assert call_later.call_args.args[1] == 30
+    assert dispatcher.pending == 2
+
+    await dispatcher.async_flush()
+
+    hass.services.async_call.assert_awaited_once_with(
+        "notify",
+        "phone",
+        {
+            "message": "Delay is now 6 min.\nPlatform changed to 4.",
+            "title": NOTIFICATION_TITLE,
+        },
+    )
+    assert dispatcher.pending == 0
+    assert dispatcher.stats["queued"] == 3
+    assert dispatcher.stats["coalesced"] == 1
+    assert dispatcher.stats["sent"] == 1
+
+
+@pytest.mark.asyncio
+async def test_queued_changes_of_a_train_are_merged(hass, dispatcher):
+    """A later delay keeps the platform change that is still queued."""
+    watch = build_watch("notify.phone", delay_threshold=5)
+    departure = {"train": "ICE 1", "destination": "Berlin", "platform": "4"}
+
+    with patch(CALL_LATER):
+        for update in ({}, {"platform": "5"}, {"platform": "5", "delay": 7}):
+            message = watch_update_message(watch, {**departure, **update})
+            if message:
+                dispatcher.async_enqueue("notify.phone", "ICE 1", message)
+
+    assert watch["last_notified_platform"] == "5"
+    assert dispatcher.pending == 1
+
+    await dispatcher.async_flush()
+
+    assert hass.services.async_call.call_args.args[2]["message"] == (
+        "Update for ICE 1 to Berlin: Platform changed to 5. Delay is now 7 min."
+    )
+    assert dispatcher.stats["coalesced"] == 1
+
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_the_oldest(hass, dispatcher):
+    """Backpressure drops the oldest message, not the newest."""
+    with patch(CALL_LATER):
+        for train in ("ICE 1", "ICE 2", "ICE 3"):
+            dispatcher.async_enqueue("notify.phone", train, f"{train} delayed.")
+
+    await dispatcher.async_flush("notify.phone")
+
+    message = hass.services.async_call.call_args.args[2]["message"]
+    assert message == "ICE 2 delayed.\nICE 3 delayed."
+    assert dispatcher.stats["dropped"] == 1
+
+
+@pytest.mark.asyncio
+async def test_send_interval_defers_the_next_flush(hass, dispatcher):
+    """A service that was just notified waits for the minimum interval."""
+    with patch(CALL_LATER):
+        dispatcher.async_enqueue("notify.phone", "ICE 1", "ICE 1 delayed.")
+    await dispatcher.async_flush()
+
+    with patch(CALL_LATER) as call_later:
+        dispatcher.async_enqueue("notify.phone", "ICE 1", "ICE 1 on time.")
+        # Another service is not held back
+        dispatcher.async_enqueue("notify.tablet", "ICE 1", "ICE 1 on time.")
+
+    delays = [call.args[1] for call in call_later.call_args_list]
+    assert delays[0] > 30
+    assert delays[1] == 30
+    assert dispatcher.stats["deferred"] == 1
+
+
+@pytest.mark.asyncio
+async def test_invalid_service_and_failures_are_counted(hass, dispatcher):
+    """Broken services never raise into the update."""
+    dispatcher.async_enqueue("phone", "ICE 1", "ICE 1 delayed.")
+    assert dispatcher.pending == 0
+
+    hass.services.async_call.side_effect = Exception("Service not found")
+    with patch(CALL_LATER):
+        dispatcher.async_enqueue("notify.phone", "ICE 1", "ICE 1 delayed.")
+    await dispatcher.async_flush()
+
+    assert dispatcher.stats["failed"] == 2
+    assert dispatcher.stats["sent"] == 0
+
+
+def test_connection_changes_are_queued(hass):
+    """Tracked connections notify on changes of the connecting train."""
+    entry = MagicMock()
+    entry.data = {"station": "München Hbf"}
+    entry.options = {}
+    coordinator = DBInfoScreenCoordinator(hass, entry)
+    conn_config = {"notify_service": "notify.phone"}
+    info = {
+        "target_train": "RE 456",
+        "target_platform": "3",
+        "target_delay": 0,
+        "transfer_station": "Augsburg Hbf",
+    }
+
+    with patch.object(coordinator._notifications, "async_enqueue") as enqueue:
+        # On time on the first sighting, nothing to report
+        coordinator._notify_connection_change("ICE 123", conn_config, info)
+        coordinator._notify_connection_change("ICE 123", conn_config, info)
+        enqueue.assert_not_called()
+
+        coordinator._notify_connection_change(
+            "ICE 123", conn_config, {**info, "target_platform": "5"}
+        )
+
+    enqueue.assert_called_once()
+    service, key, message = enqueue.call_args.args
+    assert service == "notify.phone"
+    assert key == "connection ICE 123"
+    assert "platform 5" in message
+    assert async_get_notification_dispatcher(hass) is coordinator._notifications
@@ -0,0 +1,150 @@
+"""Tests for the recorder friendly attributes and the get_departures service."""
+
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.helpers.service import SelectedEntities
+from homeassistant.util import dt as dt_util
+
+from custom_components.db_infoscreen import DBInfoScreenCoordinator, async_setup_entry
+from custom_components.db_infoscreen.const import (
+    CONF_RECORDING_PROFILE,
+    CONF_STATION,
+    DOMAIN,
+    RECORDING_PROFILE_LEAN,
+)
+from custom_components.db_infoscreen.sensor import (
+    DBInfoScreenPunctualitySensor,
+    DBInfoSensor,
+)
+
+
+def _departures():
+    now = dt_util.now()
+    return [
+        {
+            "train": "S 1",
+            "destination": "Ostbahnhof",
+            "platform": "1",
+            "delay": 0,
+            "is_cancelled": True,
+            "departure_timestamp": int((now + timedelta(minutes=2)).timestamp()),
+            "scheduledDeparture": "10:02",
+        },
+        {
+            "train": "S 2",
+            "destination": "Erding",
+            "platform": "2",
+            "delay": 3,
+            "departure_timestamp": int((now + timedelta(minutes=5)).timestamp()),
+            "scheduledDeparture": "10:05",
+        },
+    ]
+
+
+@pytest.fixture
+def mock_config_entry():
+    entry = MagicMock()
+    entry.entry_id = "test_entry"
+    entry.data = {CONF_STATION: "München Hbf"}
+    entry.options = {}
+    return entry
+
+
+def test_large_attributes_are_not_recorded():
+    """The departure list and the rollups never reach the recorder."""
+    unrecorded = DBInfoSensor._Entity__combined_unrecorded_attributes
+    assert {"next_departures", "next_departures_text", "station_messages"} <= (
+        unrecorded
+    )
+    assert "station" not in unrecorded
+    assert "by_line" in (
+        DBInfoScreenPunctualitySensor._Entity__combined_unrecorded_attributes
+    )
+
+
+def test_lean_profile_records_a_summary(mock_config_entry):
+    """The lean profile replaces the departure list with a few values."""
+    coordinator = MagicMock()
+    coordinator.data = _departures()
+    coordinator.config_entry = mock_config_entry
+    coordinator.recording_profile = RECORDING_PROFILE_LEAN
+    coordinator.station_messages = [{"text": "Elevator out of order"}]
+    coordinator.paused = False
+
+    sensor = DBInfoSensor(
+        coordinator, mock_config_entry, "München Hbf", [], "", "", True
+    )
+    attributes = sensor.extra_state_attributes
+
+    assert "next_departures" not in attributes
+    assert "next_departures_text" not in attributes
+    assert attributes["departure_count"] == 2
+    assert attributes["cancelled_count"] == 1
+    assert attributes["station_message_count"] == 1
+    assert attributes["next_train"] == "S 2"
+    assert attributes["next_delay"] == 3
+
+
+@pytest.mark.asyncio
+async def test_get_departures_service(hass):
+    """The service returns the full departures of the sensor's station."""
+    from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_STATION: "München Hbf"},
+        options={CONF_RECORDING_PROFILE: RECORDING_PROFILE_LEAN},
+        entry_id="lean_entry",
+    )
+    hass.config_entries.async_forward_entry_setups = AsyncMock()
+    hass.services.has_service = MagicMock(return_value=False)
+    hass.services.async_register = MagicMock()
+
+    with patch.object(
+        DBInfoScreenCoordinator, "async_config_entry_first_refresh", AsyncMock()
+    ):
+        await async_setup_entry(hass, entry)
+
+    handlers = {
+        call.args[1]: call for call in hass.services.async_register.call_args_list
+    }
+    registration = handlers["get_departures"]
+    coordinator = hass.data[DOMAIN]["lean_entry"]
+    assert coordinator.recording_profile == RECORDING_PROFILE_LEAN
+    coordinator.data = _departures()
+
+    entities = {
+        "sensor.munchen_hbf_departures": MagicMock(
+            platform=DOMAIN,
+            config_entry_id="lean_entry",
+            unique_id="db_infoscreen_lean_entry",
+        ),
+        "sensor.munchen_hbf_punctuality": MagicMock(
+            platform=DOMAIN,
+            config_entry_id="lean_entry",
+            unique_id="punctuality_lean_entry",
+        ),
+    }
+    ent_reg = MagicMock()
+    ent_reg.async_get.side_effect = entities.get
+    # The device adds its entities indirectly, only the departure sensor counts
+    selected = SelectedEntities(
+        referenced={"sensor.other"},
+        indirectly_referenced=set(entities),
+    )
+    service_call = MagicMock()
+    with (
+        patch("custom_components.db_infoscreen.er.async_get", return_value=ent_reg),
+        patch(
+            "custom_components.db_infoscreen.async_extract_referenced_entity_ids",
+            return_value=selected,
+        ),
+    ):
+        response = await registration.args[2](service_call)
+
+    assert registration.kwargs["schema"]({"device_id": ["abc"]})
+    assert list(response) == ["sensor.munchen_hbf_departures"]
+    assert response["sensor.munchen_hbf_departures"]["station"] == "München Hbf"
+    assert response["sensor.munchen_hbf_departures"]["departures"] == (coordinator.data)
@@ -0,0 +1,140 @@
+"""Tests for the precomputed departure render model."""
+
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+from homeassistant.util import dt as dt_util
+
+from custom_components.db_infoscreen import RESPONSE_CACHE, DBInfoScreenCoordinator
+from custom_components.db_infoscreen.const import (
+    CONF_ADMODE,
+    CONF_ENABLE_TEXT_VIEW,
+    CONF_STATION,
+)
+from custom_components.db_infoscreen.sensor import DBInfoSensor
+from custom_components.db_infoscreen.utils import (
+    build_departure_render,
+    compile_text_template,
+    trip_key,
+)
+from tests.common import patch_session
+
+
+@pytest.fixture
+def mock_config_entry():
+    entry = MagicMock()
+    entry.entry_id = "test_entry"
+    entry.data = {
+        CONF_STATION: "Karlsruhe Hbf",
+        CONF_ADMODE: "departure",
+        CONF_ENABLE_TEXT_VIEW: True,
+    }
+    entry.options = {}
+    return entry
+
+
+def test_render_values():
+    """State, delay and summary follow the configured display mode."""
+    now = dt_util.now().replace(hour=10, minute=0, second=0, microsecond=0)
+    departure = {
+        "line": "S5",
+        "destination": "Pforzheim",
+        "platform": "3",
+        "scheduledDeparture": "10:30",
+        "departure_timestamp": (now + timedelta(minutes=35)).timestamp(),
+        "delay": 5,
+        "time": (now + timedelta(minutes=35)).timestamp(),
+    }
+
+    render = build_departure_render(
+        departure, now, "departure", compile_text_template("{line} {time}")
+    )
+
+    assert render.state == "10:30 +5"
+    assert render.scheduled_time == now.replace(minute=30)
+    assert render.text_line == "S5 10:35"
+    assert render.calendar_summary == "S5 → Pforzheim (+5min)"
+    assert render.local_times["time"].endswith("10:35:00")
+    assert build_departure_render(departure, now).state == "10:35"
+    assert build_departure_render(departure, now).text_line is None
+
+
+@pytest.mark.asyncio
+async def test_sensor_uses_coordinator_render_model(hass, mock_config_entry):
+    """The sensor shows the values the coordinator built in its update."""
+    now = dt_util.now()
+    mock_data = {
+        "departures": [
+            {
+                "scheduledDeparture": (now + timedelta(minutes=15)).strftime(
+                    "%Y-%m-%dT%H:%M"
+                ),
+                "destination": "Pforzheim",
+                "train": "S 5",
+                "line": "S5",
+                "platform": "3",
+                "delayDeparture": 2,
+            }
+        ]
+    }
+
+    RESPONSE_CACHE.clear()
+    coordinator = DBInfoScreenCoordinator(hass, mock_config_entry)
+    with patch_session(mock_data):
+        coordinator.data = await coordinator._async_update_data()
+
+    render = coordinator.render_models[trip_key(coordinator.data[0])]
+    sensor = DBInfoSensor(
+        coordinator, mock_config_entry, "Karlsruhe Hbf", [], "", "", True
+    )
+    with patch(
+        "custom_components.db_infoscreen.sensor.build_departure_render"
+    ) as build:
+        assert sensor.native_value == render.state
+        attrs = sensor.extra_state_attributes
+
+    build.assert_not_called()
+    assert render.state.endswith(" +2")
+    assert attrs["next_departures_text"] == [render.text_line]
+
+
+@pytest.mark.asyncio
+async def test_fallback_keeps_the_paginated_board(hass, mock_config_entry):
+    """A fallback returns the list that page bounds and render models describe."""
+    now = dt_util.now()
+    mock_data = {
+        "departures": [
+            {
+                "scheduledDeparture": (now + timedelta(minutes=15 + i)).strftime(
+                    "%Y-%m-%dT%H:%M"
+                ),
+                "destination": "Pforzheim",
+                "train": f"S {i}",
+                "trainId": f"{i}-1",
+                "delayDeparture": 0,
+            }
+            for i in range(3)
+        ]
+    }
+
+    RESPONSE_CACHE.clear()
+    coordinator = DBInfoScreenCoordinator(hass, mock_config_entry)
+    coordinator.next_departures = 2
+    with patch_session(mock_data):
+        board = await coordinator._async_update_data()
+    bounds = list(coordinator.page_bounds)
+    models = dict(coordinator.render_models)
+
+    # Every train is filtered out, the coordinator falls back to its cache
+    coordinator.favorite_trains = ["RE 99"]
+    RESPONSE_CACHE.clear()
+    coordinator._last_api_fetch = 0
+    with patch_session(mock_data):
+        fallback = await coordinator._async_update_data()
+
+    assert fallback is board
+    assert len(fallback) == 2
+    assert coordinator.page_bounds == bounds == [(0, 2)]
+    assert coordinator.render_models == models
+    assert set(models) == {"0-1", "1-1"}
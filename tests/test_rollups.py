@@ -0,0 +1,159 @@
+"""Tests for the persisted punctuality rollups."""
+
+from datetime import timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from homeassistant.util import dt as dt_util
+
+from custom_components.db_infoscreen.history import (
+    DELAY_BIN_EDGES,
+    MAX_QUANTILE_LINES,
+    DelayHistogram,
+    DelayQuantiles,
+    DepartureHistory,
+    PunctualityRollups,
+)
+
+
+def _entry(train, timestamp, delay=0, cancelled=False, line=None):
+    return {
+        "train": train,
+        "line": line or train,
+        "timestamp": timestamp,
+        "delay": delay,
+        "is_cancelled": cancelled,
+    }
+
+
+def test_departed_trains_are_handed_out_once():
+    """Only trains whose departure time has passed are rolled up, once."""
+    now = dt_util.utcnow().replace(second=30)
+    history = DepartureHistory()
+    history.expire(now)
+    history.record("past", _entry("S 1", now - timedelta(minutes=5), delay=3))
+    history.record("future", _entry("S 2", now + timedelta(minutes=5)))
+
+    assert [e["train"] for e in history.departed(now)] == ["S 1"]
+    # A later update of a departed train is not handed out again
+    history.record("past", _entry("S 1", now - timedelta(minutes=5), delay=9))
+    assert history.departed(now) == []
+
+    later = now + timedelta(minutes=10)
+    assert [e["train"] for e in history.departed(later)] == ["S 2"]
+
+    # Trains first seen after their departure still count
+    history.record("late", _entry("S 3", now))
+    assert [e["train"] for e in history.departed(later)] == ["S 3"]
+
+
+def test_rollups_by_window_line_and_hour(hass):
+    """Each window counts its trains, old buckets drop out of short windows."""
+    now = dt_util.utcnow()
+    rollups = PunctualityRollups(hass, "entry", delay_threshold=5)
+
+    with patch.object(rollups, "async_schedule_save") as save:
+        rollups.async_add(
+            [
+                _entry("S 1", now - timedelta(hours=3), delay=2),
+                _entry("S 1", now - timedelta(minutes=10), delay=8),
+                _entry("RE 5", now - timedelta(minutes=5), cancelled=True),
+            ],
+            now,
+        )
+        assert save.call_count == 1
+
+        assert rollups.stats("1h")["total_trains"] == 2
+        assert rollups.stats("24h") == {
+            "punctuality_percent": 33.3,
+            "total_trains": 3,
+            "delayed_trains": 1,
+            "cancelled_trains": 1,
+            "average_delay": 5.0,
+        }
+        assert rollups.line_stats("30d")["S 1"]["total_trains"] == 2
+        assert rollups.line_stats("30d")["RE 5"]["cancelled_trains"] == 1
+        hour = dt_util.as_local(now - timedelta(hours=3)).hour
+        assert rollups.hour_stats("30d")[hour]["total_trains"] >= 1
+
+        # Two days later only the long windows remember the trains
+        rollups.async_add([], now + timedelta(days=2))
+        assert rollups.stats("24h")["total_trains"] == 0
+        assert rollups.line_stats("24h") == {}
+        assert rollups.stats("7d")["total_trains"] == 3
+        assert rollups.stats("30d")["total_trains"] == 3
+
+
+@pytest.mark.asyncio
+async def test_rollups_survive_a_restart(hass):
+    """Saved buckets are restored, unless the delay threshold changed."""
+    now = dt_util.utcnow()
+    rollups = PunctualityRollups(hass, "entry", delay_threshold=5)
+    with patch.object(rollups, "async_schedule_save"):
+        rollups.async_add([_entry("S 1", now - timedelta(minutes=2), delay=7)], now)
+    saved = rollups._data_to_save()
+
+    restored = PunctualityRollups(hass, "entry", delay_threshold=5)
+    with patch.object(restored._store, "async_load", AsyncMock(return_value=saved)):
+        await restored.async_load()
+    assert restored.stats("1h") == rollups.stats("1h")
+    assert restored.line_stats("30d") == rollups.line_stats("30d")
+
+    stricter = PunctualityRollups(hass, "entry", delay_threshold=10)
+    with patch.object(stricter._store, "async_load", AsyncMock(return_value=saved)):
+        await stricter.async_load()
+    assert stricter.stats("30d")["total_trains"] == 0
+
+
+@pytest.mark.asyncio
+async def test_pending_save_is_written_on_shutdown(hass):
+    """Only a scheduled save is written when the entry unloads."""
+    rollups = PunctualityRollups(hass, "entry")
+    with patch.object(rollups._store, "async_save", AsyncMock()) as save:
+        await rollups.async_save()
+        save.assert_not_awaited()
+
+        with patch.object(rollups._store, "async_delay_save"):
+            rollups.async_schedule_save()
+        await rollups.async_save()
+        save.assert_awaited_once()
+
+
+def test_delay_percentiles_per_line():
+    """Percentiles follow the long tail, cancelled trains do not count."""
+    now = dt_util.utcnow()
+    quantiles = DelayQuantiles()
+    entries = [_entry("S 1", now, delay=0) for _ in range(80)]
+    entries += [_entry("S 1", now, delay=4) for _ in range(15)]
+    entries += [_entry("S 1", now, delay=45) for _ in range(5)]
+    entries += [_entry("RE 5", now, delay=200), _entry("RE 5", now, cancelled=True)]
+    quantiles.add(entries, now)
+
+    assert quantiles.station.quantiles() == {"p50": 0, "p90": 4, "p99": 45}
+    assert quantiles.line_quantiles()["RE 5"] == {
+        "p50": DELAY_BIN_EDGES[-1],
+        "p90": DELAY_BIN_EDGES[-1],
+        "p99": DELAY_BIN_EDGES[-1],
+    }
+    assert DelayHistogram().quantiles() == {"p50": None, "p90": None, "p99": None}
+
+
+def test_delay_percentiles_have_bounded_memory():
+    """Neither many trains nor many lines grow the histograms."""
+    now = dt_util.utcnow()
+    quantiles = DelayQuantiles()
+    for day in range(3):
+        quantiles.add(
+            [_entry(f"Bus {n}", now, delay=n % 7, line=f"Bus {n}") for n in range(500)],
+            now + timedelta(days=day),
+        )
+
+    assert len(quantiles.lines) == MAX_QUANTILE_LINES
+    assert len(quantiles.station.counts) == len(DELAY_BIN_EDGES)
+    # Earlier days have decayed to a half and a quarter
+    assert quantiles.station.total == pytest.approx(500 * (1 + 0.5 + 0.25))
+
+    # Lines that stop running make room for others
+    quantiles.add([_entry("S 9", now)], now + timedelta(days=10))
+    assert "S 9" in quantiles.lines
+    assert len(quantiles.lines) == 1
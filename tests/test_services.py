@@ -44,7 +44,8 @@ async def test_watch_train_notification_trigger(hass, mock_coordinator):
     with patch.object(
         hass.services, "async_call", new_callable=AsyncMock
     ) as mock_service:
-        await mock_coordinator._check_watched_trips(departures)
+        mock_coordinator._check_watched_trips(departures)
+        await mock_coordinator._notifications.async_flush()
 
         # Verify notification sent
         mock_service.assert_called_once()
@@ -81,7 +82,8 @@ async def test_watch_train_no_double_notification(hass, mock_coordinator):
     with patch.object(
         hass.services, "async_call", new_callable=AsyncMock
     ) as mock_service:
-        await mock_coordinator._check_watched_trips(departures)
+        mock_coordinator._check_watched_trips(departures)
+        await mock_coordinator._notifications.async_flush()
         mock_service.assert_not_called()
 
 
@@ -112,6 +114,7 @@ async def test_watch_train_cancellation(hass, mock_coordinator):
     with patch.object(
         hass.services, "async_call", new_callable=AsyncMock
     ) as mock_service:
-        await mock_coordinator._check_watched_trips(departures)
+        mock_coordinator._check_watched_trips(departures)
+        await mock_coordinator._notifications.async_flush()
         mock_service.assert_called_once()
         assert "CANCELLED" in mock_service.call_args[0][2]["message"]
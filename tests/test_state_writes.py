@@ -0,0 +1,99 @@
+"""Tests for skipping state writes of unchanged entities."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from homeassistant.helpers.entity import Entity
+
+from custom_components.db_infoscreen.binary_sensor import (
+    DBInfoScreenConnectionBinarySensor,
+    DBInfoScreenDelayBinarySensor,
+)
+from custom_components.db_infoscreen.const import CONF_STATION
+
+
+@pytest.fixture
+def mock_config_entry():
+    entry = MagicMock()
+    entry.entry_id = "test_entry"
+    entry.data = {CONF_STATION: "München Hbf"}
+    entry.title = "München Hbf"
+    entry.options = {}
+    return entry
+
+
+@pytest.fixture
+def mock_coordinator(mock_config_entry):
+    coordinator = MagicMock()
+    coordinator.data = [{"train": "ICE 1", "destination": "Berlin", "delay": 2}]
+    coordinator.config_entry = mock_config_entry
+    coordinator.last_update_success = True
+    coordinator.state_write_counts = {}
+    coordinator.api_url = "https://dbf.finalrewind.org/München%20Hbf.json"
+    coordinator._consecutive_errors = 0
+    return coordinator
+
+
+def test_unchanged_state_is_not_written(mock_coordinator, mock_config_entry):
+    """Only updates that change the output reach the state machine."""
+    sensor = DBInfoScreenDelayBinarySensor(mock_coordinator, mock_config_entry)
+
+    with patch.object(Entity, "async_write_ha_state") as write:
+        sensor._handle_coordinator_update()
+        sensor._handle_coordinator_update()
+        assert write.call_count == 1
+
+        mock_coordinator.data[0]["delay"] = 7
+        sensor._handle_coordinator_update()
+        assert write.call_count == 2
+
+    assert sensor.state_writes == 2
+    assert sensor.skipped_state_writes == 1
+    assert mock_coordinator.state_write_counts[sensor.unique_id] == {
+        "written": 2,
+        "skipped": 1,
+    }
+
+
+def test_direct_write_invalidates_digest(mock_coordinator, mock_config_entry):
+    """A write outside of an update forces the next update to write again."""
+    sensor = DBInfoScreenDelayBinarySensor(mock_coordinator, mock_config_entry)
+
+    with patch.object(Entity, "async_write_ha_state") as write:
+        sensor._handle_coordinator_update()
+        sensor.async_write_ha_state()
+        sensor._handle_coordinator_update()
+
+    assert write.call_count == 3
+
+
+def test_volatile_attributes_do_not_trigger_writes(mock_coordinator, mock_config_entry):
+    """A new update timestamp alone does not cause a write."""
+    sensor = DBInfoScreenConnectionBinarySensor(mock_coordinator, mock_config_entry)
+    mock_coordinator.last_update = None
+
+    with patch.object(Entity, "async_write_ha_state") as write:
+        sensor._handle_coordinator_update()
+        mock_coordinator.last_update = MagicMock(
+            isoformat=MagicMock(return_value="2026-10-19T10:00:00")
+        )
+        sensor._handle_coordinator_update()
+
+    assert write.call_count == 1
+
+
+def test_written_update_reuses_the_digest_values(mock_coordinator, mock_config_entry):
+    """The state write reads the values computed for the digest."""
+    sensor = DBInfoScreenDelayBinarySensor(mock_coordinator, mock_config_entry)
+    seen = []
+
+    def write():
+        seen.append((dict(sensor._update_memo), sensor.extra_state_attributes))
+
+    with patch.object(Entity, "async_write_ha_state", side_effect=write):
+        sensor._handle_coordinator_update()
+
+    memo, attributes = seen[0]
+    assert set(memo) == {"is_on", "extra_state_attributes"}
+    assert attributes is memo["extra_state_attributes"]
+    assert sensor._update_memo is None
@@ -5,13 +5,18 @@ import pytest
 from homeassistant.util import dt as dt_util
 
 from custom_components.db_infoscreen.__init__ import DBInfoScreenCoordinator
+from custom_components.db_infoscreen.history import (
+    DelayQuantiles,
+    DepartureHistory,
+    PunctualityRollups,
+)
 from custom_components.db_infoscreen.sensor import DBInfoScreenPunctualitySensor
 
 
 @pytest.fixture
 def mock_coordinator():
     coord = MagicMock()
-    coord.departure_history = {}
+    coord.departure_history = DepartureHistory()
     coord.config_entry = MagicMock()
     coord.config_entry.data = {}
     coord.config_entry.options = {}
@@ -29,7 +34,9 @@ def real_coordinator(hass):
     entry.options = {}
     entry.entry_id = "test_entry"
     coord = MagicMock(spec=DBInfoScreenCoordinator)
-    coord.departure_history = {}
+    coord.departure_history = DepartureHistory()
+    coord.punctuality_rollups = PunctualityRollups(hass, entry.entry_id)
+    coord.delay_quantiles = DelayQuantiles()
     coord.hass = hass
     # Bind the real method to this mock
     coord._update_history = DBInfoScreenCoordinator._update_history.__get__(coord)
@@ -42,21 +49,18 @@ async def test_punctuality_sensor_calculation(hass, mock_coordinator):
     now = dt_util.now()
 
     # 1. Setup history: 1 on-time, 1 delayed (10m), 1 cancelled
-    mock_coordinator.departure_history = {
-        "trip1": {
-            "train": "ICE 1",
-            "delay": 0,
-            "is_cancelled": False,
-            "timestamp": now,
-        },
-        "trip2": {
-            "train": "ICE 2",
-            "delay": 10,
-            "is_cancelled": False,
-            "timestamp": now,
-        },
-        "trip3": {"train": "ICE 3", "delay": 0, "is_cancelled": True, "timestamp": now},
-    }
+    history = mock_coordinator.departure_history
+    history.record(
+        "trip1",
+        {"train": "ICE 1", "delay": 0, "is_cancelled": False, "timestamp": now},
+    )
+    history.record(
+        "trip2",
+        {"train": "ICE 2", "delay": 10, "is_cancelled": False, "timestamp": now},
+    )
+    history.record(
+        "trip3", {"train": "ICE 3", "delay": 0, "is_cancelled": True, "timestamp": now}
+    )
 
     sensor = DBInfoScreenPunctualitySensor(
         mock_coordinator, mock_coordinator.config_entry
@@ -222,3 +226,52 @@ async def test_update_history_raw_cancellation_fields(real_coordinator):
 
     cancelled = [v for v in history.values() if v["is_cancelled"]]
     assert len(cancelled) == 2, f"Expected 2 cancelled, got {len(cancelled)}"
+
+
+def test_history_totals_follow_updates_and_expiry():
+    """Re-recorded trips replace their totals and old minutes expire."""
+    now = dt_util.utcnow()
+    history = DepartureHistory()
+    history.expire(now)
+
+    history.record(
+        "trip1",
+        {"train": "ICE 1", "delay": 2, "is_cancelled": False, "timestamp": now},
+    )
+    history.record(
+        "trip2",
+        {
+            "train": "ICE 2",
+            "delay": 0,
+            "is_cancelled": False,
+            "timestamp": now + timedelta(hours=1),
+        },
+    )
+    # The delay of trip1 grows, it is counted once with the new delay
+    history.record(
+        "trip1",
+        {"train": "ICE 1", "delay": 12, "is_cancelled": False, "timestamp": now},
+    )
+    assert history.stats() == {
+        "punctuality_percent": 50.0,
+        "total_trains": 2,
+        "delayed_trains": 1,
+        "cancelled_trains": 0,
+        "average_delay": 6.0,
+    }
+
+    history.expire(now + timedelta(hours=24, minutes=1))
+    assert list(history) == ["trip2"]
+    assert history.stats()["delayed_trains"] == 0
+    assert history.stats()["average_delay"] == 0.0
+
+    # Entries that are already outside of the window are not recorded
+    history.record(
+        "trip3",
+        {"train": "ICE 3", "delay": 0, "is_cancelled": False, "timestamp": now},
+    )
+    assert "trip3" not in history
+
+    history.expire(now + timedelta(days=3))
+    assert len(history) == 0
+    assert history.stats()["total_trains"] == 0
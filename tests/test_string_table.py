@@ -0,0 +1,51 @@
+"""Tests for the shared string interning table."""
+
+import json
+
+from custom_components.db_infoscreen.utils import (
+    StringTable,
+    intern_departure_strings,
+)
+
+
+def _decode(departure):
+    # A fresh decode creates new string objects, like every API response does
+    return json.loads(json.dumps(departure))
+
+
+def test_departure_strings_are_shared():
+    """Repeated names across departures point to one string object."""
+    table = StringTable()
+    raw = {
+        "destination": "Augsburg Hbf",
+        "via": ["München-Pasing", "Augsburg Hbf"],
+        "route": [{"name": "München-Pasing"}, "Augsburg Hbf"],
+    }
+    first, second = _decode(raw), _decode(raw)
+    assert first["destination"] is not second["destination"]
+
+    intern_departure_strings(first, table)
+    intern_departure_strings(second, table)
+
+    assert first["destination"] is second["destination"]
+    assert first["via"][1] is first["destination"]
+    assert second["route"][0]["name"] is first["via"][0]
+    assert second["route"][1] is first["destination"]
+
+
+def test_lowercase_is_cached():
+    """The lowercase form is computed once per name."""
+    table = StringTable()
+    lowered = table.lower("München Hbf")
+    assert lowered == "münchen hbf"
+    assert table.lower("München " + "Hbf") is lowered
+
+
+def test_table_is_bounded():
+    """The table starts over once it reaches its size limit."""
+    table = StringTable(max_size=2)
+    table.intern("a")
+    table.intern("b")
+    table.intern("c")
+    assert len(table) == 1
+    assert table.intern(5) == 5
@@ -0,0 +1,64 @@
+"""Tests for the compiled text view template."""
+
+from unittest.mock import patch
+
+from custom_components.db_infoscreen.const import DEFAULT_TEXT_VIEW_TEMPLATE
+from custom_components.db_infoscreen.utils import (
+    TEXT_VIEW_FIELDS,
+    TextViewTemplate,
+    compile_text_template,
+)
+
+DEPARTURE = {
+    "line": "S51",
+    "destination": "Karlsruhe Albtalbahnhof",
+    "platform": "2",
+    "platform_sectors": "A-C",
+    "departure_current": "15:46",
+    "delay": "1",
+    "delay_arrival": 3,
+}
+
+
+def test_default_and_rich_placeholders():
+    """Known fields, richer ones and format specs are rendered."""
+    default = TextViewTemplate(DEFAULT_TEXT_VIEW_TEMPLATE)
+    assert (
+        default.render(DEPARTURE) == "S51 -> Karlsruhe Albtalbahnhof (Pl 2): 15:46 +1"
+    )
+
+    rich = TextViewTemplate("{line:<4}|{platform_sectors}|{delay_arrival_str}")
+    assert rich.render(DEPARTURE) == "S51 |A-C| +3"
+
+
+def test_unknown_and_invalid_templates():
+    """Unknown keys stay as placeholders, broken templates use the fallback."""
+    assert TextViewTemplate("{line};{unknown_key}").render(DEPARTURE) == (
+        "S51;{unknown_key}"
+    )
+    assert TextViewTemplate("{line").render(DEPARTURE) == (
+        "S51 -> Karlsruhe Albtalbahnhof (Pl 2): 15:46 +1"
+    )
+    # Index lookups still work through the format_map path
+    assert TextViewTemplate("{line[0]}").render(DEPARTURE) == "S"
+
+
+def test_lines_are_cached_per_version():
+    """Only the fields of the template are computed, once per version."""
+    keys, getter = TEXT_VIEW_FIELDS["line"]
+    calls = []
+
+    def counting_getter(departure):
+        calls.append(departure)
+        return getter(departure)
+
+    template = TextViewTemplate("{line} {delay_str}")
+    with patch.dict(TEXT_VIEW_FIELDS, {"line": (keys, counting_getter)}):
+        template.render(DEPARTURE)
+        # A change to a key the template does not use hits the cache
+        template.render(dict(DEPARTURE, destination="Ettlingen"))
+        assert len(calls) == 1
+        assert template.render(dict(DEPARTURE, delay=4)) == "S51  +4"
+        assert len(calls) == 2
+
+    assert compile_text_template("{line}") is compile_text_template("{line}")
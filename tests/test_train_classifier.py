@@ -0,0 +1,29 @@
+"""Tests for the shared train class normalization."""
+
+from custom_components.db_infoscreen.utils import (
+    build_ignored_train_classes,
+    classify_train,
+)
+
+
+def test_classes_from_api_fields():
+    """API classes are mapped, whichever field they come in."""
+    assert classify_train({"trainClasses": ["S"]}) == {"s_bahn"}
+    assert classify_train({"train_type": "S"}) == {"s_bahn"}
+    assert classify_train({"type": ["F", "N"]}) == {"long_distance", "regional_db"}
+
+
+def test_classes_inferred_from_name():
+    """Departures without classes are classified by their train name."""
+    assert classify_train({"trainClasses": [], "train": "ICE 599"}) == {"long_distance"}
+    assert classify_train({"train": "RB 54"}) == {"regional_db"}
+    assert classify_train({"train": "S 8"}) == {"s_bahn"}
+    assert classify_train({"train": "Tram 12"}) == {"unknown"}
+    assert classify_train({"trainClasses": None}) == {"unknown"}
+
+
+def test_ignored_classes_include_aliases():
+    """Configured types are expanded to the values other sources use."""
+    ignored = build_ignored_train_classes(["S", "StadtBus"])
+    assert {"s_bahn", "S-Bahn", "MetroBus", "bus"} <= ignored
+    assert build_ignored_train_classes([]) == frozenset()
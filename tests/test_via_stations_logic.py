@@ -1,5 +1,5 @@
 from datetime import timedelta
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from homeassistant.util import dt as dt_util
@@ -8,9 +8,11 @@ from custom_components.db_infoscreen import DBInfoScreenCoordinator
 from custom_components.db_infoscreen.const import (
     CONF_PLATFORMS,
     CONF_STATION,
+    CONF_VIA_MATCH_BY_ID,
     CONF_VIA_STATIONS,
     CONF_VIA_STATIONS_LOGIC,
 )
+from custom_components.db_infoscreen.utils import StationIndex
 from tests.common import patch_session
 
 
@@ -239,3 +241,108 @@ async def test_via_logic_and_with_single_station_skips_server_side(hass):
     # Even with AND, if there's only 1 station, the server can filter it and we can skip local filter.
     assert coordinator._via_filtered_server_side is True
     assert "via=Frankfurt%20Hbf" in coordinator.fetch_url
+
+
+@pytest.mark.asyncio
+async def test_via_match_by_station_id(hass):
+    """Via stations resolved to IDs match despite spelling differences."""
+    entry = MagicMock()
+    entry.data = {
+        CONF_STATION: "Mainz Hbf",
+        CONF_VIA_STATIONS: ["Frankfurt (Main) Hbf", "Darmstadt Hbf"],
+        CONF_VIA_MATCH_BY_ID: True,
+    }
+    entry.options = {}
+    entry.entry_id = "mock_entry_id"
+
+    coordinator = DBInfoScreenCoordinator(hass, entry)
+    index = StationIndex(["Mainz Hbf", "Frankfurt(Main)Hbf", "Bingen"])
+
+    now = dt_util.now()
+    mock_data = {
+        "departures": [
+            {
+                "scheduledDeparture": (now + timedelta(minutes=10)).strftime("%H:%M"),
+                "destination": "Aschaffenburg",
+                "train": "RE 55",
+                "route": [{"name": "Frankfurt(Main)Hbf"}],
+            },
+            {
+                # Not in the station list, matched by name instead
+                "scheduledDeparture": (now + timedelta(minutes=15)).strftime("%H:%M"),
+                "destination": "Heidelberg",
+                "train": "RB 68",
+                "via": ["Darmstadt Hbf"],
+            },
+            {
+                "scheduledDeparture": (now + timedelta(minutes=20)).strftime("%H:%M"),
+                "destination": "Koblenz",
+                "train": "RE 2",
+                "via": ["Bingen"],
+            },
+        ]
+    }
+
+    with (
+        patch(
+            "custom_components.db_infoscreen.async_get_station_index",
+            AsyncMock(return_value=index),
+        ) as get_index,
+        patch_session(mock_data),
+    ):
+        data = await coordinator._async_update_data()
+        await coordinator._async_update_data()
+
+    get_index.assert_awaited_once()
+    assert coordinator._via_station_ids == [1, None]
+    assert [d["destination"] for d in data] == ["Aschaffenburg", "Heidelberg"]
+
+
+@pytest.mark.asyncio
+async def test_via_station_list_is_fetched_again(hass):
+    """A missing station list is retried after a backoff, not given up."""
+    entry = MagicMock()
+    entry.data = {
+        CONF_STATION: "Mainz Hbf",
+        CONF_VIA_STATIONS: ["Frankfurt (Main) Hbf", "Darmstadt Hbf"],
+        CONF_VIA_MATCH_BY_ID: True,
+    }
+    entry.options = {}
+    entry.entry_id = "mock_entry_id"
+    coordinator = DBInfoScreenCoordinator(hass, entry)
+    index = StationIndex(["Mainz Hbf", "Frankfurt(Main)Hbf"])
+    get_index = AsyncMock(side_effect=[None, index])
+
+    with patch("custom_components.db_infoscreen.async_get_station_index", get_index):
+        await coordinator.async_resolve_via_stations()
+        assert coordinator._via_station_ids is None
+        assert coordinator._via_resolve_retry_at > dt_util.now().timestamp()
+
+        await coordinator.async_resolve_via_stations()
+
+    assert coordinator._via_station_ids == [1, None]
+    assert coordinator._station_index is index
+
+
+def test_station_index_route_stations():
+    """Route, via and destination names map to their station IDs."""
+    index = StationIndex(["Mainz Hbf", "Frankfurt(Main)Hbf", "Hanau Hbf"])
+
+    assert index.resolve("mainz  hbf") == 0
+    assert index.resolve("Frankfurt (Main) Hbf") == 1
+    assert index.resolve("Berlin Hbf") is None
+    assert index.route_stations(
+        {
+            "route": [{"name": "Frankfurt(Main)Hbf"}, {"name": "Offenbach"}],
+            "via": ["MAINZ  HBF"],
+            "destination": "Hanau Hbf",
+        }
+    ) == ({0, 1, 2}, {"offenbach"})
+
+
+def test_station_index_ambiguous_resolution():
+    """A misspelling close to several stations is not resolved."""
+    index = StationIndex(["München Ost", "München West", "München Hbf"])
+
+    assert index.resolve("München Oest") is None
+    assert index.resolve("münchen west") == 1
@@ -0,0 +1,117 @@
+"""Tests for the shared watch registry."""
+
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.util import dt as dt_util
+
+from custom_components.db_infoscreen import DBInfoScreenCoordinator
+from custom_components.db_infoscreen.const import CONF_STATION, CONF_UPDATE_INTERVAL
+from custom_components.db_infoscreen.watch import (
+    WATCH_TIMEOUT,
+    WatchRegistry,
+    async_get_watch_registry,
+    build_watch,
+)
+from tests.common import patch_session
+
+
+def _entry(entry_id, station):
+    entry = MagicMock()
+    entry.entry_id = entry_id
+    entry.data = {CONF_STATION: station, CONF_UPDATE_INTERVAL: 2}
+    entry.options = {}
+    return entry
+
+
+def test_registry_is_shared_by_all_entries(hass):
+    """Every coordinator sees the same watches, none is copied."""
+    first = DBInfoScreenCoordinator(hass, _entry("a", "München Hbf"))
+    second = DBInfoScreenCoordinator(hass, _entry("b", "Augsburg Hbf"))
+
+    with patch.object(WatchRegistry, "async_schedule_save") as save:
+        async_get_watch_registry(hass).async_add("ICE 1", build_watch("notify.phone"))
+
+    save.assert_called_once()
+    assert first.watched_trips is second.watched_trips
+    assert "ICE 1" in first.watched_trips
+
+
+def test_evaluate_matches_trip_id_and_expires(hass):
+    """Watches match by trip ID and end once the train is gone for good."""
+    registry = WatchRegistry(hass)
+    registry.watches["123-1"] = build_watch("notify.phone", delay_threshold=5)
+    registry.watches["ICE 9"] = build_watch("notify.phone")
+    now = dt_util.now()
+
+    with patch.object(registry, "async_schedule_save") as save:
+        notifications = registry.async_evaluate(
+            [{"train": "ICE 1", "trip_id": "123-1", "delay": 8}], now
+        )
+        assert [(train_id, msg) for train_id, _watch, msg in notifications] == [
+            (
+                "123-1",
+                {
+                    "header": "Update for ICE 1 to None: ",
+                    "delay": "Delay is now 8 min. ",
+                },
+            )
+        ]
+        assert save.call_count == 1
+
+        later = now + WATCH_TIMEOUT + timedelta(seconds=1)
+        assert registry.async_evaluate([], later) == []
+
+    assert registry.watches == {}
+
+
+@pytest.mark.asyncio
+async def test_watches_are_restored(hass):
+    """Persisted watches are loaded and keep their notified state."""
+    registry = WatchRegistry(hass)
+    stored = {"watches": {"ICE 1": {**build_watch("notify.phone"), "last_seen": 0}}}
+    stored["watches"]["ICE 1"]["last_notified_delay"] = 7
+
+    with patch.object(
+        registry._store, "async_load", AsyncMock(return_value=stored)
+    ) as load:
+        await registry.async_load()
+        await registry.async_load()
+
+    load.assert_awaited_once()
+    assert registry.watches["ICE 1"]["last_notified_delay"] == 7
+    # The restored watch does not expire right away
+    assert registry.watches["ICE 1"]["last_seen"] > 0
+    assert registry._data_to_save() == {"watches": registry.watches}
+
+
+@pytest.mark.asyncio
+async def test_update_queues_the_notification(hass):
+    """The update queues the notification and does not wait for it."""
+    coordinator = DBInfoScreenCoordinator(hass, _entry("a", "München Hbf"))
+    coordinator.watched_trips["ICE 1"] = build_watch("notify.phone")
+    departure = {
+        "scheduledDeparture": (dt_util.now() + timedelta(minutes=15)).strftime(
+            "%Y-%m-%dT%H:%M"
+        ),
+        "destination": "Berlin",
+        "train": "ICE 1",
+        "delayDeparture": 10,
+    }
+    hass.services.async_call = AsyncMock()
+
+    with (
+        patch.object(WatchRegistry, "async_schedule_save"),
+        patch_session({"departures": [departure]}),
+    ):
+        await coordinator._async_update_data()
+
+    hass.services.async_call.assert_not_called()
+    assert coordinator._notifications.pending == 1
+
+    await coordinator._notifications.async_flush()
+    hass.services.async_call.assert_awaited_once()
+    assert (
+        "Delay is now 10 min" in hass.services.async_call.call_args.args[2]["message"]
+    )
@@ -0,0 +1,159 @@
+"""Tests for the departure subscription websocket command."""
+
+from unittest.mock import MagicMock
+
+from homeassistant.components import websocket_api
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+
+from custom_components.db_infoscreen import DBInfoScreenCoordinator
+from custom_components.db_infoscreen.const import DOMAIN
+from custom_components.db_infoscreen.websocket import (
+    SIGNAL_ENTRY_UNLOADED,
+    diff_boards,
+    project_departures,
+    ws_subscribe_departures,
+)
+
+
+def _dep(trip_id, delay=0, platform="1", **extra):
+    return {
+        "trip_id": trip_id,
+        "train": f"ICE {trip_id}",
+        "destination": "Berlin",
+        "delay": delay,
+        "platform": platform,
+        "route": [{"name": "Augsburg Hbf"}],
+        **extra,
+    }
+
+
+def test_projection_keeps_only_requested_fields():
+    """Wall displays only receive the fields they render."""
+    board = project_departures(
+        [_dep("1"), _dep("1"), {"destination": "Pasing"}], ["train", "delay"]
+    )
+
+    assert board == {
+        "1": {"train": "ICE 1", "delay": 0},
+        "#1": {"train": "ICE 1", "delay": 0},
+        "#2": {},
+    }
+
+
+def test_diff_only_carries_changed_fields():
+    """Unchanged departures are left out and changes are per field."""
+    old = project_departures([_dep("1"), _dep("2"), _dep("3")], None)
+    new = project_departures(
+        [_dep("1", delay=5), _dep("3"), _dep("2", platform="4"), _dep("4")], None
+    )
+    new.pop("3")
+
+    assert diff_boards(old, new) == {
+        "added": {"4": _dep("4")},
+        "changed": {"1": {"delay": 5}, "2": {"platform": "4"}},
+        "removed": ["3"],
+        "order": ["1", "2", "4"],
+    }
+    assert diff_boards(new, new) is None
+
+    # A reordered board sends the new order only
+    swapped = project_departures([_dep("2"), _dep("1")], ["delay"])
+    ordered = project_departures([_dep("1"), _dep("2")], ["delay"])
+    assert diff_boards(ordered, swapped) == {"order": ["2", "1"]}
+
+    # Fields that disappear are cleared
+    dropped = project_departures([{"trip_id": "1", "train": "ICE 1"}], None)
+    assert diff_boards(project_departures([_dep("1")], None), dropped) == {
+        "changed": {
+            "1": {"destination": None, "delay": None, "platform": None, "route": None}
+        }
+    }
+
+
+def test_subscription_streams_initial_board_and_diffs(hass):
+    """Subscribers get the board once, then only its changes."""
+    coordinator = MagicMock(spec=DBInfoScreenCoordinator)
+    coordinator.data = [_dep("1"), _dep("2")]
+    listeners = []
+    coordinator.async_add_listener.side_effect = lambda update: (
+        listeners.append(update) or MagicMock()
+    )
+    hass.data[DOMAIN] = {"entry": coordinator}
+    connection = MagicMock()
+    connection.subscriptions = {}
+
+    ws_subscribe_departures(
+        hass,
+        connection,
+        {
+            "id": 7,
+            "type": f"{DOMAIN}/subscribe_departures",
+            "entry_id": "entry",
+            "fields": ["train", "delay"],
+        },
+    )
+
+    connection.send_result.assert_called_once_with(7)
+    assert 7 in connection.subscriptions
+    assert connection.send_message.call_args.args[0] == websocket_api.event_message(
+        7,
+        {
+            "departures": [
+                {"key": "1", "train": "ICE 1", "delay": 0},
+                {"key": "2", "train": "ICE 2", "delay": 0},
+            ]
+        },
+    )
+
+    # A new platform is not among the fields, nothing is sent
+    connection.send_message.reset_mock()
+    coordinator.data = [_dep("1", platform="9"), _dep("2")]
+    listeners[0]()
+    connection.send_message.assert_not_called()
+
+    coordinator.data = [_dep("1", delay=4), _dep("2")]
+    listeners[0]()
+    connection.send_message.assert_called_once_with(
+        websocket_api.event_message(7, {"changed": {"1": {"delay": 4}}})
+    )
+
+
+def test_unknown_entry_is_an_error(hass):
+    """Subscribing to an entry that is not loaded fails."""
+    hass.data[DOMAIN] = {"other": MagicMock()}
+    connection = MagicMock()
+
+    for entry_id in ("missing", "other"):
+        ws_subscribe_departures(
+            hass,
+            connection,
+            {"id": 1, "type": f"{DOMAIN}/subscribe_departures", "entry_id": entry_id},
+        )
+
+    assert connection.send_error.call_count == 2
+    assert connection.send_error.call_args.args[1] == websocket_api.ERR_NOT_FOUND
+    connection.send_result.assert_not_called()
+
+
+def test_unload_ends_the_subscription(hass):
+    """A reloaded entry has a new coordinator, subscribers are told to resubscribe."""
+    coordinator = MagicMock(spec=DBInfoScreenCoordinator)
+    coordinator.data = []
+    remove_listener = MagicMock()
+    coordinator.async_add_listener.return_value = remove_listener
+    hass.data[DOMAIN] = {"entry": coordinator}
+    connection = MagicMock()
+    connection.subscriptions = {}
+
+    ws_subscribe_departures(
+        hass,
+        connection,
+        {"id": 3, "type": f"{DOMAIN}/subscribe_departures", "entry_id": "entry"},
+    )
+    async_dispatcher_send(hass, SIGNAL_ENTRY_UNLOADED.format("entry"))
+
+    remove_listener.assert_called_once()
+    assert connection.subscriptions == {}
+    connection.send_error.assert_called_once_with(
+        3, websocket_api.ERR_NOT_FOUND, "Config entry unloaded"
+    )
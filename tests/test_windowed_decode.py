@@ -0,0 +1,137 @@
+"""Tests for decoding only the departures within a time horizon."""
+
+import json
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+from homeassistant.util import dt as dt_util
+
+from custom_components.db_infoscreen import DBInfoScreenCoordinator
+from custom_components.db_infoscreen.const import (
+    CONF_DECODE_HORIZON,
+    CONF_OFFSET,
+    CONF_STATION,
+    CONF_UPDATE_INTERVAL,
+)
+from custom_components.db_infoscreen.utils import decode_departures_window
+from tests.common import patch_session
+
+NOW = datetime(2025, 10, 19, 10, 0, tzinfo=timezone.utc)
+
+
+def _board(minutes):
+    return {
+        "departures": [
+            {
+                "train": f"RE {m}",
+                "scheduledDeparture": (NOW + timedelta(minutes=m)).strftime(
+                    "%Y-%m-%dT%H:%M"
+                ),
+                "route": [{"name": "Ulm Hbf"}],
+            }
+            for m in minutes
+        ]
+    }
+
+
+def test_decoding_stops_at_horizon():
+    """Departures after the horizon are not decoded."""
+    payload = json.dumps(_board([-30, 0, 20, 59, 61, 120])).encode()
+
+    data = decode_departures_window(payload, NOW, timedelta(minutes=60))
+
+    assert [d["train"] for d in data["departures"]] == [
+        "RE -30",
+        "RE 0",
+        "RE 20",
+        "RE 59",
+    ]
+    assert data["departures"][0]["route"] == [{"name": "Ulm Hbf"}]
+
+
+def test_payload_without_departures_is_decoded_in_full():
+    """Error responses and other payloads are returned unchanged."""
+    payload = b'{"error": "ambiguous station"}'
+
+    data = decode_departures_window(payload, NOW, timedelta(minutes=60))
+
+    assert data == {"error": "ambiguous station"}
+
+
+def test_empty_departures():
+    data = decode_departures_window(b'{"departures": [ ]}', NOW, timedelta(hours=1))
+    assert data == {"departures": []}
+
+
+@pytest.mark.asyncio
+async def test_coordinator_uses_windowed_decode(hass):
+    """With a decode horizon the coordinator reads the raw payload."""
+    entry = MagicMock()
+    entry.entry_id = "window_entry"
+    entry.data = {CONF_STATION: "Ulm Hbf", CONF_UPDATE_INTERVAL: 2}
+    entry.options = {CONF_DECODE_HORIZON: 30}
+    coordinator = DBInfoScreenCoordinator(hass, entry)
+
+    now = dt_util.now()
+    mock_data = {
+        "departures": [
+            {
+                "train": train,
+                "destination": "Augsburg Hbf",
+                "scheduledDeparture": (now + timedelta(minutes=m)).strftime(
+                    "%Y-%m-%dT%H:%M"
+                ),
+            }
+            for train, m in (("RE 1", 10), ("RE 2", 20), ("RE 3", 90))
+        ]
+    }
+
+    with patch_session(mock_data) as session:
+        data = await coordinator._async_update_data()
+        response = session.get(coordinator.fetch_url)
+
+    assert [d["train"] for d in data] == ["RE 1", "RE 2"]
+    assert "#horizon=30" in coordinator._cache_key
+    assert response.read.await_count == 1
+
+
+def test_horizon_starts_after_offset():
+    """The window is counted from the offset, not from now."""
+    payload = json.dumps(_board([30, 50, 70, 80])).encode()
+
+    data = decode_departures_window(
+        payload, NOW, timedelta(minutes=30), timedelta(minutes=45)
+    )
+
+    assert [d["train"] for d in data["departures"]] == ["RE 30", "RE 50", "RE 70"]
+
+
+@pytest.mark.asyncio
+async def test_coordinator_window_with_offset(hass):
+    """An offset larger than the horizon does not empty the board."""
+    entry = MagicMock()
+    entry.entry_id = "window_offset_entry"
+    entry.data = {CONF_STATION: "Ulm Hbf", CONF_UPDATE_INTERVAL: 2}
+    entry.options = {CONF_DECODE_HORIZON: 30, CONF_OFFSET: "00:45"}
+    coordinator = DBInfoScreenCoordinator(hass, entry)
+
+    now = dt_util.now()
+    mock_data = {
+        "departures": [
+            {
+                "train": train,
+                "destination": "Augsburg Hbf",
+                "scheduledDeparture": (now + timedelta(minutes=m)).strftime(
+                    "%Y-%m-%dT%H:%M"
+                ),
+            }
+            for train, m in (("RE 1", 10), ("RE 2", 60), ("RE 3", 90))
+        ]
+    }
+
+    with patch_session(mock_data):
+        data = await coordinator._async_update_data()
+
+    assert [d["train"] for d in data] == ["RE 2"]
+    assert coordinator._cache_key.endswith("#horizon=30&offset=2700")